@@ -0,0 +1,134 @@
+# bench_arena.py
+'''
+AST plano (marena.Arena) frente al árbol de objetos de myAST, en un
+programa de N nodos:
+
+  - memoria: nodos, listas de hijos y valores del árbol de objetos frente
+    a las columnas y el pool de valores del Arena;
+  - recorrido completo (preorden) por objetos y por índice, y el mismo
+    recuento por clase de nodo leyendo sólo la columna kinds;
+  - conversión en ambos sentidos y pickle (guardar/compartir).
+
+Comprueba que el Arena que construye ArenaParser es el mismo que el de
+Arena.from_ast, que to_ast devuelve el mismo árbol y que recorrer dos
+veces el Program de Context(flat=True) da los mismos objetos sin sumar
+posiciones.
+
+    python benchmarks/bench_arena.py [nodos]
+'''
+from collections import Counter
+import gc
+import os
+import pickle
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mcontext import Context
+from marena import Arena, FIELDS, KIND, KINDS
+from myAST import Node
+import programs
+
+NODES_PER_FUNCTION = 76     # many_functions(statements=10)
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+def walk_objects(program):
+    counts = Counter()
+    stack = [program]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, Node):
+            counts[item.__class__] += 1
+            stack.extend(getattr(item, name) for name in FIELDS[KIND[item.__class__]])
+        elif item.__class__ is list:
+            stack.extend(item)
+    return counts
+
+def walk_arena(arena):
+    counts = Counter()
+    kinds = arena.kinds
+    for i in arena.walk():
+        counts[KINDS[kinds[i]]] += 1
+    return counts
+
+def scan_kinds(arena):
+    return Counter({KINDS[kind]: count for kind, count in Counter(arena.kinds).items()})
+
+def object_bytes(program):
+    seen = set()
+    total = 0
+    stack = [program]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, Node):
+            stack.extend(getattr(item, name) for name in FIELDS[KIND[item.__class__]])
+        elif item.__class__ in (list, tuple):
+            stack.extend(item)
+    return total
+
+def arena_bytes(arena):
+    return arena.nbytes() + sys.getsizeof(arena.values) + sum(sys.getsizeof(v) for v in arena.values)
+
+def main(nodes=500_000):
+    source = programs.many_functions(functions=max(1, nodes // NODES_PER_FUNCTION), statements=10)
+    ctxt = Context(lexer='dfa', parser='rd')
+    ctxt.parse(source)
+    program, spans = ctxt.ast, ctxt.spans
+    flat = Context(lexer='dfa', parser='rd', flat=True)
+    flat.parse(source)
+
+    first_pass, _ = timed(lambda: [walk_objects(decl) for decl in flat.ast.stmts], repeat=1)
+    spans_after = len(flat.spans)
+    second_pass, _ = timed(lambda: [walk_objects(decl) for decl in flat.ast.stmts], repeat=1)
+    same_objects = all(a is b for a, b in zip(flat.ast.stmts, flat.ast.stmts)) and len(flat.spans) == spans_after
+
+    convert, arena = timed(lambda: Arena.from_ast(program, spans))
+    back_time, back = timed(lambda: arena.to_ast())
+    same = (back == program and flat.arena.kinds == arena.kinds and flat.arena.slots == arena.slots
+            and flat.arena.starts == arena.starts and flat.arena.ends == arena.ends)
+
+    count = len(arena)
+    obj_mem, arena_mem = object_bytes(program), arena_bytes(arena)
+    print(f'{count} nodos, {len(arena.values)} valores distintos')
+    print(f'memoria       objetos {obj_mem / 1e6:7.1f} MB ({obj_mem / count:5.1f} B/nodo)'
+          f'   Arena {arena_mem / 1e6:7.1f} MB ({arena_mem / count:5.1f} B/nodo)')
+
+    t_obj, c_obj = timed(lambda: walk_objects(program))
+    t_arena, c_arena = timed(lambda: walk_arena(arena))
+    t_scan, c_scan = timed(lambda: scan_kinds(arena))
+    same &= c_obj == c_arena == c_scan
+    print(f'recorrido     objetos {t_obj * 1000:7.1f} ms   Arena por índice {t_arena * 1000:7.1f} ms'
+          f'   columna kinds {t_scan * 1000:7.1f} ms')
+    print(f'conversión    from_ast {convert * 1000:7.1f} ms   to_ast {back_time * 1000:7.1f} ms')
+    print(f'flat=True     primer recorrido {first_pass * 1000:7.1f} ms   segundo {second_pass * 1000:7.1f} ms'
+          f'   mismos objetos y posiciones: {"OK" if same_objects else "DISTINTO"}')
+    same &= same_objects
+
+    t_dump_obj, data_obj = timed(lambda: pickle.dumps(program, pickle.HIGHEST_PROTOCOL))
+    t_dump_arena, data_arena = timed(lambda: pickle.dumps(arena, pickle.HIGHEST_PROTOCOL))
+    t_load_obj, _ = timed(lambda: pickle.loads(data_obj))
+    t_load_arena, loaded = timed(lambda: pickle.loads(data_arena))
+    same &= loaded.to_ast() == program
+    print(f'pickle        objetos {len(data_obj) / 1e6:6.1f} MB dumps {t_dump_obj * 1000:7.1f} ms loads {t_load_obj * 1000:7.1f} ms')
+    print(f'              Arena   {len(data_arena) / 1e6:6.1f} MB dumps {t_dump_arena * 1000:7.1f} ms loads {t_load_arena * 1000:7.1f} ms')
+
+    print('Arena igual que el árbol de objetos:', 'OK' if same else 'DISTINTO')
+    if not same:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,99 @@
+# bench_ast_memory.py
+'''
+Memoria del AST: nodos con __slots__ y tupla vacía compartida (myAST
+actual) frente a dataclasses con __dict__ por instancia y una lista nueva
+por cada lista de hijos vacía (la versión anterior, que se reconstruye a
+partir de los campos de myAST antes de importar el parser).
+
+Cada modo corre en un proceso nuevo, analiza un programa de N nodos y
+reporta los bytes por nodo (el nodo, su __dict__ y sus listas de hijos
+vacías) y la memoria máxima (RSS) del proceso.
+
+    python benchmarks/bench_ast_memory.py [nodos]
+'''
+import dataclasses
+import gc
+import os
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import myAST
+import programs
+
+NODES_PER_FUNCTION = 76     # many_functions(statements=10)
+
+def unslotted():
+    '''
+    Reemplaza las clases de myAST por dataclasses sin __slots__ con los
+    mismos campos, como eran antes.
+    '''
+    classes = [cls for cls in vars(myAST).values() if isinstance(cls, type) and issubclass(cls, myAST.Node)]
+    mirrors = {}
+    for cls in sorted(classes, key=lambda cls: len(cls.__mro__)):
+        fields = []
+        for f in dataclasses.fields(cls):
+            if f.default is myAST.EMPTY:
+                fields.append((f.name, f.type, dataclasses.field(default_factory=list)))
+            elif f.default is dataclasses.MISSING:
+                fields.append((f.name, f.type))
+            else:
+                fields.append((f.name, f.type, f.default))
+        bases = tuple(mirrors[base] for base in cls.__bases__ if base in mirrors)
+        mirrors[cls] = dataclasses.make_dataclass(cls.__name__, fields, bases=bases,
+                                                  namespace={'accept': myAST.Node.accept})
+    for cls, mirror in mirrors.items():
+        setattr(myAST, cls.__name__, mirror)
+
+def node_bytes(program):
+    from myAST import nodes
+    count = total = 0
+    seen = set()
+    for node in nodes(program):
+        count += 1
+        total += sys.getsizeof(node)
+        if hasattr(node, '__dict__'):
+            total += sys.getsizeof(node.__dict__)
+        for f in dataclasses.fields(node):
+            value = getattr(node, f.name)
+            # Cada contenedor vacío se cuenta una vez: la tupla compartida casi nada
+            if isinstance(value, (list, tuple)) and not value and id(value) not in seen:
+                seen.add(id(value))
+                total += sys.getsizeof(value)
+    return count, total
+
+def current_rss():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+MODES = ('dataclass', 'slots')
+
+def measure(mode, nodes):
+    if mode == 'dataclass':
+        unslotted()
+    from mcontext import Context
+    source = programs.many_functions(functions=max(1, nodes // NODES_PER_FUNCTION), statements=10)
+    ctxt = Context(lexer='dfa', parser='rd')
+    t0 = time.perf_counter()
+    ctxt.parse(source)
+    elapsed = time.perf_counter() - t0
+    ctxt.spans = ctxt.parser.spans = None
+    gc.collect()
+    count, total = node_bytes(ctxt.ast)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KB en Linux
+    print(f'{mode:10} {count:9} nodos  {total / count:6.1f} bytes/nodo  AST {total / 1e6:7.1f} MB'
+          f'  RSS {current_rss() / 1e6:7.1f} MB  RSS máx {peak / 1000:7.1f} MB  análisis {elapsed:6.2f} s')
+
+def main(nodes=1_000_000):
+    for mode in MODES:
+        subprocess.run([sys.executable, __file__, '--measure', mode, str(nodes)], check=True)
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--measure':
+        measure(sys.argv[2], int(sys.argv[3]))
+    else:
+        main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,136 @@
+# bench_constants.py
+'''
+Constantes y tipos canónicos en un programa con muchos literales
+(programs.literal_table):
+
+  - memoria de los valores de los literales con el pool de constantes de
+    la SymbolTable (un objeto por valor) y sin él (un objeto por token);
+  - comparaciones de tipos del checker: descriptores symbols.Type con
+    "is" frente a los nombres de tipo (str) con "==" que usaba antes
+    (la versión anterior de checkBinaryOperation), y el checker completo.
+
+Comprueba que el AST y los errores del checker son iguales con y sin pool.
+
+    python benchmarks/bench_constants.py [filas]
+'''
+import gc
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mcontext import Context
+from mchecker import SemanticAnalyzer
+from myAST import nodes
+from myAST import ConstExpr
+import programs
+import symbols
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+def literal_bytes(program):
+    values = {}
+    count = 0
+    for node in nodes(program):
+        if node.__class__ is ConstExpr:
+            count += 1
+            values[id(node.value)] = node.value
+    return count, len(values), sum(sys.getsizeof(v) for v in values.values())
+
+def parse(source, pooled):
+    constant = symbols.SymbolTable.constant
+    if not pooled:
+        symbols.SymbolTable.constant = lambda self, value: value
+    try:
+        ctxt = Context(lexer='dfa', parser='rd')
+        ctxt.parse(source)
+    finally:
+        symbols.SymbolTable.constant = constant
+    return ctxt
+
+def check(ctxt):
+    return ctxt.check().errors
+
+class StringChecker(SemanticAnalyzer):
+    def checkBinaryOperation(self, operator, leftType, rightType):
+        # La versión anterior, con los tipos como cadenas
+        numericOps = {'+', '-', '*', '/', '%'}
+        relationalOps = {'<', '>', '<=', '>=', '==', '!='}
+        equalityOps = {'==', '!='}
+        logicalOps = {'AND', 'OR', '&&', '||', '!'}
+
+        if operator in equalityOps:
+            if leftType == 'null' or rightType == 'null':
+                if self.symtable.in_scope(leftType) or self.symtable.in_scope(rightType):
+                    return 'bool'
+                if leftType == 'string' or rightType == 'string':
+                    return 'bool'
+                self.errors.append(f"Error: Invalid comparison between '{leftType}' and '{rightType}'")
+                return None
+        if operator in numericOps:
+            if leftType == 'int' and rightType == 'int':
+                return 'int'
+            elif leftType in {'int', 'float'} and rightType in {'int', 'float'}:
+                return 'float'
+            else:
+                return None
+        elif operator in relationalOps:
+            if leftType in {'int', 'float'} and rightType in {'int', 'float'}:
+                return 'bool'
+            else:
+                return None
+        elif operator in logicalOps:
+            if leftType == 'bool' and rightType == 'bool':
+                return 'bool'
+            else:
+                return None
+        else:
+            return None
+
+def comparisons(check_op, types, ops, n=200_000):
+    def run():
+        result = None
+        for k in range(n):
+            result = check_op(ops[k & 3], types[k & 7], types[(k >> 3) & 7])
+        return result
+    return run
+
+def main(rows=50_000):
+    source = programs.literal_table(rows)
+    pooled = parse(source, True)
+    plain = parse(source, False)
+    ok = pooled.ast == plain.ast
+
+    for label, ctxt in (('sin pool', plain), ('con pool', pooled)):
+        count, distinct, size = literal_bytes(ctxt.ast)
+        print(f'{label:9} {count} literales  {distinct:7} objetos  {size / 1e6:6.2f} MB')
+
+    # Nombres de tipo como los deja el lexer: una cadena nueva por token
+    names = [''.join(name) for name in ('int', 'float', 'bool', 'string') * 2]
+    descriptors = [symbols.TypeTable()[name] for name in names]
+    ops = ['+', '<', '&&', '==']
+    t_str, _ = timed(comparisons(StringChecker(pooled.symbols).checkBinaryOperation, names, ops))
+    t_type, _ = timed(comparisons(SemanticAnalyzer(pooled.symbols).checkBinaryOperation, descriptors, ops))
+    n = 200_000
+    print(f'checkBinaryOperation  cadenas {t_str / n * 1e9:5.0f} ns   descriptores {t_type / n * 1e9:5.0f} ns')
+
+    t_plain, errors_plain = timed(lambda: check(plain))
+    t_pooled, errors_pooled = timed(lambda: check(pooled))
+    ok &= errors_plain == errors_pooled
+    print(f'checker completo  sin pool {t_plain * 1000:7.1f} ms   con pool {t_pooled * 1000:7.1f} ms')
+
+    print('mismo AST y mismos errores:', 'OK' if ok else 'DISTINTO')
+    if not ok:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:2]))
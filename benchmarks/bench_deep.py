@@ -0,0 +1,85 @@
+# bench_deep.py
+'''
+Programas anidados a gran profundidad: una expresión de N operadores, N
+paréntesis anidados y una cadena de N "else if". Comprueba que el parser
+rd los lee sin RecursionError y con el mismo AST y las mismas posiciones
+que SLY, y que el SemanticAnalyzer y MakeDot los recorren (Visitor.visit
+usa una pila explícita) sin reportar errores y con un nodo en el DOT por
+nodo del árbol; el tiempo por nodo se compara con el de un programa plano
+del mismo tamaño.
+
+    python benchmarks/bench_deep.py [profundidad]
+'''
+import dataclasses
+import gc
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mcontext import Context
+from mdot import MakeDot
+from myAST import Node, nodes
+import programs
+
+NODES_PER_FUNCTION = 76     # many_functions(statements=10)
+
+def timed(fn):
+    gc.collect()
+    t0 = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - t0, result
+
+def dot_nodes(dot):
+    return sum(1 for line in dot.body if '[label=' in line and '->' not in line)
+
+def dot_labels(program):
+    # Nodos de myAST más los nodos auxiliares que dibuja MakeDot
+    # (Params/Body, Cond/Then/Else...) para estos programas
+    from myAST import FuncDecl, IfStmt
+    extra = 0
+    for node in nodes(program):
+        if isinstance(node, FuncDecl):
+            extra += 1 + bool(node.params)
+        elif isinstance(node, IfStmt):
+            extra += 2 + bool(node.else_stmt)
+    return extra
+
+def shape(ctxt):
+    # Clase, campos simples, posición y línea de cada nodo, sin recursión
+    out = []
+    for node in nodes(ctxt.ast):
+        values = tuple(str(value) for value in (getattr(node, f.name) for f in dataclasses.fields(node))
+                       if not isinstance(value, (Node, list)))
+        out.append((node.__class__, values, ctxt.spans.get(node), ctxt.parser.line_position(node)))
+    return out
+
+def run(label, source):
+    ctxt = Context(parser='rd')
+    parse, _ = timed(lambda: ctxt.parse(source))
+    sly = Context(parser='sly')
+    sly.parse(source)
+    same = ctxt.ast is not None and shape(ctxt) == shape(sly)
+    count = sum(1 for _ in nodes(ctxt.ast))
+    check, checker = timed(lambda: ctxt.check())
+    maker = MakeDot()
+    dot, _ = timed(lambda: maker.visit(ctxt.ast))
+    ok = same and not checker.errors and dot_nodes(maker.dot) == count + dot_labels(ctxt.ast)
+    print(f'{label:24} {count:8} nodos  rd {parse * 1e6 / count:5.2f} µs/nodo  checker {check * 1e6 / count:5.2f} µs/nodo'
+          f'  DOT {dot * 1e6 / count:5.2f} µs/nodo  {"OK" if ok else "DISTINTO"}')
+    return ok
+
+def main(depth=100_000):
+    print(f'límite de recursión de Python: {sys.getrecursionlimit()}')
+    ok = run(f'expresión de {depth}', programs.long_expression(depth))
+    ok &= run(f'{depth} paréntesis', programs.nested_parentheses(depth))
+    ok &= run(f'{depth} else if', programs.else_if_ladder(depth))
+    ok &= run('plano', programs.many_functions(functions=max(1, 2 * depth // NODES_PER_FUNCTION), statements=10))
+    print('programas profundos sin errores:', 'OK' if ok else 'DISTINTO')
+    if not ok:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,89 @@
+# bench_diagnostics.py
+'''
+Costo de ubicar un diagnóstico: línea, columna y texto de la línea de un
+nodo, en un archivo con líneas largas y muchos nodos. Compara recorrer el
+código fuente carácter a carácter hasta los saltos de línea (la versión
+original de Context.error, sólo para str), buscarlos con rfind/find y la
+búsqueda binaria en el LineIndex que rellena el lexer.
+
+    python benchmarks/bench_diagnostics.py [funciones] [expresiones por línea]
+'''
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mcontext import Context
+from myAST import nodes
+
+def long_lines(functions, width):
+    lines = []
+    for f in range(functions):
+        lines.append(f'int f{f}(int x) {{')
+        lines.append('  int y = ' + ' + '.join(f'x * {k}' for k in range(width)) + ';')
+        lines.append('  return y;')
+        lines.append('}')
+    lines.append('int main() {')
+    lines.append('  return 0;')
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+def walk(ctxt, node):
+    # Versión original: carácter a carácter desde el nodo
+    lineno = ctxt.parser.line_position(node)
+    (start, end) = (part_start, part_end) = ctxt.parser.index_position(node)
+    while start >= 0 and ctxt.source[start] != '\n':
+        start -= 1
+    start += 1
+    while end < len(ctxt.source) and ctxt.source[end] != '\n':
+        end += 1
+    return lineno, part_start - start, ctxt.source[start:end]
+
+def scan(ctxt, node):
+    # Como antes: posiciones del parser y saltos de línea alrededor del nodo
+    lineno = ctxt.parser.line_position(node)
+    part_start, part_end = ctxt.parser.index_position(node)
+    start = ctxt.source.rfind('\n', 0, part_start) + 1
+    end = ctxt.source.find('\n', part_end)
+    if end < 0:
+        end = len(ctxt.source)
+    return lineno, part_start - start, ctxt.source[start:end]
+
+def indexed(ctxt, node):
+    part_start, part_end = ctxt.spans[node]
+    lineno, column = ctxt.lines.locate(part_start)
+    start, end = ctxt.lines.bounds(lineno, len(ctxt.source))
+    return lineno, column, ctxt.source[start:end]
+
+def measure(ctxt, locate, targets):
+    t0 = time.perf_counter()
+    results = [locate(ctxt, node) for node in targets]
+    return results, time.perf_counter() - t0
+
+def main(functions=200, width=200):
+    source = long_lines(functions, width)
+    with tempfile.NamedTemporaryFile('w', suffix='.mc', delete=False) as f:
+        f.write(source)
+    try:
+        for label, load in (('str', lambda c: c.parse(source)), ('MappedSource', lambda c: c.parse_file(f.name))):
+            ctxt = Context()
+            load(ctxt)
+            # Sólo nodos de una línea: el método anterior mostraba todas las del nodo
+            targets = [n for n in nodes(ctxt.ast) if ctxt.lines.line(ctxt.spans[n][1]) == ctxt.lines.line(ctxt.spans[n][0])]
+            new, new_time = measure(ctxt, indexed, targets)
+            row = f'{label:12} {len(targets)} nodos  LineIndex {new_time * 1e6 / len(targets):6.2f} µs'
+            methods = (('rfind/find', scan), ('carácter a carácter', walk)) if label == 'str' else (('rfind/find', scan),)
+            for name, locate in methods:
+                old, old_time = measure(ctxt, locate, targets)
+                row += f'  {name} {old_time * 1e6 / len(targets):8.2f} µs{"" if old == new else " (DISTINTO)"}'
+            print(row)
+            if hasattr(ctxt.source, 'close'):
+                ctxt.source.close()
+    finally:
+        os.unlink(f.name)
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,102 @@
+# bench_dispatch.py
+'''
+Costo del despacho de Visitor.visit por nodo: la tabla por clase de
+myAST.VisitorMeta frente a multimethod (multimeta, como era antes) y a
+getattr('visit' + nombre de la clase).
+
+Cada visitante tiene un método trivial por clase de nodo, así que lo
+medido es casi sólo el despacho, sobre todos los nodos de un programa de
+N nodos. Comprueba que los tres cuentan lo mismo y que una clase sin
+método falla con TypeError.
+
+    python benchmarks/bench_dispatch.py [nodos]
+'''
+import gc
+import os
+import sys
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from multimethod import multimeta
+
+from marena import KINDS
+from mcontext import Context
+from myAST import nodes
+import myAST
+import programs
+
+NODES_PER_FUNCTION = 76     # many_functions(statements=10)
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+def trivial(cls):
+    def visit(self, node):
+        self.count += 1
+    visit.__annotations__ = {'node': cls}
+    return visit
+
+def body(ns):
+    ns['count'] = 0
+    for cls in KINDS:
+        ns['visit'] = trivial(cls)
+
+def multimethod_visitor():
+    return types.new_class('MultiVisitor', (), {'metaclass': multimeta}, body)()
+
+def table_visitor():
+    return types.new_class('TableVisitor', (myAST.Visitor,), {}, body)()
+
+def getattr_visitor():
+    class GetattrVisitor:
+        count = 0
+        def visit(self, node):
+            return getattr(self, 'visit' + node.__class__.__name__)(node)
+    for cls in KINDS:
+        setattr(GetattrVisitor, 'visit' + cls.__name__, trivial(cls))
+    return GetattrVisitor()
+
+def run(visitor, all_nodes):
+    visitor.count = 0
+    visit = visitor.visit
+    for node in all_nodes:
+        visit(node)
+    return visitor.count
+
+def main(nodes_=200_000):
+    source = programs.many_functions(functions=max(1, nodes_ // NODES_PER_FUNCTION), statements=10)
+    ctxt = Context(lexer='dfa', parser='rd')
+    ctxt.parse(source)
+    all_nodes = list(nodes(ctxt.ast))
+    count = len(all_nodes)
+    print(f'{count} nodos')
+
+    results = {}
+    for label, make in (('multimethod', multimethod_visitor),
+                        ('getattr', getattr_visitor),
+                        ('tabla (VisitorMeta)', table_visitor)):
+        visitor = make()
+        elapsed, results[label] = timed(lambda: run(visitor, all_nodes))
+        print(f'{label:20} {elapsed * 1000:8.1f} ms  {elapsed / count * 1e9:6.0f} ns/visita')
+
+    ok = set(results.values()) == {count}
+    try:
+        table_visitor().visit(object())
+        ok = False
+    except TypeError as e:
+        print('clase sin método:', e)
+    print('mismo número de visitas:', 'OK' if ok else 'DISTINTO')
+    if not ok:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,82 @@
+# bench_dot.py
+'''
+DOT de programas de N nodos: MakeDot con un graphviz.Digraph en memoria
+(lo que hacía mc.py --dot) frente a MakeDot escribiendo cada línea en un
+archivo mientras recorre el AST (mdot.DotWriter / write_dot).
+
+Para cada tamaño se mide el tiempo y la memoria máxima asignada durante
+la generación (tracemalloc, en una pasada aparte), y se comprueba que el
+archivo es idéntico a Digraph.source. El Digraph sólo se prueba hasta
+DIGRAPH_LIMIT nodos; el tiempo por nodo del flujo debe mantenerse.
+
+    python benchmarks/bench_dot.py [nodos ...]
+'''
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mcontext import Context
+from mdot import MakeDot, write_dot
+from myAST import nodes
+import programs
+
+NODES_PER_FUNCTION = 76     # many_functions(statements=10)
+DIGRAPH_LIMIT = 300_000
+
+def digraph(program):
+    maker = MakeDot()
+    for stmt in program.stmts:
+        maker.visit(stmt)
+    return maker.dot.source
+
+def stream(program, path):
+    with open(path, 'w') as out:
+        write_dot(program, out)
+
+def measure(fn):
+    gc.collect()
+    t0 = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - t0
+    result = None
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+def main(*sizes):
+    sizes = sizes or (10_000, 100_000, 1_000_000)
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'ast.dot')
+        for size in sizes:
+            source = programs.many_functions(functions=max(1, size // NODES_PER_FUNCTION), statements=10)
+            ctxt = Context(lexer='dfa', parser='rd')
+            ctxt.parse(source)
+            count = sum(1 for _ in nodes(ctxt.ast))
+            t_stream, m_stream = measure(lambda: stream(ctxt.ast, path))
+            line = (f'{count:8} nodos  flujo {t_stream:6.2f} s ({t_stream / count * 1e6:5.2f} µs/nodo, '
+                    f'{m_stream / 1e6:6.1f} MB)')
+            if count <= DIGRAPH_LIMIT:
+                t_graph, m_graph = measure(lambda: digraph(ctxt.ast))
+                with open(path) as f:
+                    same = f.read() == digraph(ctxt.ast)
+                ok &= same
+                line += (f'   Digraph {t_graph:6.2f} s ({t_graph / count * 1e6:5.2f} µs/nodo, '
+                         f'{m_graph / 1e6:6.1f} MB)  {"igual" if same else "DISTINTO"}')
+            print(line)
+            ctxt = None
+    print('mismo DOT que el Digraph:', 'OK' if ok else 'DISTINTO')
+    if not ok:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,142 @@
+# bench_format.py
+'''
+Cadenas de formato compiladas (mformat.py) en un programa con N printf y
+sprintf que reutilizan unos pocos formatos (programs.printf_heavy):
+
+  - checker: la versión anterior de visit(PrintStmt)/visit(SPrintStmt), que
+    vuelve a buscar los especificadores con re.findall en cada sentencia,
+    frente a la plantilla compilada una vez por cadena;
+  - ejecución: dar formato analizando la cadena en cada llamada (como
+    hacía el builtin format) frente a FormatTemplate.render.
+
+Comprueba que los errores del checker son los mismos y que el texto es el
+que da el formato de Python con los escapes ya traducidos.
+
+    python benchmarks/bench_format.py [sentencias]
+'''
+import gc
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mcontext import Context
+from mchecker import SemanticAnalyzer
+from mformat import SPECIFIER_TO_TYPE, FormatTemplate, compile_format, unescape
+from myAST import PrintStmt, SPrintStmt
+from symbols import STRING, VOID
+import programs
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+class RegexChecker(SemanticAnalyzer):
+    # La versión anterior: re.findall en cada sentencia
+    def visit(self, node: PrintStmt):
+        formatSpecifiers = re.findall(r'%[-+#0]*\d*(?:\.\d+)?[diuoxXfFeEgGaAcs]', node.format_string)
+        num_specifers = len(formatSpecifiers)
+        num_args = len(node.args_list)
+        if num_specifers != num_args:
+            self.errors.append(f"Error: Expected {num_specifers} arguments, found {num_args}")
+            return
+        for i, (specifier, arg) in enumerate(zip(formatSpecifiers, node.args_list)):
+            specifier_key = specifier[-1]
+            expected_type = SPECIFIER_TO_TYPE.get(specifier_key, None)
+            if expected_type is None:
+                self.errors.append(f"Error: Invalid format specifier '{specifier}'")
+                continue
+            arg_type = yield arg
+            if arg_type is not expected_type:
+                self.errors.append(f"Error: Argument {i+1} must be of type '{expected_type}', found '{arg_type}'")
+        return VOID
+
+    def visit(self, node: SPrintStmt):
+        buffer_name = node.buffer.ident
+        if not self.symtable.in_scope(buffer_name):
+            self.errors.append(f"Error: Buffer '{buffer_name}' not declared")
+            return
+        bufferType = self.lookup(buffer_name)
+        if bufferType is not STRING:
+            self.errors.append(f"Error: Buffer '{buffer_name}' must be of type 'string', found '{bufferType}'")
+        formatSpecifiers = re.findall(r'%[-+#0]*\d*(?:\.\d+)?[diuoxXfFeEgGaAcs]', node.format_string)
+        num_specifiers = len(formatSpecifiers)
+        num_args = len(node.args_list)
+        if num_specifiers != num_args:
+            self.errors.append(f"Error: Expected {num_specifiers} arguments, found {num_args}")
+            return
+        for i, (specifier, arg) in enumerate(zip(formatSpecifiers, node.args_list)):
+            specifier_key = specifier[-1]
+            expected_type = SPECIFIER_TO_TYPE.get(specifier_key, None)
+            if expected_type is None:
+                self.errors.append(f"Error: Invalid format specifier '{specifier}'")
+                continue
+            arg_type = yield arg
+            if arg_type is not expected_type:
+                self.errors.append(f"Error: Argument {i+1} must be of type '{expected_type}', found '{arg_type}'")
+        return VOID
+
+def check(ctxt, cls):
+    checker = cls(ctxt.symbols)
+    checker.visit(ctxt.ast)
+    return checker.errors
+
+VALUES = {'i': 42, 'f': 3.5, 's': 'item'}
+
+def parse_each_call(calls):
+    # Como el builtin format antes: la cadena se analiza en cada llamada
+    def run():
+        out = []
+        for fmt, args in calls:
+            if len(re.findall(r'%[-+#0]*\d*(?:\.\d+)?[diuoxXfFeEgGaAcs]', fmt)) != len(args):
+                raise ValueError(fmt)
+            out.append(unescape(fmt) % args)
+        return out
+    return run
+
+def uncached(calls):
+    return lambda: [FormatTemplate(fmt).render(args) for fmt, args in calls]
+
+def compiled(calls):
+    return lambda: [compile_format(fmt).render(args) for fmt, args in calls]
+
+def main(statements=50_000):
+    source = programs.printf_heavy(statements, errors=97)
+    ctxt = Context(lexer='dfa', parser='rd')
+    ctxt.parse(source)
+
+    t_regex, errors_regex = timed(lambda: check(ctxt, RegexChecker))
+    t_template, errors_template = timed(lambda: check(ctxt, SemanticAnalyzer))
+    ok = errors_regex == errors_template and len(errors_template) > 0
+    print(f'{statements} printf/sprintf, {len(errors_template)} errores')
+    print(f'checker  re.findall {t_regex * 1000:8.1f} ms   plantilla {t_template * 1000:8.1f} ms')
+
+    # Las llamadas de un bucle: los formatos de programs.FORMATS como
+    # quedan en el AST (sin comillas, con los escapes sin traducir)
+    calls = []
+    for k in range(statements):
+        fmt, kinds = programs.FORMATS[k % len(programs.FORMATS)]
+        calls.append((fmt[1:-1], tuple(VALUES[kind] for kind in kinds)))
+    expected = None
+    for label, make in (('analizar en cada llamada', parse_each_call),
+                        ('FormatTemplate sin cache', uncached),
+                        ('plantilla compilada', compiled)):
+        elapsed, out = timed(make(calls))
+        expected = out if expected is None else expected
+        ok &= out == expected
+        print(f'{label:26} {elapsed * 1000:8.1f} ms   {elapsed / len(calls) * 1e9:6.0f} ns/llamada')
+
+    print('mismos errores y mismo texto:', 'OK' if ok else 'DISTINTO')
+    if not ok:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,92 @@
+# bench_incheck.py
+'''
+Checker incremental (Context.recheck, mincheck.py) frente a volver a
+revisar todo el programa, tras ediciones en un programa con N funciones
+que leen una global cada una y llaman a la anterior (programs.call_chain):
+
+  - sin cambios: sólo la fase 1 (firmas y globales), el costo fijo;
+  - el cuerpo de 1, 10 y 100 funciones: se revisan sólo ésas;
+  - el tipo de retorno de una función: ella y la que la llama;
+  - el tipo de una variable global: las funciones que la leen.
+
+Cada edición se aplica con Context.edit, que conserva los nodos de las
+declaraciones que no toca, sobre el programa que dejó la anterior.
+Comprueba que después de cada una los errores son los del checker
+completo.
+
+    python benchmarks/bench_incheck.py [funciones]
+'''
+import gc
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mcontext import Context
+from mchecker import SemanticAnalyzer
+import programs
+
+GLOBALS = 100
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+def full(ctxt):
+    checker = SemanticAnalyzer(ctxt.symbols)
+    checker.visit(ctxt.ast)
+    return checker.errors
+
+def replace(ctxt, old, new):
+    start = ctxt.source.index(old)
+    ctxt.edit(start, start + len(old), new)
+
+def body_edits(count, functions, offset):
+    # La primera sentencia de count funciones repartidas por el programa;
+    # con otro offset, otras funciones
+    step = max(1, functions // count)
+    return [(f'int f{f}() {{\n  int y = g{f % GLOBALS};',
+             f'int f{f}() {{\n  int y = g{f % GLOBALS} + 1;') for f in range(offset, functions, step)[:count]]
+
+def main(functions=20_000):
+    ctxt = Context(lexer='dfa', parser='rd')
+    ctxt.parse(programs.call_chain(functions, statements=10, globals_=GLOBALS))
+    t_full, _ = timed(lambda: full(ctxt))
+    t0 = time.perf_counter()
+    ctxt.recheck()
+    t_first = time.perf_counter() - t0
+    print(f'{functions} funciones: checker completo {t_full * 1000:8.1f} ms'
+          f'   primera revisión incremental {t_first * 1000:8.1f} ms')
+
+    middle = functions // 2
+    cases = [('sin cambios', [])]
+    for offset, count in enumerate((1, 10, 100), 1):
+        cases.append((f'cuerpo de {count} función(es)', body_edits(count, functions, offset)))
+    cases.append(('tipo de retorno de una función', [(f'int f{middle}() {{', f'float f{middle}() {{')]))
+    cases.append(('tipo de una global', [('int g7 = 7;', 'float g7 = 7.0;')]))
+
+    ok = True
+    for label, edits in cases:
+        for old, new in edits:
+            replace(ctxt, old, new)
+        gc.collect()
+        t0 = time.perf_counter()
+        errors = ctxt.recheck()
+        elapsed = time.perf_counter() - t0
+        ok &= errors == full(ctxt)
+        print(f'{label:32} {ctxt.checker.rechecked:6} revisadas   {elapsed * 1000:8.1f} ms'
+              f'   {elapsed / t_full * 100:5.1f}% del completo')
+
+    print('mismos errores que el checker completo:', 'OK' if ok else 'DISTINTO')
+    if not ok:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:2]))
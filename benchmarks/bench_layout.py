@@ -0,0 +1,118 @@
+# bench_layout.py
+'''
+Búsqueda de métodos y constructores con la disposición de las clases
+(mlayout.ClassLayout) frente al recorrido de ClassDecl.body que hacía el
+checker (la versión anterior de find_method y findConstructor), en
+programas con muchas clases y miles de llamadas a métodos
+(programs.class_heavy):
+
+  - sin herencia, con M métodos por clase;
+  - con cadenas de herencia de 5 niveles, la mayoría de las llamadas a
+    métodos heredados.
+
+Mide el checker completo, el costo de cada búsqueda y el de armar las
+disposiciones. Comprueba que los errores del checker son los mismos y que
+cada llamada encuentra el método de la clase más derivada que lo define.
+
+    python benchmarks/bench_layout.py [métodos]
+'''
+import gc
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mcontext import Context
+from mchecker import SemanticAnalyzer
+from mlayout import class_layouts
+from myAST import ClassDecl, FuncDecl
+import programs
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+class ScanChecker(SemanticAnalyzer):
+    # La versión anterior: recorre el cuerpo de la clase en cada llamada
+    def findConstructor(self, class_decl, class_name):
+        for member in class_decl.body:
+            if isinstance(member, FuncDecl) and member.ident == class_name:
+                return member
+        return None
+
+    def find_method(self, class_decl, method_name):
+        for member in class_decl.body:
+            if isinstance(member, FuncDecl) and member.ident == method_name:
+                return member
+            if class_decl.super_class:
+                super_class_decl = self.lookupClass(class_decl.super_class)
+                if super_class_decl:
+                    return self.find_method(super_class_decl, method_name)
+        return None
+
+def check(ctxt, cls):
+    checker = cls(ctxt.symbols)
+    checker.visit(ctxt.ast)
+    return checker.errors
+
+def expected_method(decls, cls, name):
+    # El método name de la clase más derivada de la cadena que lo define
+    while cls is not None:
+        for member in cls.body:
+            if isinstance(member, FuncDecl) and member.ident == name:
+                return member
+        cls = decls.get(cls.super_class)
+    return None
+
+def lookups(find, pairs, n=100_000):
+    def run():
+        result = None
+        for k in range(n):
+            decl, name = pairs[k % len(pairs)]
+            result = find(decl, name)
+        return result
+    return run
+
+def main(methods=50):
+    ok = True
+    for label, depth in (('sin herencia', 1), ('herencia de 5 niveles', 5)):
+        ctxt = Context(lexer='dfa', parser='rd')
+        ctxt.parse(programs.class_heavy(classes=200, methods=methods, calls=20, depth=depth))
+        decls = {decl.ident: decl for decl in ctxt.ast.stmts if isinstance(decl, ClassDecl)}
+        print(f'{label}: {len(decls)} clases, {len(decls) * 20} llamadas a métodos')
+
+        t_scan, errors_scan = timed(lambda: check(ctxt, ScanChecker))
+        t_layout, errors_layout = timed(lambda: check(ctxt, SemanticAnalyzer))
+        ok &= errors_scan == errors_layout
+        print(f'  checker  recorrido {t_scan * 1000:8.1f} ms   disposición {t_layout * 1000:8.1f} ms')
+
+        t_build, layouts = timed(lambda: class_layouts(ctxt.ast))
+        pairs = [(decl, f'm{m}') for decl in decls.values() for m in range(methods)]
+        for decl, name in pairs:
+            ok &= layouts[decl.ident].method(name) is expected_method(decls, decl, name)
+
+        scan = ScanChecker(ctxt.symbols)
+        new = SemanticAnalyzer(ctxt.symbols)
+        scan.visit(ctxt.ast)
+        new.visit(ctxt.ast)
+        # Después de visitar el programa los ámbitos están cerrados: se
+        # buscan las clases en el global, como desde main
+        n = 100_000
+        t_old, _ = timed(lookups(scan.find_method, pairs, n))
+        t_new, _ = timed(lookups(new.find_method, pairs, n))
+        print(f'  find_method  recorrido {t_old / n * 1e9:6.0f} ns   disposición {t_new / n * 1e9:6.0f} ns'
+              f'   (armar las disposiciones {t_build * 1000:.1f} ms)')
+
+    print('mismos errores y métodos correctos:', 'OK' if ok else 'DISTINTO')
+    if not ok:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:2]))
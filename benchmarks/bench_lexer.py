@@ -0,0 +1,75 @@
+# bench_lexer.py
+'''
+Compara el lexer de SLY con el lexer DFA (dfalexer.py).
+
+Primero comprueba que ambos producen el mismo flujo de tokens
+(type, value, lineno, index) para todos los archivos de scripts/ y
+errors/; después mide el rendimiento en tokens por segundo sobre una
+entrada de varios MB.
+
+    python benchmarks/bench_lexer.py [MB]
+'''
+import contextlib
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lexer import Lexer
+from dfalexer import DFALexer
+
+def sources():
+    for directory in ('scripts', 'errors'):
+        path = os.path.join(ROOT, directory)
+        for name in sorted(os.listdir(path)):
+            with open(os.path.join(path, name)) as f:
+                yield f'{directory}/{name}', f.read()
+
+def token_stream(lexer, source):
+    # Los errores léxicos se imprimen; se capturan para compararlos también
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        tokens = [(t.type, t.value, t.lineno, t.index) for t in lexer.tokenize(source)]
+    return tokens, out.getvalue()
+
+def check_parity():
+    failures = 0
+    for name, source in sources():
+        expected = token_stream(Lexer(), source)
+        got = token_stream(DFALexer(), source)
+        if expected != got:
+            failures += 1
+            print(f'MISMATCH {name}')
+    return failures
+
+def throughput(lexer_class, source, repeat=3):
+    best = None
+    for _ in range(repeat):
+        lexer = lexer_class()
+        t0 = time.perf_counter()
+        count = sum(1 for _ in lexer.tokenize(source))
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return count, count / best
+
+def main(megabytes=2.0):
+    failures = check_parity()
+    if failures:
+        print(f'{failures} archivos con tokens distintos')
+        raise SystemExit(1)
+    print('paridad: OK (scripts/ y errors/)')
+
+    # Entrada grande: los scripts válidos repetidos
+    sample = ''.join(source + '\n' for name, source in sources()
+                     if name.startswith('scripts/') and '#' not in source)
+    source = sample * max(1, int(megabytes * 1_000_000 / len(sample)))
+    print(f'entrada: {len(source) / 1_000_000:.1f} MB')
+    for lexer_class in (Lexer, DFALexer):
+        count, rate = throughput(lexer_class, source)
+        print(f'{lexer_class.__name__:10} {count:10} tokens {rate:12,.0f} tokens/s')
+
+if __name__ == '__main__':
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 2.0)
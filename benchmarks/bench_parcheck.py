@@ -0,0 +1,78 @@
+# bench_parcheck.py
+'''
+Checker en paralelo (mparcheck.check_parallel) en un programa con N
+funciones de nivel superior (programs.many_functions) y, cada 97, una
+función con errores, para que importe el orden en que se juntan.
+
+Mide el checker en serie, la fase 1 sola (firmas y globales) y
+check_parallel con 1, 2, 4 y 8 procesos, con la aceleración respecto del
+checker en serie. Con menos CPUs que procesos la aceleración no puede
+pasar del número de CPUs. Comprueba que los errores son los mismos y en
+el mismo orden.
+
+    python benchmarks/bench_parcheck.py [funciones]
+'''
+import gc
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mcontext import Context
+from mchecker import SemanticAnalyzer
+from mparcheck import SignatureChecker, check_parallel
+import programs
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+def with_errors(source, every=97):
+    # Una función con una variable sin declarar y un retorno de otro tipo
+    # después de cada every funciones
+    out = []
+    for k, function in enumerate(source.split('\n}\n')):
+        out.append(function)
+        if k % every == every - 1:
+            out.append(f'\nint bad{k}(int x) {{\n  int y = missing{k};\n  return "s";')
+    return '\n}\n'.join(out)
+
+def serial(ctxt):
+    checker = SemanticAnalyzer(ctxt.symbols)
+    checker.visit(ctxt.ast)
+    return checker.errors
+
+def signatures(ctxt):
+    checker = SignatureChecker(ctxt.symbols)
+    checker.visit(ctxt.ast)
+    return checker.errors
+
+def main(functions=20_000):
+    ctxt = Context(lexer='dfa', parser='rd')
+    ctxt.parse(with_errors(programs.many_functions(functions, statements=10)))
+
+    t_serial, expected = timed(lambda: serial(ctxt))
+    t_phase1, _ = timed(lambda: signatures(ctxt))
+    print(f'{len(ctxt.ast.stmts)} declaraciones, {len(expected)} errores, {os.cpu_count()} CPU')
+    print(f'checker en serie       {t_serial * 1000:8.1f} ms')
+    print(f'fase 1 (firmas)        {t_phase1 * 1000:8.1f} ms')
+
+    ok = len(expected) > 0
+    for workers in (1, 2, 4, 8):
+        elapsed, errors = timed(lambda: check_parallel(ctxt.ast, ctxt.symbols, workers))
+        ok &= errors == expected
+        print(f'{workers} proceso(s)            {elapsed * 1000:8.1f} ms   x{t_serial / elapsed:5.2f}')
+
+    print('mismos errores en el mismo orden:', 'OK' if ok else 'DISTINTO')
+    if not ok:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,138 @@
+# bench_parsecache.py
+'''
+Cache persistente de análisis (mparsecache.py): análisis completo frente a
+leer la entrada de la cache, para código fuente en memoria y para archivos.
+
+Además comprueba que:
+  - el AST, las posiciones de todos los nodos, el índice de líneas y los
+    tokens que devuelve la cache son los de un análisis completo, y que los
+    identificadores quedan internados en la tabla de la compilación;
+  - cambiar un carácter del código fuente es un fallo, no un acierto;
+  - varios procesos escribiendo y leyendo las mismas entradas a la vez no
+    dejan entradas corruptas;
+  - con un límite de tamaño pequeño se desalojan las entradas más antiguas.
+
+    python benchmarks/bench_parsecache.py [funciones]
+'''
+import dataclasses
+import gc
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mcontext import Context
+from mparsecache import ParseCache
+from myAST import nodes
+import programs
+
+WRITERS = 4
+# (lexer, parser): la configuración por defecto de mc.py y la más rápida
+ENGINES = (('sly', 'sly'), ('dfa', 'rd'))
+
+def snapshot(ctxt):
+    ast_nodes = list(nodes(ctxt.ast))
+    tokens = list(ctxt.tokens.columns()) if ctxt.tokens is not None else None
+    return ctxt.ast, [ctxt.spans.get(n) for n in ast_nodes], ctxt.lines.starts, tokens
+
+def interned(ctxt):
+    # Todo identificador del AST es el Symbol de la tabla de la compilación
+    for node in nodes(ctxt.ast):
+        for f in dataclasses.fields(node):
+            value = getattr(node, f.name)
+            if hasattr(value, 'text') and ctxt.symbols.intern(value.text) is not value:
+                return False
+    return True
+
+def timed(load, repeat=3):
+    best = float('inf')
+    ctxt = None
+    for _ in range(repeat):
+        # Liberar el AST anterior no cuenta
+        ctxt = None
+        gc.collect()
+        t0 = time.perf_counter()
+        ctxt = load()
+        best = min(best, time.perf_counter() - t0)
+    return best, ctxt
+
+def writer(directory, sources, rounds):
+    cache = ParseCache(directory)
+    for _ in range(rounds):
+        for source in sources:
+            ctxt = Context(lexer='dfa', parser='rd', cache=cache)
+            ctxt.parse(source)
+    cache.flush_stats()
+
+def main(functions=1000):
+    directory = tempfile.mkdtemp(prefix='parsecache')
+    ok = True
+    try:
+        source = programs.many_functions(functions=functions, statements=10)
+        with open(os.path.join(directory, 'prog.mc'), 'w') as f:
+            f.write(source)
+        print(f'{source.count(chr(10))} líneas, {len(source) / 1e6:.1f} MB')
+
+        for label, load in (('str', lambda c: c.parse(source)), ('archivo', lambda c: c.parse_file(f.name))):
+            for lexer, parser in ENGINES:
+                for buffered in (False, True):
+                    cache = ParseCache(os.path.join(directory, f'{label}-{lexer}-{parser}-{buffered}'))
+                    def parse(cache):
+                        ctxt = Context(lexer=lexer, parser=parser, buffered=buffered, cache=cache)
+                        load(ctxt)
+                        return ctxt
+                    full, ref = timed(lambda: parse(None))
+                    parse(cache)
+                    warm, hit = timed(lambda: parse(cache))
+                    same = snapshot(hit) == snapshot(ref) and interned(hit)
+                    ok &= same and cache.hits == 3
+                    print(f'{label:8} {lexer}/{parser:3} tokens={str(buffered):5}  análisis {full * 1000:8.1f} ms'
+                          f'  cache {warm * 1000:7.1f} ms  ({full / warm:4.1f}x)  {"OK" if same else "DISTINTO"}')
+
+        # Cualquier cambio del código fuente es otra entrada
+        cache = ParseCache(os.path.join(directory, 'str-sly-sly-False'))
+        ctxt = Context(cache=cache)
+        ctxt.parse(source.replace('int y = x;', 'int y = x ;', 1))
+        ok &= cache.misses == 1 and cache.hits == 0
+
+        # Escritores concurrentes sobre las mismas entradas
+        shared = os.path.join(directory, 'shared')
+        sources = [programs.many_functions(functions=50 + k, statements=5) for k in range(8)]
+        procs = [multiprocessing.Process(target=writer, args=(shared, sources, 3)) for _ in range(WRITERS)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        cache = ParseCache(shared)
+        totals = cache.totals()
+        intact = all(cache.load(cache.key(s.encode('utf-8'))) is not None for s in sources)
+        leftovers = [name for name in os.listdir(shared) if name.endswith('.tmp')]
+        ok &= intact and not leftovers and totals['errors'] == 0 and all(p.exitcode == 0 for p in procs)
+        print(f'{WRITERS} procesos concurrentes: {cache.report(totals)}; entradas intactas: {"OK" if intact else "NO"}')
+
+        # Desalojo: límite de unas tres entradas
+        small = ParseCache(os.path.join(directory, 'small'))
+        ctxt = Context(cache=small)
+        ctxt.parse(sources[0])
+        small.max_bytes = small.size() * 3
+        for s in sources:
+            Context(cache=small).parse(s)
+            time.sleep(0.01)    # fechas de uso distintas
+        kept = small.size() <= small.max_bytes and small.evictions > 0
+        newest = small.load(small.key(sources[-1].encode('utf-8'))) is not None
+        ok &= kept and newest
+        print(f'desalojo: {small.evictions} entradas, {small.size()} de {small.max_bytes} bytes: {"OK" if kept and newest else "NO"}')
+    finally:
+        shutil.rmtree(directory)
+
+    print('cache igual que el análisis completo:', 'OK' if ok else 'DISTINTO')
+    if not ok:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,166 @@
+# bench_parser.py
+'''
+Parser LALR de SLY frente al parser de descenso recursivo (rdparser).
+
+Primero comprueba la paridad: mismo AST, mismas posiciones de cada nodo y
+mismos errores de sintaxis en todos los archivos de scripts/ y errors/,
+en los programas de programs.py y en programas aleatorios que recorren
+toda la gramática. Después mide el análisis sintáctico sobre tokens ya
+lexeados, para no contar el lexer.
+
+    python benchmarks/bench_parser.py [repeticiones]
+'''
+import dataclasses
+import glob
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lexer import Lexer
+from parser import Parser
+from rdparser import RDParser
+from myAST import Node
+import programs
+
+TYPES = ['int', 'float', 'bool', 'string']
+
+def random_expr(rnd, depth):
+    if depth <= 0 or rnd.random() < 0.2:
+        return rnd.choice(['x', 'y1', '42', '3.5', 'true', 'false', '"s"', 'null',
+                           'a[i]', 'a.size', 'o.m(x, 1)', 'f(x)', 'f()'])
+    e = lambda: random_expr(rnd, depth - 1)
+    return rnd.choice([
+        lambda: f'{e()} {rnd.choice(["||", "&&", "==", "!=", "<", "<=", ">", ">=", "+", "-", "*", "/", "%"])} {e()}',
+        lambda: f'{rnd.choice(["-", "+", "!", "++", "--"])}{e()}',
+        lambda: f'{e()}{rnd.choice(["++", "--"])}',
+        lambda: f'({e()})',
+        lambda: f'({rnd.choice(TYPES)}) {e()}',
+    ])()
+
+def random_assignment(rnd, depth):
+    target = rnd.choice(['x', 'a[i + 1]'])
+    op = rnd.choice(['=', '+=', '-=', '*=', '/=']) if target == 'x' else '='
+    if rnd.random() < 0.3:
+        return f'{target} {op} {random_assignment(rnd, depth)}'
+    return f'{target} {op} {random_expr(rnd, depth)}'
+
+def random_stmt(rnd, depth):
+    e = lambda: random_expr(rnd, 3)
+    s = lambda: random_stmt(rnd, depth - 1) if depth > 0 else 'x = 1;'
+    return rnd.choice([
+        lambda: f'{random_assignment(rnd, 3)};',
+        lambda: f'{e()};',
+        lambda: f'a[{e()}] {rnd.choice(["+", "<", "&&"])} {e()};',
+        lambda: f'if ({e()}) {s()}',
+        lambda: f'if ({e()}) {s()} else {s()}',
+        lambda: f'while ({e()}) {s()}',
+        lambda: f'for ({rnd.choice(["int i = 0", "i = 0", "", "int b[3]", "float k"])}; '
+                f'{rnd.choice(["i < 10", ""])}; {rnd.choice(["i++", "i += 2", ""])}) {{ {s()} }}',
+        lambda: f'{{ {s()} {rnd.choice(TYPES)} z = {e()}; {s()} }}',
+        lambda: f'return {e()};',
+        lambda: 'return;',
+        lambda: 'break;',
+        lambda: 'continue;',
+        lambda: 'this;',
+        lambda: f'super(, {e()}, {e()});',
+        lambda: f'printf("%d", {e()}, {e()});',
+        lambda: 'printf("x");',
+        lambda: f'sprintf(buf, "%s", {e()});',
+        lambda: 'sprintf(buf, "x");',
+        lambda: 'Foo obj;',
+        lambda: f'Foo obj = new Foo({e()});',
+    ])()
+
+def random_program(rnd, decls=20):
+    lines = []
+    for k in range(decls):
+        body = ' '.join(random_stmt(rnd, 3) for _ in range(rnd.randint(1, 5)))
+        lines.append(rnd.choice([
+            f'int g{k} = {random_expr(rnd, 3)};',
+            f'float arr{k}[{random_expr(rnd, 1)}];',
+            f'Foo obj{k};',
+            f'void f{k}(int a, float b[4]) {{ {body} }}',
+            f'int h{k}(, int a) {{ {body} }}',
+            f'class C{k} {{ public: int v; C{k}(int a) {{ {body} }} private: bool m() {{ {body} }} }};',
+        ]))
+    return '\n'.join(lines) + '\n'
+
+def positions(parser, node, acc):
+    if isinstance(node, list):
+        for item in node:
+            positions(parser, item, acc)
+    elif isinstance(node, Node):
+        acc.append((parser.line_position(node), parser.index_position(node)))
+        for f in dataclasses.fields(node):
+            positions(parser, getattr(node, f.name), acc)
+    return acc
+
+def run(parser_class, tokens):
+    parser = parser_class()
+    errors = []
+    parser.error = lambda tok: errors.append(None if tok is None else (tok.type, tok.lineno, tok.index))
+    ast = parser.parse(iter(tokens))
+    return ast, errors, positions(parser, ast, []) if ast else None
+
+def check(name, source):
+    tokens = list(Lexer().tokenize(source))
+    if run(Parser, tokens) != run(RDParser, tokens):
+        print(f'DISTINTO: {name}')
+        return False
+    return True
+
+def parity():
+    ok = True
+    for path in sorted(glob.glob(os.path.join(ROOT, 'scripts', '*.mc')) + glob.glob(os.path.join(ROOT, 'errors', '*.mc'))):
+        with open(path) as f:
+            ok &= check(os.path.relpath(path, ROOT), f.read())
+    ok &= check('identifier_heavy', programs.identifier_heavy(functions=20))
+    ok &= check('many_functions', programs.many_functions(functions=100))
+    ok &= check('class_heavy', programs.class_heavy(classes=20, methods=5, calls=3))
+    ok &= check('herencia sin superclase', 'class B : { int x; };\nint main() { return 0; }\n')
+    ok &= check('herencia con private', 'class B : private A { int x; };\nint main() { return 0; }\n')
+    rnd = random.Random(0)
+    for i in range(200):
+        source = random_program(rnd)
+        ok &= check(f'aleatorio {i}', source)
+        # Con un token borrado se comparan también los errores y la recuperación
+        lines = source.split('\n')
+        k = rnd.randrange(len(lines))
+        words = lines[k].split(' ')
+        del words[rnd.randrange(len(words))]
+        lines[k] = ' '.join(words)
+        ok &= check(f'aleatorio {i} con error', '\n'.join(lines))
+    print('paridad de AST, posiciones y errores:', 'OK' if ok else 'DISTINTO')
+    return ok
+
+def throughput(repeat):
+    sources = {
+        'identifier_heavy': programs.identifier_heavy(),
+        'many_functions': programs.many_functions(),
+        'aleatorio': ''.join(random_program(random.Random(i)) for i in range(20)),
+    }
+    print(f'{"programa":18} {"tokens":>8} {"sly":>14} {"rd":>14} {"mejora":>7}')
+    for name, source in sources.items():
+        tokens = list(Lexer().tokenize(source))
+        times = {}
+        for label, parser_class in (('sly', Parser), ('rd', RDParser)):
+            best = float('inf')
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                parser_class().parse(iter(tokens))
+                best = min(best, time.perf_counter() - t0)
+            times[label] = best
+        rate = lambda label: f'{len(tokens) / times[label] / 1000:8.0f} ktok/s'
+        print(f'{name:18} {len(tokens):8} {rate("sly"):>14} {rate("rd"):>14} {times["sly"] / times["rd"]:6.2f}x')
+
+def main(repeat=3):
+    if not parity():
+        sys.exit(1)
+    throughput(repeat)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
@@ -0,0 +1,92 @@
+# bench_passes.py
+'''
+Pasadas de mpasses.py sobre un programa de N nodos con expresiones
+constantes (programs.constant_expressions):
+
+  - checker y DOT llamados directamente frente a las pasadas 'check' y
+    'dot' del PassManager (la primera vez y con el resultado guardado);
+  - el plegado de constantes ('fold') y cuánto cambia después el checker;
+  - el informe del PassManager con trace_memory=True (tiempo y memoria
+    por pasada).
+
+Comprueba que las pasadas dan los mismos errores y el mismo DOT que las
+llamadas directas, que 'fold' invalida los resultados guardados y que tras
+plegar el checker da los mismos errores.
+
+    python benchmarks/bench_passes.py [nodos]
+'''
+import gc
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mcontext import Context
+from mdot import write_dot
+from myAST import nodes
+from mpasses import PassManager
+import programs
+
+NODES_PER_FUNCTION = 134    # constant_expressions(statements=10)
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+def parse(source):
+    ctxt = Context(lexer='dfa', parser='rd')
+    ctxt.parse(source)
+    return ctxt
+
+def dot(program):
+    out = io.StringIO()
+    write_dot(program, out)
+    return out.getvalue()
+
+def fresh(ctxt, name):
+    # La pasada sin resultado guardado
+    ctxt.passes.invalidate()
+    return ctxt.passes.get(name)
+
+def main(nodes_=200_000):
+    source = programs.constant_expressions(functions=max(1, nodes_ // NODES_PER_FUNCTION), statements=10)
+    ctxt = parse(source)
+    count = sum(1 for _ in nodes(ctxt.ast))
+    print(f'{count} nodos')
+
+    t_check, errors = timed(lambda: ctxt.check().errors)
+    t_dot, text = timed(lambda: dot(ctxt.ast))
+    t_pcheck, checker = timed(lambda: fresh(ctxt, 'check'))
+    t_pdot, ptext = timed(lambda: fresh(ctxt, 'dot'))
+    ok = checker.errors == errors and ptext == text
+    t_hit, _ = timed(lambda: ctxt.passes.get('check'))
+    print(f'checker  directo {t_check * 1000:8.1f} ms   pasada {t_pcheck * 1000:8.1f} ms   guardado {t_hit * 1e6:6.1f} µs')
+    print(f'DOT      directo {t_dot * 1000:8.1f} ms   pasada {t_pdot * 1000:8.1f} ms')
+
+    # Plegar sobre un Context nuevo: fold modifica el árbol
+    folded = parse(source)
+    manager = folded.passes = PassManager(folded, trace_memory=True)
+    before = manager.get('check')
+    manager.run('fold')
+    ok &= 'check' not in manager.results
+    after = manager.get('check')
+    ok &= after.errors == before.errors
+    manager.run('dot', 'arena', 'check')
+    folded_count = sum(1 for _ in nodes(folded.ast))
+    print(f'fold: {count} -> {folded_count} nodos')
+    print(manager.report())
+
+    print('mismos errores y mismo DOT:', 'OK' if ok else 'DISTINTO')
+    if not ok:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,112 @@
+# bench_render.py
+'''
+Grafos por declaración de mdot.py en un programa de N nodos:
+
+  - DOT de todo el programa frente a un DOT por función (declaration_graphs),
+    sin límites y con max_depth / max_nodes;
+  - dibujo con Graphviz (render_graphs) con 1 y con varios procesos, y una
+    segunda vez con la cache de dibujos ya llena. Sólo si está el programa
+    dot de Graphviz.
+
+Comprueba que los límites no pierden nodos (los dibujados más los de los
+resúmenes son todos los del programa), que con límites que no se alcanzan
+el DOT es el mismo que sin ellos y que al cambiar una función sólo cambia
+el hash de su grafo.
+
+    python benchmarks/bench_render.py [nodos]
+'''
+import gc
+import io
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mcontext import Context
+from mdot import MakeDot, declaration_graphs, render_graphs, render_key, write_dot
+from myAST import nodes
+import programs
+
+NODES_PER_FUNCTION = 76     # many_functions(statements=10)
+SUMMARY = re.compile(r'\.\.\. ([0-9]+) nodes')
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+def parse(source):
+    ctxt = Context(lexer='dfa', parser='rd')
+    ctxt.parse(source)
+    return ctxt.ast
+
+def limited(program, **options):
+    # DOT de todo el programa y nodos dibujados + resumidos
+    out = io.StringIO()
+    maker = MakeDot(out, **options)
+    for decl in program.stmts:
+        maker.visit(decl)
+    maker.close()
+    text = out.getvalue()
+    return text, maker.drawn + sum(int(n) for n in SUMMARY.findall(text))
+
+def plain(program):
+    out = io.StringIO()
+    write_dot(program, out)
+    return out.getvalue()
+
+def main(nodes_=100_000):
+    functions = max(2, nodes_ // NODES_PER_FUNCTION)
+    source = programs.many_functions(functions=functions, statements=10)
+    program = parse(source)
+    count = sum(1 for _ in nodes(program)) - 1     # sin el Program
+    print(f'{count} nodos, {functions} funciones')
+
+    t_all, text = timed(lambda: plain(program))
+    t_split, graphs = timed(lambda: declaration_graphs(program))
+    print(f'un DOT          {t_all * 1000:8.1f} ms')
+    print(f'uno por función {t_split * 1000:8.1f} ms  {len(graphs)} grafos')
+
+    ok = limited(program, max_depth=10**9, max_nodes=10**9)[0] == text
+    for label, options in (('max_depth=3', dict(max_depth=3)),
+                           ('max_nodes=500', dict(max_nodes=500)),
+                           ('max_depth=6', dict(max_depth=6))):
+        elapsed, (dot, seen) = timed(lambda: limited(program, **options))
+        ok &= seen == count
+        print(f'{label:24} {elapsed * 1000:8.1f} ms  {len(dot) / 1e6:6.2f} MB de DOT')
+
+    # Cambiar una función sólo cambia el hash de su grafo
+    keys = [render_key(dot, 'png') for _, dot in graphs]
+    changed = parse(source.replace('int f1(', 'int f1x(', 1))
+    new_keys = [render_key(dot, 'png') for _, dot in declaration_graphs(changed)]
+    ok &= [a != b for a, b in zip(keys, new_keys)].count(True) == 1
+
+    if shutil.which('dot') is None:
+        print('sin el programa dot de Graphviz: no se dibuja')
+    else:
+        small = parse(programs.many_functions(functions=32, statements=10))
+        workers = os.cpu_count() or 1
+        for label, n in (('1 proceso', 1), (f'{workers} procesos', workers)):
+            with tempfile.TemporaryDirectory() as tmp:
+                cache = os.path.join(tmp, 'cache')
+                elapsed, (paths, rendered) = timed(lambda: render_graphs(small, os.path.join(tmp, 'out'), workers=n, cache=cache), repeat=1)
+                print(f'render_graphs {label:12} {elapsed * 1000:8.1f} ms  {rendered} dibujados')
+                elapsed, (paths, rendered) = timed(lambda: render_graphs(small, os.path.join(tmp, 'out'), workers=n, cache=cache), repeat=1)
+                ok &= rendered == 0 and all(os.path.exists(path) for path in paths)
+                print(f'  con la cache llena     {elapsed * 1000:8.1f} ms  {rendered} dibujados')
+
+    print('sin nodos perdidos y mismos grafos:', 'OK' if ok else 'DISTINTO')
+    if not ok:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:2]))
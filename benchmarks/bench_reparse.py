@@ -0,0 +1,76 @@
+# bench_reparse.py
+'''
+Análisis incremental (Context.edit) frente a volver a analizar todo
+(Context.parse) tras ediciones de un carácter en un archivo de ~50k líneas.
+
+Cada edición cambia un dígito, inserta un espacio o borra un espacio en un
+punto al azar. Cada cierto número de ediciones se comprueba que el AST,
+las posiciones de todos los nodos y el índice de líneas coinciden con los
+de un análisis completo del código fuente editado.
+
+    python benchmarks/bench_reparse.py [ediciones] [lexer] [parser]
+'''
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mcontext import Context
+from myAST import nodes
+import programs
+
+CHECK_EVERY = 25
+
+def single_char_edit(rnd, source):
+    kind = rnd.choice(['digit', 'insert', 'delete'])
+    while True:
+        i = rnd.randrange(len(source))
+        if kind == 'digit' and source[i].isdigit():
+            return i, i + 1, str(rnd.randrange(10))
+        if kind == 'insert' and source[i] == ' ':
+            return i, i, ' '
+        if kind == 'delete' and source[i] == ' ' and source[i + 1] == ' ':
+            return i, i + 1, ''
+
+def same_as_full_parse(ctxt, lexer, parser):
+    ref = Context(lexer=lexer, parser=parser)
+    ref.parse(ctxt.source)
+    if ctxt.ast != ref.ast or ctxt.lines.starts != ref.lines.starts:
+        return False
+    return [ctxt.spans[n] for n in nodes(ctxt.ast)] == [ref.spans[n] for n in nodes(ref.ast)]
+
+def main(edits=200, lexer='dfa', parser='rd'):
+    source = programs.many_functions(functions=3570, statements=10)
+    print(f'{source.count(chr(10))} líneas, {len(source) / 1e6:.1f} MB, lexer {lexer}, parser {parser}')
+
+    ctxt = Context(lexer=lexer, parser=parser)
+    t0 = time.perf_counter()
+    ctxt.parse(source)
+    full = time.perf_counter() - t0
+    print(f'análisis completo: {full * 1000:9.1f} ms')
+
+    rnd = random.Random(0)
+    times = []
+    ok = True
+    for k in range(edits):
+        start, end, text = single_char_edit(rnd, ctxt.source)
+        t0 = time.perf_counter()
+        ctxt.edit(start, end, text)
+        times.append(time.perf_counter() - t0)
+        if k % CHECK_EVERY == 0:
+            ok &= same_as_full_parse(ctxt, lexer, parser)
+    ok &= same_as_full_parse(ctxt, lexer, parser)
+
+    times.sort()
+    median = times[len(times) // 2]
+    print(f'edición incremental: mediana {median * 1000:7.2f} ms, p95 {times[int(len(times) * 0.95)] * 1000:7.2f} ms'
+          f'  ({full / median:.0f}x más rápido)')
+    print('igual que el análisis completo:', 'OK' if ok else 'DISTINTO')
+    if not ok:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200, *sys.argv[2:4])
@@ -0,0 +1,213 @@
+# bench_resolve.py
+'''
+Acceso a variables por dirección (mresolve.py) frente a buscar el nombre,
+en funciones con muchos identificadores y bloques anidados
+(programs.identifier_heavy con profundidad N).
+
+Cada entorno es una subclase de Resolver que recorre el programa con los
+mismos ámbitos y cambia sólo enter/leave/declare/reference:
+
+  - ChainMap: un hijo por ámbito y búsqueda del nombre en la cadena (el
+    entorno que tenía el checker);
+  - ScopedTable: la pila de declaraciones por id de símbolo que usa ahora;
+  - marcos: una lista por ámbito, del tamaño que da la resolución, y
+    frames[-1 - depth][slot] en cada referencia.
+
+El costo del entorno se mide directamente: un recorrido anota la
+secuencia de operaciones (abrir y cerrar ámbitos, declarar, buscar) y
+cada entorno la repite varias veces; se informa el mínimo y la mediana
+por referencia. Comprueba que los tres entornos ven la misma declaración
+(el mismo objeto) en cada referencia.
+
+    python benchmarks/bench_resolve.py [profundidad]
+'''
+from collections import ChainMap
+import gc
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mcontext import Context
+from mresolve import GLOBAL, Resolver, resolve
+from symbols import ScopedTable
+import programs
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+class NullWalk(Resolver):
+    def __init__(self, symbols):
+        super().__init__(symbols)
+        self.reads = []
+
+    def enter(self, node):
+        pass
+
+    def leave(self):
+        pass
+
+    def declare(self, node, name):
+        pass
+
+    def reference(self, node, name):
+        self.reads.append(None)
+
+ENTER, LEAVE, DECLARE, REFERENCE = range(4)
+
+class TraceWalk(NullWalk):
+    # Anota las operaciones del recorrido para repetirlas sin el AST
+    def __init__(self, symbols):
+        super().__init__(symbols)
+        self.ops = []
+
+    def enter(self, node):
+        self.ops.append((ENTER, node, None))
+
+    def leave(self):
+        self.ops.append((LEAVE, None, None))
+
+    def declare(self, node, name):
+        self.ops.append((DECLARE, node, name))
+
+    def reference(self, node, name):
+        self.ops.append((REFERENCE, node, name))
+
+class ChainMapWalk(NullWalk):
+    def __init__(self, symbols):
+        super().__init__(symbols)
+        self.env = ChainMap()
+
+    def enter(self, node):
+        self.env = self.env.new_child()
+
+    def leave(self):
+        self.env = self.env.parents
+
+    def declare(self, node, name):
+        if name not in self.env.maps[0]:
+            self.env.maps[0][name] = node
+
+    def reference(self, node, name):
+        self.reads.append(self.env.get(name))
+
+class ScopedWalk(NullWalk):
+    def __init__(self, symbols):
+        super().__init__(symbols)
+        self.env = ScopedTable(symbols)
+
+    def enter(self, node):
+        self.env.push()
+
+    def leave(self):
+        self.env.pop()
+
+    def declare(self, node, name):
+        if not self.env.in_scope(name):
+            self.env[name] = node
+
+    def reference(self, node, name):
+        self.reads.append(self.env.lookup(name))
+
+class FrameWalk(NullWalk):
+    def __init__(self, symbols, resolution, program):
+        super().__init__(symbols)
+        self.addresses = resolution.addresses
+        self.frame_sizes = resolution.frames
+        self.frames = [[None] * resolution.frame_size(program)]
+        self.globals = self.frames[0]
+
+    def enter(self, node):
+        self.frames.append([None] * self.frame_sizes[id(node)])
+
+    def leave(self):
+        self.frames.pop()
+
+    def declare(self, node, name):
+        depth, slot = self.addresses[id(node)]
+        frame = self.globals if depth == GLOBAL else self.frames[-1 - depth]
+        if frame[slot] is None:
+            frame[slot] = node
+
+    def reference(self, node, name):
+        address = self.addresses.get(id(node))
+        if address is None:
+            self.reads.append(None)
+        elif address[0] == GLOBAL:
+            self.reads.append(self.globals[address[1]])
+        else:
+            self.reads.append(self.frames[-1 - address[0]][address[1]])
+
+def walk(walker, program):
+    walker.visit(program)
+    return walker.reads
+
+def replay(env, ops):
+    enter, leave, declare, reference = env.enter, env.leave, env.declare, env.reference
+    for op, node, name in ops:
+        if op == REFERENCE:
+            reference(node, name)
+        elif op == DECLARE:
+            declare(node, name)
+        elif op == ENTER:
+            enter(node)
+        else:
+            leave()
+    return env.reads
+
+def samples(fn, repeat=7):
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times), statistics.median(times)
+
+def same_declarations(results):
+    first = results[0]
+    return all(len(reads) == len(first) and all(a is b for a, b in zip(reads, first))
+               for reads in results[1:])
+
+def main(depth=12):
+    source = programs.identifier_heavy(functions=200, locals_=30, depth=depth)
+    ctxt = Context(lexer='dfa', parser='rd')
+    ctxt.parse(source)
+    program, symbols = ctxt.ast, ctxt.symbols
+
+    t_resolve, resolution = timed(lambda: resolve(program, symbols))
+    t_check, _ = timed(lambda: ctxt.check())
+    tracer = TraceWalk(symbols)
+    tracer.visit(program)
+    ops = tracer.ops
+    refs = sum(1 for op in ops if op[0] == REFERENCE)
+    print(f'profundidad {depth}: {refs} referencias, {len(resolution)} direcciones')
+    print(f'resolución {t_resolve * 1000:8.1f} ms   (checker {t_check * 1000:8.1f} ms)')
+
+    results = []
+    for label, make in (('ChainMap', lambda: ChainMapWalk(symbols)),
+                        ('ScopedTable', lambda: ScopedWalk(symbols)),
+                        ('marcos (depth, slot)', lambda: FrameWalk(symbols, resolution, program))):
+        t_walk, reads = timed(lambda: walk(make(), program))
+        results.append(reads)
+        results.append(replay(make(), ops))
+        best, median = samples(lambda: replay(make(), ops))
+        print(f'{label:22} recorrido {t_walk * 1000:8.1f} ms   entorno mín {best / refs * 1e9:6.0f}'
+              f'   mediana {median / refs * 1e9:6.0f} ns/referencia')
+
+    ok = same_declarations(results) and None not in results[0] and not resolution.unresolved
+    print('misma declaración en cada referencia:', 'OK' if ok else 'DISTINTO')
+    if not ok:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:2]))
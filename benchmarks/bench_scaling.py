@@ -0,0 +1,82 @@
+# bench_scaling.py
+'''
+Escalado del parser con el tamaño de la entrada.
+
+Para cada producción de lista de la gramática (decl_list, block_items,
+args_list, param_list, class_body) genera un programa con N elementos y
+mide el tiempo de análisis sintáctico para N = 1k, 10k, 100k y 1M. Los
+tokens se lexean antes, en un TokenBuffer, para medir sólo el parser.
+
+La pendiente log(tiempo)/log(N) entre el tamaño menor y el mayor debe ser
+~1; si supera LIMIT el crecimiento es superlineal y el script termina con
+código 1.
+
+    python benchmarks/bench_scaling.py [N máximo] [sly|rd|ambos]
+'''
+import gc
+import math
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dfalexer import DFALexer
+from parser import Parser
+from rdparser import RDParser
+from tokenbuffer import TokenBuffer
+
+LIMIT = 1.2
+
+PARSERS = {'sly': Parser, 'rd': RDParser}
+
+SHAPES = {
+    'decl_list': lambda n: ''.join(f'int g{i};\n' for i in range(n)),
+    'block_items': lambda n: 'int main() {\n' + 'x = 1;\n' * n + '}\n',
+    'args_list': lambda n: 'int main() {\nprintf("", ' + ', '.join(['x'] * n) + ');\n}\n',
+    'param_list': lambda n: 'int f(' + ', '.join(f'int a{i}' for i in range(n)) + ') {\nreturn 0;\n}\n',
+    'class_body': lambda n: 'class C {\npublic:\n' + ''.join(f'int v{i};\n' for i in range(n)) + '};\n',
+}
+
+def measure(parser_class, shape, n):
+    source = SHAPES[shape](n)
+    tokens = TokenBuffer.from_tokens(source, DFALexer().tokenize(source))
+    del source
+    gc.collect()
+    t0 = time.perf_counter()
+    ast = parser_class().parse(iter(tokens))
+    elapsed = time.perf_counter() - t0
+    assert ast is not None
+    del ast
+    gc.collect()
+    return elapsed
+
+def slope(sizes, times):
+    return math.log(times[-1] / times[0]) / math.log(sizes[-1] / sizes[0])
+
+def main(largest=1_000_000, which='ambos'):
+    sizes = []
+    n = 1000
+    while n <= largest:
+        sizes.append(n)
+        n *= 10
+    parsers = PARSERS if which == 'ambos' else {which: PARSERS[which]}
+    print(f'{"parser":6} {"lista":12}' + ''.join(f'{n:>12}' for n in sizes) + f'{"pendiente":>11}')
+    ok = True
+    for name, parser_class in parsers.items():
+        for shape in SHAPES:
+            # El tamaño menor se repite: su tiempo es corto y ruidoso
+            times = [min(measure(parser_class, shape, sizes[0]) for _ in range(3))]
+            times += [measure(parser_class, shape, n) for n in sizes[1:]]
+            s = slope(sizes, times)
+            ok &= s <= LIMIT
+            per_item = ''.join(f'{t / n * 1e6:9.2f} µs' for t, n in zip(times, sizes))
+            print(f'{name:6} {shape:12}{per_item} {s:9.2f}{"" if s <= LIMIT else "  SUPERLINEAL"}', flush=True)
+    print('escalado lineal:', 'OK' if ok else 'FALLA')
+    if not ok:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+         sys.argv[2] if len(sys.argv) > 2 else 'ambos')
@@ -0,0 +1,85 @@
+# bench_serial.py
+'''
+Formato binario de mserial.py frente a pickle para un Program de N nodos:
+tamaño, tiempo de escritura y de lectura, con y sin posiciones. También
+la lectura con cuerpos perezosos y la de una sola función (Reader.find).
+
+Comprueba que lo leído es igual al Program original (y las posiciones,
+cuando se guardan).
+
+    python benchmarks/bench_serial.py [nodos]
+'''
+import gc
+import io
+import os
+import pickle
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mcontext import Context
+from myAST import nodes
+from mspans import SpanTable
+import mserial
+import programs
+
+NODES_PER_FUNCTION = 76     # many_functions(statements=10)
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+def row(label, size, encode, decode):
+    print(f'{label:28} {size / 1e6:7.2f} MB  escritura {encode * 1000:8.1f} ms  lectura {decode * 1000:8.1f} ms')
+
+def main(nodes_=500_000):
+    functions = max(1, nodes_ // NODES_PER_FUNCTION)
+    source = programs.many_functions(functions=functions, statements=10)
+    ctxt = Context(lexer='dfa', parser='rd')
+    ctxt.parse(source)
+    program, spans, symbols = ctxt.ast, ctxt.spans, ctxt.symbols
+    count = sum(1 for _ in nodes(program))
+    print(f'{count} nodos')
+    ok = True
+
+    encode, data = timed(lambda: pickle.dumps(program, pickle.HIGHEST_PROTOCOL))
+    decode, loaded = timed(lambda: pickle.loads(data))
+    ok &= loaded == program
+    row('pickle', len(data), encode, decode)
+
+    pairs = [(node, spans.get(node)) for node in nodes(program)]
+    encode, data = timed(lambda: pickle.dumps((program, pairs), pickle.HIGHEST_PROTOCOL))
+    decode, _ = timed(lambda: pickle.loads(data))
+    row('pickle + posiciones', len(data), encode, decode)
+
+    encode, data = timed(lambda: mserial.dumps(program))
+    decode, loaded = timed(lambda: mserial.loads(data, symbols))
+    ok &= loaded == program
+    row('mserial', len(data), encode, decode)
+
+    encode, data = timed(lambda: mserial.dumps(program, spans))
+    read_spans = SpanTable()
+    decode, loaded = timed(lambda: mserial.loads(data, symbols, read_spans))
+    ok &= loaded == program
+    ok &= [read_spans.get(n) for n in nodes(loaded)] == [spans.get(n) for n in nodes(program)]
+    row('mserial + posiciones', len(data), encode, decode)
+
+    lazy, loaded = timed(lambda: mserial.loads(data, symbols, lazy=True))
+    name = f'f{functions // 2}'
+    find, func = timed(lambda: mserial.Reader(io.BytesIO(data), symbols).find(name))
+    ok &= func == next(decl for decl in program.stmts if decl.ident == name)
+    print(f'lectura con cuerpos perezosos {lazy * 1000:8.1f} ms   una función (find) {find * 1000:8.1f} ms')
+
+    print('igual que el Program original:', 'OK' if ok else 'DISTINTO')
+    if not ok:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,41 @@
+# bench_startup.py
+'''
+Tiempo de arranque: construcción de Context() en un proceso nuevo, con la
+cache de tablas LALR vacía (cold) y ya poblada (warm).
+
+    python benchmarks/bench_startup.py [repeticiones]
+'''
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SNIPPET = '''
+import time
+t0 = time.perf_counter()
+from mcontext import Context
+Context()
+print(time.perf_counter() - t0)
+'''
+
+def run_once(cache_dir):
+    env = dict(os.environ, MC_CACHE_DIR=cache_dir)
+    env.pop('MC_PARSER_DEBUG', None)
+    out = subprocess.run([sys.executable, '-c', SNIPPET], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+def main(repeat=5):
+    cold, warm = [], []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cold.append(run_once(cache_dir))
+            warm.append(run_once(cache_dir))
+    print(f'Context() cold (sin cache): {min(cold)*1000:8.1f} ms')
+    print(f'Context() warm (con cache): {min(warm)*1000:8.1f} ms')
+    print(f'speedup: {min(cold)/min(warm):.2f}x')
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
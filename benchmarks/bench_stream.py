@@ -0,0 +1,83 @@
+# bench_stream.py
+'''
+Lexeo en streaming sobre un archivo mapeado en memoria frente a leer el
+archivo completo a un str. Cada modo corre en un proceso nuevo y se
+reporta el tiempo y la memoria máxima (RSS) contando los tokens de un
+archivo generado de N MB y de otro con un solo comentario de N MB, que
+cruza todos los trozos. Comprueba que los dos modos cuentan los mismos
+tokens.
+
+    python benchmarks/bench_stream.py [MB]
+'''
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dfalexer import DFALexer
+from msource import MappedSource
+
+def write_sample(path, megabytes):
+    with open(os.path.join(ROOT, 'scripts', 'for.mc')) as f:
+        body = f.read()
+    block = '/* generado */\n' + body + '\n'
+    with open(path, 'w') as f:
+        for _ in range(max(1, int(megabytes * 1_000_000 / len(block)))):
+            f.write(block)
+
+def write_comment(path, megabytes):
+    with open(os.path.join(ROOT, 'scripts', 'for.mc')) as f:
+        body = f.read()
+    line = '* comentario de una sola pieza\n'
+    with open(path, 'w') as f:
+        f.write('/*\n')
+        for _ in range(max(1, int(megabytes * 1_000_000 / len(line)))):
+            f.write(line)
+        f.write('*/\n' + body)
+
+def read_whole(path):
+    with open(path) as f:
+        source = f.read()
+    return sum(1 for _ in DFALexer().tokenize(source))
+
+def stream(path):
+    with MappedSource(path) as source:
+        return sum(1 for _ in DFALexer().tokenize_stream(source.chunks(), source=source))
+
+MODES = {'str completo': read_whole, 'mmap streaming': stream}
+
+def measure(mode, path):
+    t0 = time.perf_counter()
+    count = MODES[mode](path)
+    elapsed = time.perf_counter() - t0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KB en Linux
+    print(f'{mode:15} {count:10} tokens  RSS máx {peak / 1000:8.1f} MB  {elapsed:6.2f} s')
+
+def main(megabytes=20.0):
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, write in (('programa', write_sample), ('un comentario', write_comment)):
+            path = os.path.join(tmp, 'big.mc')
+            write(path, megabytes)
+            print(f'{label}: {os.path.getsize(path) / 1_000_000:.1f} MB')
+            counts = set()
+            for mode in MODES:
+                result = subprocess.run([sys.executable, __file__, '--measure', mode, path],
+                                        check=True, capture_output=True, text=True)
+                print(result.stdout, end='')
+                counts.add(result.stdout.split(' tokens')[0].split()[-1])
+            ok &= len(counts) == 1
+    print('mismos tokens en los dos modos:', 'OK' if ok else 'DISTINTO')
+    if not ok:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--measure':
+        measure(sys.argv[2], sys.argv[3])
+    else:
+        main(float(sys.argv[1]) if len(sys.argv) > 1 else 20.0)
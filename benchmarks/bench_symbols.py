@@ -0,0 +1,140 @@
+# bench_symbols.py
+'''
+Costo de resolución de nombres en programas con muchos identificadores:
+la cadena de ChainMap con claves str (antes) frente a ScopedTable indexado
+por id de símbolo internado (ahora). Se reproduce la misma secuencia de
+operaciones (abrir/cerrar ámbito, declarar, buscar) que hace el checker
+sobre el AST, y también se mide el checker completo.
+
+    python benchmarks/bench_symbols.py [funciones] [profundidad]
+'''
+import contextlib
+import dataclasses
+import io
+import os
+import sys
+import time
+from collections import ChainMap
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from myAST import *
+from mcontext import Context
+from symbols import ScopedTable
+import programs
+
+SCOPES = (FuncDecl, ClassDecl, IfStmt, WhileStmt, ForStmt)
+DECLS = (VarDecl, ArrayDecl)
+REFS = (VarExpr, VarAssignExpr, ArrayLookupExpr, ArrayAssignExpr, CompoundAssignExpr, CallExpr)
+
+def trace(node, ops):
+    '''
+    Secuencia de operaciones de nombres que hace el checker sobre node.
+    '''
+    if isinstance(node, list):
+        for item in node:
+            trace(item, ops)
+        return
+    if not isinstance(node, Node):
+        return
+    if isinstance(node, (FuncDecl, ClassDecl)):
+        ops.append(('decl', node.ident))
+    elif isinstance(node, DECLS):
+        ops.append(('decl', node.ident))
+    elif isinstance(node, ObjectDecl):
+        ops.append(('decl', node.instance_name))
+    elif isinstance(node, REFS):
+        ops.append(('lookup', node.ident))
+    if isinstance(node, SCOPES):
+        ops.append(('push', None))
+    # Los nodos tienen __slots__ (sin __dict__): se recorren sus campos
+    for field in dataclasses.fields(node):
+        trace(getattr(node, field.name), ops)
+    if isinstance(node, SCOPES):
+        ops.append(('pop', None))
+
+class ChainMapScopes:
+    '''
+    Ámbitos como los tenía antes el checker: ChainMap recorrido a mano.
+    '''
+    def __init__(self):
+        self.symtable = ChainMap()
+
+    def lookup(self, name):
+        for scope in self.symtable.maps:
+            if name in scope:
+                return scope[name]
+        return None
+
+    def in_scope(self, name):
+        return name in self.symtable.maps[0]
+
+    def __setitem__(self, name, value):
+        self.symtable[name] = value
+
+    def push(self):
+        self.symtable = self.symtable.new_child()
+
+    def pop(self):
+        self.symtable = self.symtable.parents
+
+class NullScopes:
+    # Sólo el costo del bucle de reproducción, para descontarlo
+    def lookup(self, name):
+        return None
+
+    def in_scope(self, name):
+        return True
+
+    def push(self):
+        pass
+
+    def pop(self):
+        pass
+
+def replay(table, ops):
+    for op, name in ops:
+        if op == 'lookup':
+            table.lookup(name)
+        elif op == 'decl':
+            if not table.in_scope(name):
+                table[name] = name
+        elif op == 'push':
+            table.push()
+        else:
+            table.pop()
+
+def best(func, repeat=3):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+def main(functions=200, depth=5):
+    source = programs.identifier_heavy(functions=functions, depth=depth)
+    ctx = Context()
+    ctx.parse(source)
+    ops = []
+    trace(ctx.ast, ops)
+    # Las mismas operaciones con str simples, como antes de internar
+    plain = [(op, None if name is None else str(name)) for op, name in ops]
+    lookups = sum(1 for op, _ in ops if op == 'lookup')
+    print(f'{functions} funciones, {len(ctx.symbols)} símbolos, {lookups} búsquedas, {len(ops)} operaciones')
+
+    overhead = best(lambda: replay(NullScopes(), ops))
+    before = best(lambda: replay(ChainMapScopes(), plain)) - overhead
+    after = best(lambda: replay(ScopedTable(ctx.symbols), ops)) - overhead
+    print(f'ChainMap (str)         {before * 1000:8.1f} ms  {before / len(ops) * 1e9:6.0f} ns/op')
+    print(f'ScopedTable (ids)      {after * 1000:8.1f} ms  {after / len(ops) * 1e9:6.0f} ns/op')
+    print(f'speedup: {before / after:.2f}x  (sin contar el bucle de reproducción)')
+
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        checker = ctx.check()
+    print(f'checker completo       {(time.perf_counter() - t0) * 1000:8.1f} ms  ({len(checker.errors)} errores)')
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
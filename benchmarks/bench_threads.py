@@ -0,0 +1,88 @@
+# bench_threads.py
+'''
+Prueba de carga con hilos: analiza, revisa (SemanticAnalyzer) y dibuja
+(MakeDot) cientos de programas a la vez en un ThreadPoolExecutor y
+compara cada resultado con el de una ejecución en serie. Cada tarea crea
+su propio Context, así que no debe haber estado compartido entre ellas.
+
+Los programas son los de scripts/ y errors/ (con errores léxicos,
+sintácticos y semánticos) y programas generados, con los tres motores:
+SLY, DFA + descenso recursivo y AST plano.
+
+    python benchmarks/bench_threads.py [rondas] [hilos]
+'''
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mcontext import Context
+from mdot import MakeDot
+import programs
+
+ENGINES = (
+    dict(lexer='sly', parser='sly'),
+    dict(lexer='dfa', parser='rd'),
+    dict(lexer='dfa', parser='rd', flat=True),
+)
+
+def sources():
+    for path in sorted(glob.glob(os.path.join(ROOT, 'scripts', '*.mc')) + glob.glob(os.path.join(ROOT, 'errors', '*.mc'))):
+        with open(path) as f:
+            yield os.path.basename(path), f.read(), ENGINES
+    for k in range(1, 21):
+        yield f'many_functions({k})', programs.many_functions(functions=k * 2, statements=k), ENGINES
+        yield f'identifier_heavy({k})', programs.identifier_heavy(functions=k, locals_=k + 2, depth=k % 4), ENGINES
+        yield f'long_expression({k})', programs.long_expression(k * 50), ENGINES
+        yield f'else_if_ladder({k})', programs.else_if_ladder(k * 10), ENGINES
+
+def tasks():
+    return [(name, source, engine) for name, source, engines in sources() for engine in engines]
+
+def run(task):
+    name, source, engine = task
+    ctxt = Context(**engine)
+    ctxt.parse(source)
+    if ctxt.ast is None:
+        return name, ctxt.syntax_errors, None, None
+    errors = ctxt.check().errors
+    maker = MakeDot()
+    maker.visit(ctxt.ast)
+    return name, ctxt.syntax_errors, errors, maker.dot.source
+
+def main(rounds=3, threads=8):
+    work = tasks()
+    stdout = sys.stdout
+    # Los errores se imprimen: se descartan mientras corre la prueba
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        t0 = time.perf_counter()
+        expected = [run(task) for task in work]
+        serial = time.perf_counter() - t0
+        # Cambios de hilo frecuentes para mezclar más las tareas
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-5)
+        try:
+            ok = True
+            t0 = time.perf_counter()
+            with ThreadPoolExecutor(threads) as pool:
+                for _ in range(rounds):
+                    ok &= list(pool.map(run, work)) == expected
+            parallel = (time.perf_counter() - t0) / rounds
+        finally:
+            sys.setswitchinterval(interval)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    print(f'{len(work)} programas, {rounds} rondas con {threads} hilos')
+    print(f'serie {serial:6.2f} s   hilos {parallel:6.2f} s por ronda')
+    print('hilos igual que en serie:', 'OK' if ok else 'DISTINTO')
+    if not ok:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,53 @@
+# bench_tokens.py
+'''
+Memoria de los tokens: lista de objetos Token de SLY frente a TokenBuffer
+(columnas en arrays). También comprueba que el parser produce el mismo
+AST consumiendo el buffer que consumiendo el lexer directamente.
+
+    python benchmarks/bench_tokens.py [MB]
+'''
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lexer import Lexer
+from parser import Parser
+from tokenbuffer import TokenBuffer
+
+def sample_source(megabytes):
+    path = os.path.join(ROOT, 'scripts', 'class.mc')
+    with open(path) as f:
+        body = f.read().replace('main', 'main_')
+    # Renombra para que las declaraciones repetidas sigan siendo un programa
+    parts = [body.replace('Animal', f'Animal{i}').replace('main_', f'main{i}')
+             for i in range(max(1, int(megabytes * 1_000_000 / len(body))))]
+    return '\n'.join(parts)
+
+def measure(build):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - t0
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, elapsed
+
+def main(megabytes=1.0):
+    source = sample_source(megabytes)
+    tokens, list_bytes, list_time = measure(lambda: list(Lexer().tokenize(source)))
+    buffer, buffer_bytes, buffer_time = measure(lambda: TokenBuffer.from_tokens(source, Lexer().tokenize(source)))
+    count = len(tokens)
+    print(f'entrada: {len(source) / 1_000_000:.1f} MB, {count} tokens')
+    print(f'list[Token]  {list_bytes / count:8.1f} bytes/token  {list_time:6.2f} s')
+    print(f'TokenBuffer  {buffer_bytes / count:8.1f} bytes/token  {buffer_time:6.2f} s')
+
+    direct = Parser().parse(Lexer().tokenize(source))
+    buffered = Parser().parse(iter(buffer))
+    print('AST idéntico:', 'OK' if direct == buffered else 'DISTINTO')
+
+if __name__ == '__main__':
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 1.0)
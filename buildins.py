@@ -6,6 +6,8 @@ import math
 import statistics
 import time
 
+from mformat import FormatError, compile_format
+
 
 # ----------------------------------------
 # clases abstractas
@@ -74,16 +76,17 @@ class Format(BuiltinFunction):
 
   def __call__(self, _, *args):
     '''
+    Format the arguments with the template of the format string,
+    compiled once per distinct string (see mformat.py).
     '''
     if len(args) < 2:
       raise CallError("Error en argumento de 'format'")
-    if args[0].count('%') != len(args[1:]):
-      raise CallError("Error en argumento de 'format'")
     if not isinstance(args[0], str):
       raise CallError("El 1er argumento de 'format' es incorrecto")
-    format = args[0].replace('\\n', '\n')
-    format = args[0].replace('\\t', '\t')
-    return format % args[1:]
+    try:
+      return compile_format(args[0]).render(args[1:])
+    except FormatError:
+      raise CallError("Error en argumento de 'format'") from None
 
 
 class Input(BuiltinFunction):
@@ -0,0 +1,425 @@
+# dfalexer.py
+'''
+Lexer alternativo para MiniC++ basado en un DFA guiado por tablas.
+
+Compila el mismo conjunto de tokens de lexer.Lexer en una única tabla de
+transiciones (estado x clase de carácter), con las palabras clave
+integradas en el autómata como un trie, de modo que no hace falta el
+remapeo IDENT[...] después de cada identificador. Produce exactamente el
+mismo flujo de tokens (type, value, lineno, index) que el lexer de SLY,
+incluidas sus particularidades:
+
+  - las reglas se prueban en el orden en que están definidas, así que
+    'true'/'false' se reconocen como BOOLIT aunque vayan seguidos de más
+    letras ('trueX' -> BOOLIT, IDENT);
+  - un comentario '//' sin salto de línea final no es un comentario;
+  - los saltos de línea dentro de un STRINGLIT no cuentan líneas.
+'''
+from array import array
+import re
+import threading
+
+from sly.lex import Token
+from lexer import Lexer
+
+# Pseudo-caracteres para lo que no es ASCII
+UNI_DIGIT = '\x80'     # dígito decimal Unicode (lo acepta \d)
+UNI_OTHER = '\x81'     # cualquier otro carácter no ASCII
+ALPHABET = [chr(c) for c in range(128)] + [UNI_DIGIT, UNI_OTHER]
+
+DIGITS = '0123456789'
+IDENT_START = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_'
+IDENT_CHARS = IDENT_START + DIGITS
+
+# Valores de BOOLIT: la regla va antes que IDENT en lexer.Lexer
+BOOL_WORDS = {'true': True, 'false': False}
+
+# Tokens ignorados
+NEWLINE, CPPCOMMENT, COMMENT = 'newline', 'cppcomment', 'comment'
+
+_build_lock = threading.Lock()
+
+
+class DFA:
+    '''
+    Autómata determinista. Durante la construcción cada estado es un
+    diccionario carácter -> estado; compile() lo convierte en la tabla
+    final indexada por clase de carácter.
+    '''
+    def __init__(self):
+        self.edges = [{}]        # el estado 0 es el estado muerto
+        self.accept = [None]
+        self.start = self.new_state()
+
+    def new_state(self, accept=None):
+        self.edges.append({})
+        self.accept.append(accept)
+        return len(self.edges) - 1
+
+    def add(self, state, chars, target):
+        for ch in chars:
+            self.edges[state][ch] = target
+
+    def add_other(self, state, excluded, target):
+        self.add(state, [ch for ch in ALPHABET if ch not in excluded], target)
+
+    def compile(self):
+        # Clases de carácter: caracteres con la misma columna en todos los estados
+        columns = {}
+        self.classes = {}
+        for ch in ALPHABET:
+            column = tuple(edges.get(ch, 0) for edges in self.edges)
+            self.classes[ch] = columns.setdefault(column, len(columns))
+        self.nclasses = len(columns)
+        self.table = [[0] * self.nclasses for _ in self.edges]
+        for state, edges in enumerate(self.edges):
+            for ch, target in edges.items():
+                self.table[state][self.classes[ch]] = target
+        # Filas por carácter ASCII, derivadas de la tabla, para el bucle de escaneo
+        self.rows = []
+        for row in self.table:
+            self.rows.append({ch: row[self.classes[ch]] for ch in ALPHABET[:128] if row[self.classes[ch]]})
+        return self
+
+
+def fixed_operators(lexer):
+    '''
+    Reglas de lexer cuyo patrón es una cadena fija (EQ, NE, AND, ...).
+    '''
+    for name, pattern in lexer._rules:
+        if isinstance(pattern, str) and name not in lexer._remapping:
+            text = pattern.replace('\\', '')
+            if re.fullmatch(pattern, text):
+                yield name, text
+
+
+def build_dfa(lexer=Lexer):
+    dfa = DFA()
+    start = dfa.start
+
+    # Literales de un carácter; las reglas con regex tienen prioridad sobre ellos
+    for ch in lexer.literals:
+        dfa.add(start, ch, dfa.new_state((ch, None)))
+
+    # Operadores fijos
+    for name, text in fixed_operators(lexer):
+        state = start
+        for ch in text:
+            nxt = dfa.edges[state].get(ch)
+            if nxt is None:
+                nxt = dfa.new_state()
+                dfa.add(state, ch, nxt)
+            state = nxt
+        dfa.accept[state] = (name, None)
+
+    # Saltos de línea: \n+
+    nl = dfa.new_state((NEWLINE, None))
+    dfa.add(start, '\n', nl)
+    dfa.add(nl, '\n', nl)
+
+    # Comentarios: //.*\n  y  /\*([^*]|\*+[^*/])*\*+/
+    slash = dfa.edges[start]['/']
+    line = dfa.new_state()
+    line_end = dfa.new_state((CPPCOMMENT, None))
+    dfa.add(slash, '/', line)
+    dfa.add_other(line, '\n', line)
+    dfa.add(line, '\n', line_end)
+
+    block = dfa.new_state()
+    stars = dfa.new_state()
+    block_end = dfa.new_state((COMMENT, None))
+    dfa.add(slash, '*', block)
+    dfa.add_other(block, '*', block)
+    dfa.add(block, '*', stars)
+    dfa.add_other(stars, '*/', block)
+    dfa.add(stars, '*', stars)
+    dfa.add(stars, '/', block_end)
+    # Estados de un comentario, abierto o recién cerrado: el token no puede
+    # terminar siendo otra cosa
+    comment_states = frozenset({line, line_end, block, stars, block_end})
+
+    # Números: \d+\.\d+  y  \d+
+    intlit = dfa.new_state(('INTLIT', int))
+    dot = dfa.new_state()
+    floatlit = dfa.new_state(('FLOATLIT', float))
+    for state in (start, intlit):
+        dfa.add(state, DIGITS + UNI_DIGIT, intlit)
+    dfa.add(intlit, '.', dot)
+    for state in (dot, floatlit):
+        dfa.add(state, DIGITS + UNI_DIGIT, floatlit)
+
+    # Cadenas: "([^\\"]|\\.)*"
+    string = dfa.new_state()
+    escape = dfa.new_state()
+    string_end = dfa.new_state(('STRINGLIT', lambda value: value[1:-1]))
+    dfa.add(start, '"', string)
+    dfa.add_other(string, '\\"', string)
+    dfa.add(string, '\\', escape)
+    dfa.add(string, '"', string_end)
+    dfa.add_other(escape, '\n', string)
+
+    # Identificadores con las palabras clave integradas como un trie
+    ident = dfa.new_state(('IDENT', None))
+    dfa.add(ident, IDENT_CHARS, ident)
+    dfa.add(start, IDENT_START, ident)
+    keywords = dict(lexer._remapping.get('IDENT', {}))
+    words = sorted(set(keywords) | set(BOOL_WORDS))
+    prefixes = {'': start}
+    for word in words:
+        for i in range(1, len(word) + 1):
+            prefix = word[:i]
+            if prefix not in prefixes:
+                state = dfa.new_state(('IDENT', None))
+                dfa.add(state, IDENT_CHARS, ident)
+                dfa.add(prefixes[prefix[:-1]], prefix[-1], state)
+                prefixes[prefix] = state
+    for word in words:
+        state = prefixes[word]
+        if word in BOOL_WORDS:
+            # BOOLIT va antes que IDENT: la coincidencia termina aquí
+            dfa.edges[state] = {}
+            dfa.accept[state] = ('BOOLIT', BOOL_WORDS.__getitem__)
+        else:
+            dfa.accept[state] = (keywords[word], None)
+
+    dfa.comment_states = comment_states
+    return dfa.compile()
+
+
+class DFALexer:
+    '''
+    Reemplazo directo de lexer.Lexer: tokenize() produce objetos Token de
+    SLY idénticos a los del lexer original.
+    '''
+    _dfa = None
+
+    # Mismo manejo de errores que el lexer de SLY
+    error = Lexer.error
+
+    def __init__(self, symbols=None, lines=None):
+        if DFALexer._dfa is None:
+            # El DFA se comparte: se construye una vez aunque se creen
+            # lexers en varios hilos a la vez
+            with _build_lock:
+                if DFALexer._dfa is None:
+                    DFALexer._dfa = build_dfa(Lexer)
+        self.symbols = symbols
+        self.lines = lines
+        self.lex_errors = 0
+        self.lineno = 1
+        self.index = 0
+        self.pending = None     # (estado, última aceptación, acción) del token sin terminar
+
+    def tokenize(self, text, lineno=1, index=0):
+        return self._scan(text, lineno, index, 0, True)
+
+    def tokenize_stream(self, chunks, lineno=1, source=None):
+        '''
+        Lexea un texto que llega por trozos (ver msource.MappedSource).
+        Un token que toca el final de un trozo (comentario, cadena,
+        identificador...) continúa en el siguiente: el DFA sigue desde el
+        estado en que quedó y el token se arma una sola vez, cuando
+        termina. De un comentario sólo se guardan sus saltos de línea si se
+        da source, el texto completo: hace falta volver a leerlo únicamente
+        si no se cierra. Los desplazamientos de los tokens son relativos al
+        texto completo.
+        '''
+        comment_states = self._dfa.comment_states
+        offset = 0          # desplazamiento del trozo actual
+        start = None        # inicio del token pendiente, si lo hay
+        for chunk in chunks:
+            if start is None:
+                text, index, base = chunk, 0, offset
+            else:
+                state, stop, last, action = self._resume(state, chunk, offset, last, action)
+                if stop is None:
+                    # El token sigue en el próximo trozo
+                    if pieces is not None and source is not None and state in comment_states:
+                        pieces = None
+                    elif pieces is not None:
+                        pieces.append(chunk)
+                    if state in comment_states:
+                        self._breaks(chunk, 0, len(chunk), offset, breaks)
+                    offset += len(chunk)
+                    continue
+                if action is not None and (action[0] == COMMENT or action[0] == CPPCOMMENT):
+                    # El comentario termina en este trozo
+                    lineno = self._end_comment(action[0], chunk, last - offset, offset, breaks, lineno)
+                    text, index, base = chunk, last - offset, offset
+                else:
+                    text = (source[start:offset] if pieces is None else ''.join(pieces)) + chunk
+                    index, base = 0, start
+                start = None
+            yield from self._scan(text, lineno, index, base, False)
+            lineno = self.lineno
+            offset += len(chunk)
+            if self.pending is not None:
+                state, last, action = self.pending
+                start = base + self.index
+                pieces = [text[self.index:]]
+                breaks = array('L')
+                if state in comment_states:
+                    self._breaks(text, self.index, len(text), base, breaks)
+
+        if start is None:
+            text, base = '', offset
+        elif action is not None and (action[0] == COMMENT or action[0] == CPPCOMMENT):
+            self._end_comment(action[0], '', 0, offset, breaks, lineno)
+            return
+        else:
+            text, base = (source[start:offset] if pieces is None else ''.join(pieces)), start
+        yield from self._scan(text, lineno, 0, base, True)
+
+    def _resume(self, state, text, base, last, action):
+        # Sigue el DFA de un token pendiente sobre text; devuelve el estado,
+        # dónde se detuvo (None si llegó al final) y la última aceptación
+        dfa = self._dfa
+        rows = dfa.rows
+        table = dfa.table
+        classes = dfa.classes
+        accept = dfa.accept
+        pos = 0
+        n = len(text)
+        while pos < n:
+            ch = text[pos]
+            nxt = rows[state].get(ch)
+            if nxt is None:
+                if ch < '\x80':
+                    return state, pos, last, action
+                nxt = table[state][classes[UNI_DIGIT if ch.isdecimal() else UNI_OTHER]]
+                if not nxt:
+                    return state, pos, last, action
+            state = nxt
+            pos += 1
+            if accept[state] is not None:
+                last = base + pos
+                action = accept[state]
+        return state, None, last, action
+
+    def _breaks(self, text, start, end, base, breaks):
+        # Desplazamientos de los '\n' de text[start:end] en el texto completo
+        pos = text.find('\n', start, end)
+        while pos >= 0:
+            breaks.append(base + pos)
+            pos = text.find('\n', pos + 1, end)
+
+    def _end_comment(self, kind, text, end, base, breaks, lineno):
+        # Un comentario que empezó en un trozo anterior y termina en
+        # text[:end]: se cuentan sus líneas como en _scan
+        if kind == CPPCOMMENT:
+            lineno += 1
+            if self.lines is not None:
+                self.lines.add(base + end)
+        else:
+            self._breaks(text, 0, end, base, breaks)
+            lineno += len(breaks)
+            if self.lines is not None:
+                for pos in breaks:
+                    self.lines.add(pos + 1)
+        self.index = end
+        self.lineno = lineno
+        return lineno
+
+    def _scan(self, text, lineno, index, base, final):
+        dfa = self._dfa
+        rows = dfa.rows
+        table = dfa.table
+        classes = dfa.classes
+        accept = dfa.accept
+        start = dfa.start
+        ignore = Lexer.ignore
+        intern = self.symbols.intern if self.symbols is not None else None
+        constant = self.symbols.constant if self.symbols is not None else None
+        newlines = self.lines.newlines if self.lines is not None else None
+        n = len(text)
+        self.text = text
+
+        while index < n:
+            ch = text[index]
+            if ch in ignore:
+                index += 1
+                continue
+
+            # Máxima coincidencia, recordando el último estado de aceptación
+            state = start
+            pos = index
+            last = -1
+            action = None
+            while pos < n:
+                ch = text[pos]
+                nxt = rows[state].get(ch)
+                if nxt is None:
+                    if ch < '\x80':
+                        break
+                    nxt = table[state][classes[UNI_DIGIT if ch.isdecimal() else UNI_OTHER]]
+                    if not nxt:
+                        break
+                state = nxt
+                pos += 1
+                if accept[state] is not None:
+                    last = pos
+                    action = accept[state]
+
+            if pos == n and not final:
+                # El token podría seguir en el próximo trozo
+                self.pending = (state, base + last if last >= 0 else -1, action)
+                self.index = index
+                self.lineno = lineno
+                return
+
+            if last < 0:
+                # Error léxico: mismo protocolo que sly.Lexer
+                tok = Token()
+                tok.lineno = lineno
+                tok.index = base + index
+                tok.type = 'ERROR'
+                tok.value = text[index:]
+                self.index = index
+                self.lineno = lineno
+                tok = self.error(tok)
+                if tok is not None:
+                    tok.end = base + self.index
+                    yield tok
+                index = self.index
+                lineno = self.lineno
+                continue
+
+            toktype, convert = action
+            if toktype == NEWLINE:
+                lineno += last - index
+                if newlines:
+                    newlines(text, index, last, base)
+                index = last
+                continue
+            if toktype == CPPCOMMENT:
+                lineno += 1
+                if newlines:
+                    self.lines.add(base + last)
+                index = last
+                continue
+            if toktype == COMMENT:
+                lineno += text.count('\n', index, last)
+                if newlines:
+                    newlines(text, index, last, base)
+                index = last
+                continue
+
+            tok = Token()
+            tok.type = toktype
+            value = text[index:last]
+            if convert:
+                value = convert(value)
+                if constant:
+                    value = constant(value)
+            elif intern and toktype == 'IDENT':
+                value = intern(value)
+            tok.value = value
+            tok.lineno = lineno
+            tok.index = base + index
+            tok.end = base + last
+            index = last
+            yield tok
+
+        self.pending = None
+        self.index = index
+        self.lineno = lineno
@@ -29,6 +29,11 @@ class Lexer(sly.Lexer):
     #Simbols and simple literals
     literals = '+-*/%=().,:;{}[]<>!'
 
+    def __init__(self, symbols=None, lines=None):
+        self.symbols = symbols  # symbols.SymbolTable de la compilación
+        self.lines = lines      # mspans.LineIndex de la compilación
+        self.lex_errors = 0     # caracteres ilegales encontrados
+
     #Ignore spaces and tabs
     ignore = ' \t'
 
@@ -36,24 +41,30 @@ class Lexer(sly.Lexer):
     @_(r'\n+')
     def ignore_newline(self, t):
         self.lineno += t.value.count('\n')
+        if self.lines is not None:
+            self.lines.newlines(self.text, t.index, t.end)
 
     # Ignore comments
     @_(r'//.*\n')
     def ignore_cppcomment(self, t):
         self.lineno += 1
+        if self.lines is not None:
+            self.lines.add(t.end)
 
     @_(r'/\*([^*]|\*+[^*/])*\*+/')
     def ignore_comment(self, t):
         self.lineno += t.value.count('\n')
+        if self.lines is not None:
+            self.lines.newlines(self.text, t.index, t.end)
 
     @_(r'\d+\.\d+')
     def FLOATLIT(self, t):
-        t.value = float(t.value)
+        t.value = self.constant(float(t.value))
         return t
 
     @_(r'\d+')
     def INTLIT(self, t):
-        t.value = int(t.value)
+        t.value = self.constant(int(t.value))
         return t
 
     @_(r'true|false')
@@ -63,7 +74,7 @@ class Lexer(sly.Lexer):
 
     @_(r'"([^\\"]|\\.)*"')
     def STRINGLIT(self, t):
-        t.value = t.value[1:-1]  # Remove quotes
+        t.value = self.constant(t.value[1:-1])  # Remove quotes
         return t
 
     #Define tokens
@@ -93,6 +104,18 @@ class Lexer(sly.Lexer):
     IDENT['for'] = FOR
     IDENT['null'] = NULL
 
+    # Identificadores: se internan en la tabla de símbolos de la compilación
+    def IDENT(self, t):
+        if self.symbols is not None:
+            t.value = self.symbols.intern(t.value)
+        return t
+
+    # Literales: un solo objeto por valor en la compilación
+    def constant(self, value):
+        if self.symbols is not None:
+            return self.symbols.constant(value)
+        return value
+
     #Relational Operators
     EQ = r'=='
     NE = r'!='
@@ -111,5 +134,6 @@ class Lexer(sly.Lexer):
     DIV_ASSIGN = r'/='
     
     def error(self, t):
+        self.lex_errors += 1
         print(f'Error: Illegal character {t.value[0]}')
         self.index += 1
\ No newline at end of file
@@ -0,0 +1,342 @@
+# marena.py
+'''
+AST plano: todos los nodos de una compilación en un Arena, por índice.
+
+En lugar de un objeto por nodo, el Arena guarda columnas en arrays:
+
+  kinds[i]     clase del nodo i (índice en KINDS)
+  first[i]     posición en slots del primer campo del nodo i; los campos
+               van seguidos, en el orden de los campos de la dataclass
+  slots        cada campo, codificado en un entero con etiqueta:
+                 NODE   índice del nodo hijo
+                 VALUE  índice en values (identificadores, operadores,
+                        tipos, constantes, None), sin repetidos
+                 LIST   posición en items de una lista de hijos:
+                        items[p] es la longitud y le siguen los elementos
+                        (codificados igual, un bloque anidado es una LIST)
+  starts/ends  posición de cada nodo en el código fuente (NO_SPAN si no
+               tiene)
+
+Los hijos de un nodo siempre tienen un índice menor que el nodo, y los
+nodos de un subárbol son contiguos. Las columnas y values se serializan
+con pickle casi sin costo, así que un Arena se puede guardar o pasar a
+otro proceso.
+
+Arena.from_ast y Arena.to_ast convierten desde y hacia las clases de
+myAST. ArenaParser construye el Arena mientras analiza: cada declaración
+de nivel superior se aplana en cuanto termina, así que nunca está en
+memoria más que el árbol de objetos de una declaración.
+
+Para el checker, MakeDot o un intérprete, Arena.program() devuelve un
+Program cuyas declaraciones se construyen, por índice, la primera vez
+que se recorren y se reutilizan después (Declarations); el resto del
+código no cambia.
+'''
+from array import array
+from collections.abc import Sequence
+
+from myAST import FIELDS, KIND, KINDS, Node, Program, is_list
+from rdparser import RDParser, END
+
+# El kind de un nodo es la posición de su clase en myAST.KINDS
+PROGRAM = KIND[Program]
+
+# Etiquetas de un slot (los dos bits bajos)
+NODE, VALUE, LIST = 0, 1, 2
+
+NO_SPAN = -1        # el nodo no tiene posición
+EMPTY_SPAN = -2     # producción vacía de SLY: (None, None)
+
+
+class Arena:
+    def __init__(self):
+        self.kinds = array('B')
+        self.first = array('I')
+        self.slots = array('i')
+        self.items = array('i')
+        self.starts = array('i')
+        self.ends = array('i')
+        self.values = [None]
+        self._index = {(None.__class__, None): 0}
+        self.root = None
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_index']     # se reconstruye al añadir valores
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._index = {(value.__class__, value): k for k, value in enumerate(self.values)}
+
+    def clear(self):
+        self.__init__()
+
+    # Construcción
+
+    def value(self, value):
+        key = (value.__class__, value)
+        k = self._index.get(key)
+        if k is None:
+            k = self._index[key] = len(self.values)
+            self.values.append(value)
+        return k << 2 | VALUE
+
+    def list(self, tagged):
+        offset = len(self.items)
+        self.items.append(len(tagged))
+        self.items.extend(tagged)
+        return offset << 2 | LIST
+
+    def add(self, kind, tagged, span=None):
+        '''
+        Añade un nodo con sus campos ya codificados; devuelve su índice.
+        '''
+        i = len(self.kinds)
+        self.kinds.append(kind)
+        self.first.append(len(self.slots))
+        self.slots.extend(tagged)
+        if span is None:
+            self.starts.append(NO_SPAN)
+            self.ends.append(NO_SPAN)
+        elif span[0] is None:
+            self.starts.append(EMPTY_SPAN)
+            self.ends.append(EMPTY_SPAN)
+        else:
+            self.starts.append(span[0])
+            self.ends.append(span[1])
+        return i
+
+    def add_program(self, decls, span=None):
+        self.root = self.add(PROGRAM, [self.list([decl << 2 | NODE for decl in decls])], span)
+        return self.root
+
+    def _encode(self, value, index):
+        if isinstance(value, Node):
+            return index[id(value)] << 2 | NODE
+        if is_list(value):
+            return self.list([self._encode(item, index) for item in value])
+        return self.value(value)
+
+    def add_tree(self, node, spans=None):
+        '''
+        Añade node y todo su subárbol; devuelve el índice de node.
+        '''
+        # Preorden sin recursión; al revés, cada nodo va tras sus descendientes
+        order = []
+        stack = [node]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, Node):
+                order.append(item)
+                stack.extend(getattr(item, name) for name in FIELDS[KIND[item.__class__]])
+            elif is_list(item):
+                stack.extend(item)
+        get = spans.get if spans is not None else lambda node: None
+        encode = self._encode
+        value = self.value
+        values = self._index
+        index = {}
+        add = self.add
+        for item in reversed(order):
+            kind = KIND[item.__class__]
+            tagged = []
+            for name in FIELDS[kind]:
+                field = getattr(item, name)
+                if isinstance(field, Node):
+                    tagged.append(index[id(field)] << 2)
+                elif is_list(field):
+                    tagged.append(encode(field, index))
+                else:
+                    # value() en línea para los casos frecuentes
+                    k = values.get((field.__class__, field))
+                    tagged.append(k << 2 | VALUE if k is not None else value(field))
+            index[id(item)] = add(kind, tagged, get(item))
+        return index[id(node)]
+
+    @classmethod
+    def from_ast(cls, program, spans=None):
+        arena = cls()
+        arena.root = arena.add_tree(program, spans)
+        return arena
+
+    # Consulta por índice
+
+    def kind(self, i):
+        return KINDS[self.kinds[i]]
+
+    def span(self, i):
+        start = self.starts[i]
+        if start == NO_SPAN:
+            return None
+        if start == EMPTY_SPAN:
+            return (None, None)
+        return (start, self.ends[i])
+
+    def slot(self, i, name):
+        kind = self.kinds[i]
+        return self.slots[self.first[i] + FIELDS[kind].index(name)]
+
+    def get(self, i, name):
+        '''
+        Campo name del nodo i: índice si es un nodo, lista (de índices) si
+        es una lista y el valor en otro caso.
+        '''
+        return self._raw(self.slot(i, name))
+
+    def _raw(self, tagged):
+        tag = tagged & 3
+        payload = tagged >> 2
+        if tag == NODE:
+            return payload
+        if tag == VALUE:
+            return self.values[payload]
+        items = self.items
+        return [self._raw(items[payload + 1 + k]) for k in range(items[payload])]
+
+    def children(self, i):
+        '''
+        Índices de los hijos de i, en orden (las listas se aplanan).
+        '''
+        result = []
+        slots = self.slots
+        start = self.first[i]
+        for tagged in slots[start:start + len(FIELDS[self.kinds[i]])]:
+            tag = tagged & 3
+            if tag == NODE:
+                result.append(tagged >> 2)
+            elif tag == LIST:
+                self._list_children(tagged >> 2, result)
+        return result
+
+    def _list_children(self, offset, result):
+        items = self.items
+        for tagged in items[offset + 1:offset + 1 + items[offset]]:
+            tag = tagged & 3
+            if tag == NODE:
+                result.append(tagged >> 2)
+            elif tag == LIST:
+                self._list_children(tagged >> 2, result)
+
+    def walk(self, i=None):
+        '''
+        Índices del subárbol de i (por defecto, todo el programa) en preorden.
+        '''
+        stack = [self.root if i is None else i]
+        children = self.children
+        while stack:
+            j = stack.pop()
+            yield j
+            stack.extend(reversed(children(j)))
+
+    def decls(self):
+        '''
+        Índices de las declaraciones de nivel superior.
+        '''
+        return self.get(self.root, 'stmts')
+
+    # Conversión a myAST
+
+    def _decode(self, tagged, built):
+        tag = tagged & 3
+        payload = tagged >> 2
+        if tag == NODE:
+            return built[payload]
+        if tag == VALUE:
+            return self.values[payload]
+        items = self.items
+        return [self._decode(items[payload + 1 + k], built) for k in range(items[payload])]
+
+    def to_ast(self, i=None, spans=None):
+        '''
+        Nodos de myAST del subárbol de i (por defecto, todo el programa);
+        si se pasa una SpanTable se registran sus posiciones.
+        '''
+        i = self.root if i is None else i
+        kinds, first, slots = self.kinds, self.first, self.slots
+        decode = self._decode
+        built = {}
+        for j in reversed(list(self.walk(i))):
+            kind = kinds[j]
+            start = first[j]
+            node = KINDS[kind](*[decode(tagged, built) for tagged in slots[start:start + len(FIELDS[kind])]])
+            built[j] = node
+            if spans is not None:
+                span = self.span(j)
+                if span is not None:
+                    spans[node] = span
+        return built[i]
+
+    def program(self, spans=None):
+        '''
+        Program cuyas declaraciones se construyen una vez, al recorrerlas.
+        '''
+        return Program(Declarations(self, self.decls(), spans))
+
+    def nbytes(self):
+        columns = (self.kinds, self.first, self.slots, self.items, self.starts, self.ends)
+        return sum(column.itemsize * len(column) for column in columns)
+
+
+class Declarations(Sequence):
+    '''
+    Declaraciones de nivel superior de un Arena: los nodos de myAST de una
+    declaración se construyen la primera vez que se accede a ella y se
+    reutilizan después, así que sus posiciones en spans (por id del nodo)
+    siguen valiendo y cada acceso devuelve los mismos objetos.
+    '''
+    def __init__(self, arena, decls, spans=None):
+        self.arena = arena
+        self.decls = decls
+        self.spans = spans
+        self.built = [None] * len(decls)
+
+    def __len__(self):
+        return len(self.decls)
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return [self[j] for j in range(*k.indices(len(self.decls)))]
+        node = self.built[k]
+        if node is None:
+            node = self.built[k] = self.arena.to_ast(self.decls[k], self.spans)
+        return node
+
+    def __iter__(self):
+        for k in range(len(self.decls)):
+            yield self[k]
+
+    def __repr__(self):
+        built = sum(node is not None for node in self.built)
+        return f'Declarations({len(self.decls)} en un Arena de {len(self.arena)} nodos, {built} construidas)'
+
+
+class ArenaParser(RDParser):
+    '''
+    RDParser que devuelve un Arena: cada declaración de nivel superior se
+    aplana en cuanto se termina de analizar y sus objetos se liberan.
+    Las posiciones quedan en el Arena, no en la SpanTable.
+    '''
+    def parse(self, tokens, spans=None):
+        self.arena = Arena()
+        return super().parse(tokens, spans)
+
+    def _flatten(self, decl):
+        index = self.arena.add_tree(decl, self.spans)
+        self._index_positions.clear()
+        self._line_positions.clear()
+        return index
+
+    def program(self):
+        # Tras un error se vuelve a empezar: se descarta lo aplanado
+        arena = self.arena
+        arena.clear()
+        first = self.tok
+        decls = [self._flatten(self.decl())]
+        while self.tok is not END:
+            decls.append(self._flatten(self.decl()))
+        arena.add_program(decls, (first.index, self.last.end))
+        return arena
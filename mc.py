@@ -1,6 +1,8 @@
+import os
+import sys
+
 from mcontext import Context
 from rich import print
-from mdot import MakeDot
 from tabulate import tabulate
 
 """
@@ -15,7 +17,7 @@ from tabulate import tabulate
 """
 def menu():
     print("\t\t\t\n ################################ Miguel Cano and Nicolas Vega MiniC++ Compiler ################################  \n")
-    print("usage: mc.py [-h] [-l] [-a] [-D] [-p] [--sym] [-R] input\n")
+    print("usage: mc.py [-h] [-l] [-a] [-D] [-p] [-c] [--sym] [-R] input\n")
 
     print("Compiler for MiniC++ programs\n")
 
@@ -26,8 +28,9 @@ def menu():
     print("-h, --help             show this help message and exit")
     print("-l, --lex              display tokens from lexer")
     print("-a, --AST              Display AST")
-    print("-D, --dot              Generate AST graph as DOT format")
-    print("-p, --png              Generate AST graph as png format")
+    print("-D, --dot              Generate AST graph as DOT format (into the file given after input, if any)")
+    print("-p, --png              Generate one png per function/class (into the directory given after input, if any)")
+    print("-c, --check            Run the semantic checker and list its errors")
     print("--sym                  Dump the symbol table") #the Checker one
     print("-R, --exec             Execute the generated program")
 
@@ -38,65 +41,90 @@ def main(argv):
         raise SystemExit()
 
     print("\t\t\t\n ################################ Miguel Cano and Nicolas Vega MiniC++ Compiler ################################  \n")
-    ctxt = Context()
-    if len(argv) > 2:
-        source = ""
-        with open(argv[2]) as file:
-            source = file.read()
-        ctxt.parse(source)
-        if not ctxt.have_errors:
-            if argv[1] in ["-h","--help"]:
-                menu()
-                #raise SystemExit()
-            elif argv[1] in ["-l","--lex"]:
-                print("\n\n\t\t********** TOKENS ********** \n\n")
-                tokens = ctxt.lexer.tokenize(source)
-                table=[["Type","Value","At line"]]
-                for tok in tokens:
-                    row=[]
-                    row.append(tok.type)
-                    row.append(tok.value)
-                    row.append(tok.lineno)
-                    table.append(row)
-                print(tabulate(table, headers='firstrow', tablefmt='fancy_grid'))
-            elif argv[1] in ["-a","--AST"]:
-                print("\n\n\t\t********** AST ********** \n\n")
-                print(ctxt.ast)
-            elif argv[1] in ["-D","--dot"]:
-                print("\n\n DOT LANGUAGE \n")
-                dot = MakeDot()
-                for expr in ctxt.ast.stmts:
-                    expr.accept(dot)
-                dot.generate_dot()
-                print(dot)
-            elif argv[1] in ["-p","--png"]:
-                print("\n\n PNG FILE CREATED \n")
-                dot = MakeDot()
-                for expr in ctxt.ast.stmts:
-                    expr.accept(dot)
-                dot.generate_dot_png()
-            elif argv[1] in ["-s","--sym"]:
-                print(ctxt.interp.env)
-            elif argv[1] in ["-R", "--exec"]:
-                print("\n CHECKER + INTERPRETER \n")
-                ctxt.run()
-            else:
-                print("Not defined action")
-                op = int(input("Do you need help? 1:yes/2:no :: "))
-                if op == 1:
+    # MC_PARSE_CACHE=directorio reutiliza los análisis de código fuente ya visto
+    with Context(buffered=True, cache=os.environ.get('MC_PARSE_CACHE')) as ctxt:
+        if len(argv) > 2:
+            ctxt.parse_file(argv[2])
+            if not ctxt.have_errors:
+                if argv[1] in ["-h","--help"]:
                     menu()
-    else:
-        try:
-            while True:
-                source = input("mc > ") #This one works for very simple one line stuff, but the environments of neither Checker or Interpret work properly.
-                ctxt.parse(source)
-                if ctxt.have_errors: continue
-                for stmt in ctxt.ast.decl:
-                    ctxt.ast = stmt
+                    #raise SystemExit()
+                elif argv[1] in ["-l","--lex"]:
+                    print("\n\n\t\t********** TOKENS ********** \n\n")
+                    # Reutiliza los tokens que ya produjo el parse
+                    tokens = ctxt.tokens
+                    table=[["Type","Value","At line"]]
+                    for i in range(len(tokens)):
+                        row=[]
+                        row.append(tokens.type(i))
+                        row.append(tokens.value(i))
+                        row.append(tokens.lineno(i))
+                        table.append(row)
+                    print(tabulate(table, headers='firstrow', tablefmt='fancy_grid'))
+                elif argv[1] in ["-a","--AST"]:
+                    print("\n\n\t\t********** AST ********** \n\n")
+                    print(ctxt.ast)
+                elif argv[1] in ["-D","--dot"]:
+                    # El DOT se escribe mientras se recorre el AST: en el archivo
+                    # dado después de input o en la salida estándar
+                    if len(argv) > 3:
+                        with open(argv[3], 'w') as out:
+                            ctxt.passes.call('write_dot', out)
+                    else:
+                        print("\n\n DOT LANGUAGE \n")
+                        ctxt.passes.call('write_dot', sys.stdout)
+                elif argv[1] in ["-p","--png"]:
+                    # Un png por función y clase, en el directorio dado después
+                    # de input (por defecto ast_png). MC_DOT_DEPTH y MC_DOT_NODES
+                    # resumen los subárboles más profundos o los que no caben
+                    depth = os.environ.get('MC_DOT_DEPTH')
+                    budget = os.environ.get('MC_DOT_NODES')
+                    paths, rendered = ctxt.passes.call('png', argv[3] if len(argv) > 3 else 'ast_png',
+                                                       max_depth=depth and int(depth),
+                                                       max_nodes=budget and int(budget))
+                    print(f"\n\n PNG FILES CREATED ({rendered} rendered, {len(paths) - rendered} cached) \n")
+                    for path in paths:
+                        print(path)
+                elif argv[1] in ["-c","--check"]:
+                    print("\n CHECKER \n")
+                    # MC_CHECK_WORKERS=n revisa los cuerpos en n procesos (ver mparcheck.py)
+                    workers = os.environ.get('MC_CHECK_WORKERS')
+                    if workers:
+                        errors = ctxt.passes.call('parallel_check', int(workers))
+                    else:
+                        errors = ctxt.passes.get('check').errors
+                    for error in errors:
+                        print(error)
+                    print(f"{len(errors)} error(s)")
+                elif argv[1] in ["-s","--sym"]:
+                    print(ctxt.interp.env)
+                elif argv[1] in ["-R", "--exec"]:
+                    print("\n CHECKER + INTERPRETER \n")
                     ctxt.run()
+                else:
+                    print("Not defined action")
+                    op = int(input("Do you need help? 1:yes/2:no :: "))
+                    if op == 1:
+                        menu()
+        else:
+            try:
+                while True:
+                    source = input("mc > ") #This one works for very simple one line stuff, but the environments of neither Checker or Interpret work properly.
+                    ctxt.parse(source)
+                    if ctxt.have_errors: continue
+                    for stmt in ctxt.ast.decl:
+                        ctxt.ast = stmt
+                        ctxt.run()
+
+            except EOFError:
+                pass
 
-        except EOFError:
-            pass
+        # MC_PASS_REPORT=1 muestra el tiempo de cada pasada (ver mpasses.py)
+        if os.environ.get('MC_PASS_REPORT'):
+            print(ctxt.passes.report(), file=sys.stderr)
+        if ctxt.cache is not None:
+            print(ctxt.cache.report(), file=sys.stderr)
+            ctxt.cache.flush_stats()
 
 if __name__ == "__main__":
     from sys import argv
@@ -1,101 +1,94 @@
 from __future__ import annotations
-import re 
 from dataclasses import dataclass
-from collections import ChainMap
 from myAST import *
-from multimethod import multimethod
+from symbols import ScopedTable, TypeTable, INT, FLOAT, BOOL, STRING, VOID, NULL
+from mlayout import ClassLayout
+from mformat import compile_format
 from rich import print
 
+# Los tipos son descriptores canónicos (symbols.Type): se comparan con "is"
+NUMERIC_TYPES = frozenset({INT, FLOAT})
+NUMERIC_OPS = frozenset({'+', '-', '*', '/', '%'})
+RELATIONAL_OPS = frozenset({'<', '>', '<=', '>=', '==', '!='})
+EQUALITY_OPS = frozenset({'==', '!='})
+LOGICAL_OPS = frozenset({'AND', 'OR', '&&', '||', '!'})
+
 @dataclass
 class SemanticAnalyzer(Visitor):
-  symtable = ChainMap()
-  errors = []
-  currentFunction = None
-  currentClass = None
-  loopNesting = 0
-  functionsDeclared = {}
-  
-  def visit (self, node):
-    methodName = 'visit' + node.__class__.__name__
-    visitor = getattr(self, methodName, self.generic_visit)
-    return visitor(node)
-  
-  def generic_visit(self, node):
-    raise Exception(f"No visit method for {node.__class__.__name__}")
+  def __init__(self, symbols=None):
+    # symbols: SymbolTable de la compilación (la del lexer), si la hay.
+    # Todo el estado es de la instancia: un SemanticAnalyzer por compilación
+    self.symtable = ScopedTable(symbols)
+    self.types = TypeTable()
+    self.errors = []
+    self.currentFunction = None
+    self.currentClass = None
+    self.loopNesting = 0
+    self.functionsDeclared = {}
+    self.layouts = {}   # id(ClassDecl) -> ClassLayout
 
   def lookup(self, name):
-    for scope in self.symtable.maps:
-      if name in scope:
-        return scope[name]
-    return None
+    return self.symtable.lookup(name)
 
   def lookupClass(self, class_name):
-    for scope in self.symtable.maps:
-      if class_name in scope:
-        class_decl = scope[class_name]
-        if isinstance(class_decl, ClassDecl):
-          return class_decl
+    for class_decl in self.symtable.lookup_all(class_name):
+      if isinstance(class_decl, ClassDecl):
+        return class_decl
     return None
 
+  def layout(self, class_decl):
+    # ClassLayout de class_decl: se arma una vez, al visitar la clase, sobre
+    # el de su superclase (que ya tiene que estar declarada)
+    layout = self.layouts.get(id(class_decl))
+    if layout is None:
+      base = self.lookupClass(class_decl.super_class) if class_decl.super_class else None
+      layout = self.layouts[id(class_decl)] = ClassLayout(class_decl, self.layouts.get(id(base)))
+    return layout
+
   def findConstructor(self, class_decl, class_name):
-    for member in class_decl.body:
-      if isinstance(member, FuncDecl) and member.ident == class_name:
-        return member
-    return None
+    return self.layout(class_decl).constructor
 
   def find_method(self, class_decl, method_name):
-    for member in class_decl.body:
-      if isinstance(member, FuncDecl) and member.ident == method_name:
-        return member
-      if class_decl.super_class:
-        super_class_decl = self.lookupClass(class_decl.super_class)
-        if super_class_decl:
-          return self.find_method(super_class_decl, method_name)
-    return None
+    return self.layout(class_decl).method(method_name)
 
   def checkAssignmentCompatibility(self, var_type, expr_type):
-    if var_type == expr_type:
+    if var_type is expr_type:
       return True
-    if expr_type == 'null':
-      if var_type == 'string':
+    if expr_type is NULL:
+      if var_type is STRING:
         return True
-      if var_type in self.symtable.maps[0]:
+      if self.symtable.in_scope(var_type):
         class_decl = self.lookupClass(var_type)
         if class_decl:
           return True
-    if var_type == 'int' and expr_type == 'float':
+    if var_type is INT and expr_type is FLOAT:
       return True
     return False
 
   def checkBinaryOperation(self, operator, leftType, rightType):
-    numericOps = {'+', '-', '*', '/', '%'}
-    relationalOps = {'<', '>', '<=', '>=', '==', '!='}
-    equalityOps = {'==', '!='}
-    logicalOps = {'AND', 'OR', '&&', '||', '!'}
-    
-    if operator in equalityOps:
-      if leftType == 'null' or rightType == 'null':
-        if leftType in self.symtable.maps[0] or rightType in self.symtable.maps[0]:
-          return 'bool'
-        if leftType == 'string' or rightType == 'string':
-          return 'bool'
+    if operator in EQUALITY_OPS:
+      if leftType is NULL or rightType is NULL:
+        if self.symtable.in_scope(leftType) or self.symtable.in_scope(rightType):
+          return BOOL
+        if leftType is STRING or rightType is STRING:
+          return BOOL
         self.errors.append(f"Error: Invalid comparison between '{leftType}' and '{rightType}'")
         return None
-    if operator in numericOps:
-      if leftType == 'int' and rightType == 'int':
-        return 'int'
-      elif leftType in {'int', 'float'} and rightType in {'int', 'float'}:
-        return 'float'
+    if operator in NUMERIC_OPS:
+      if leftType is INT and rightType is INT:
+        return INT
+      elif leftType in NUMERIC_TYPES and rightType in NUMERIC_TYPES:
+        return FLOAT
       else:
         return None
-    elif operator in relationalOps:
-      if leftType in {'int', 'float'} and rightType in {'int', 'float'}:
-        return 'bool'
+    elif operator in RELATIONAL_OPS:
+      if leftType in NUMERIC_TYPES and rightType in NUMERIC_TYPES:
+        return BOOL
       else:
         return None
-    elif operator in logicalOps:
-      if leftType == 'bool' and rightType == 'bool':
-        return 'bool'
+    elif operator in LOGICAL_OPS:
+      if leftType is BOOL and rightType is BOOL:
+        return BOOL
       else:
         return None
     else:
@@ -103,17 +96,17 @@ class SemanticAnalyzer(Visitor):
 
   def checkUnaryOperation(self, operator, exprType):
     if operator == '!':
-      if exprType == 'bool':
-        return 'bool'
+      if exprType is BOOL:
+        return BOOL
       else:
         return None
     elif operator in {'+', '-'}:
-      if exprType in {'int', 'float'}:
+      if exprType in NUMERIC_TYPES:
         return exprType
       else:
         return None
     elif operator in {'++', '--'}:
-      if exprType in {'int', 'float'}:
+      if exprType in NUMERIC_TYPES:
         return exprType
       else:
         return None
@@ -125,7 +118,7 @@ class SemanticAnalyzer(Visitor):
     if mainFunc is None:
       self.errors.append(f"Error: main function not declared")
     else:
-      if mainFunc.return_type != 'int':
+      if self.types[mainFunc.return_type] is not INT:
         self.errors.append(f"Error: main function must return int")
       if len(mainFunc.params) > 0:
         self.errors.append(f"Error: main function must not have parameters")
@@ -139,78 +132,80 @@ class SemanticAnalyzer(Visitor):
 
   # Visit methods
 
-  @multimethod
   def visit(self, node: Program):
     for stmt in node.stmts:
-      self.visit(stmt)
+      yield stmt
     # Check if main function is declared
     self.checkMainFunction()
 
-  @multimethod
   def visit(self, node: FuncDecl):
+    if self.declareFunction(node):
+      yield from self.checkFunctionBody(node)
+
+  def declareFunction(self, node):
+    # La firma: devuelve False si el nombre ya estaba declarado en el ámbito
     funcName = node.ident
 
     # Check if function is already declared
-    if funcName in self.symtable.maps[0]:
+    if self.symtable.in_scope(funcName):
       self.errors.append(f"Error: Function {funcName} already declared")
-      return
-    else:
-      # If function is not declared, add it to the symbol table
-      self.symtable[funcName] = node
-      self.functionsDeclared[funcName] = node
-
-      # Check if function return type is valid
-      self.currentFunction = node
-      self.symtable = self.symtable.new_child()
-
-      # Add parameters to the symbol table
-      for param in node.params:
-        if param.ident in self.symtable.maps[0]:
-          self.errors.append(f"Error: Parameter {param.ident} already declared in function {funcName}")
-        else:
-          self.symtable[param.ident] = param.var_type
+      return False
+    # If function is not declared, add it to the symbol table
+    self.symtable[funcName] = node
+    self.functionsDeclared[funcName] = node
+    return True
+
+  def checkFunctionBody(self, node):
+    funcName = node.ident
+
+    # Check if function return type is valid
+    self.currentFunction = node
+    self.symtable.push()
+
+    # Add parameters to the symbol table
+    for param in node.params:
+      if self.symtable.in_scope(param.ident):
+        self.errors.append(f"Error: Parameter {param.ident} already declared in function {funcName}")
+      else:
+        self.symtable[param.ident] = self.types[param.var_type]
+
+    for stmt in node.body:
+      yield stmt
 
-      for stmt in node.body:
-        self.visit(stmt)
+    self.symtable.pop()
+    self.currentFunction = None
 
-      self.symtable = self.symtable.parents
-      self.currentFunction = None
-      
-  @multimethod
   def visit(self, node: NullExpr):
-    return 'null'
+    return NULL
 
-  @multimethod
   def visit(self, node: VarDecl):
     varName = node.ident
-    if varName in self.symtable.maps[0]:
+    if self.symtable.in_scope(varName):
       self.error.append(f"Error: Variable {varName} already declared")
     else:
-      self.symtable[varName] = node.var_type
+      self.symtable[varName] = self.types[node.var_type]
     if node.expr:
-      exprType = self.visit(node.expr)
-      if not self.checkAssignmentCompatibility(node.var_type, exprType):
+      exprType = yield node.expr
+      if not self.checkAssignmentCompatibility(self.types[node.var_type], exprType):
         self.errors.append(f"Error: not able to assign {exprType} to variable {varName} of type {node.var_type}")
 
-  @multimethod
   def visit(self, node: ArrayDecl):
     arrayName = node.ident
-    if arrayName in self.symtable.maps[0]:
+    if self.symtable.in_scope(arrayName):
       self.errors.append(f"Error: Array {arrayName} already declared")
     else:
       self.symtable[arrayName] = node
-    sizeType = self.visit(node.size)
-    if sizeType != 'int':
+    sizeType = yield node.size
+    if sizeType is not INT:
       self.errors.append(f"Error: size of array {arrayName} must be of type int, found {sizeType}")
 
-  @multimethod
   def visit(self, node: ObjectDecl):
     objectName = node.instance_name
     className = node.class_type
-    if objectName in self.symtable.maps[0]:
+    if self.symtable.in_scope(objectName):
       self.errors.append(f"Error: Object {objectName} already declared")
     else:
-      self.symtable[objectName] = className
+      self.symtable[objectName] = self.types[className]
     classDecl = self.lookupClass(className)
     if classDecl is None:
       self.errors.append(f"Error: Class {className} not declared")
@@ -222,177 +217,130 @@ class SemanticAnalyzer(Visitor):
             self.errors.append(f"Error: The constructor of the class {className} expects {len(constructor.params)} arguments, found {len(node.args)}")
           else:
             for argsExpr, param in zip(node.args, constructor.params):
-              argType = self.visit(argsExpr)
-              paramType = param.var_type
+              argType = yield argsExpr
+              paramType = self.types[param.var_type]
               if not self.checkAssignmentCompatibility(paramType, argType):
                 self.errors.append(f"Error: Argument of type {argType} cannot be assigned to parameter of type {paramType}")
         else:
           self.errors.append(f"Error: Constructor for class {className} not found")
 
-  @multimethod
   def visit(self, node: ExprStmt):
-    self.visit(node.expr)
+    yield node.expr
 
 
-  @multimethod
   def visit(self, node: IfStmt):
-    condType = self.visit(node.cond)
-    if condType != 'bool':
+    condType = yield node.cond
+    if condType is not BOOL:
       self.errors.append(f"Error: The 'if' condition must be of type 'bool', found '{condType}'")
-    self.symtable = self.symtable.new_child()
+    self.symtable.push()
     for stmt in node.then_stmt:
-      self.visit(stmt)
-    self.symtable = self.symtable.parents
+      yield stmt
+    self.symtable.pop()
     if node.else_stmt:
-      self.symtable = self.symtable.new_child()
+      self.symtable.push()
       if isinstance(node.else_stmt, list):
         for stmt in node.else_stmt:
-          self.visit(stmt)
+          yield stmt
       else:
-        self.visit(node.elseStmt)
-      self.symtable = self.symtable.parents
+        yield node.else_stmt
+      self.symtable.pop()
 
-  @multimethod
   def visit(self, node: ReturnStmt):
     if self.currentFunction is None:
       self.errors.append("Error: 'return' used outside a function")
       return
     if node.expr:
-      returnType = self.visit(node.expr)
+      returnType = yield node.expr
     else:
-      returnType = 'void'
-    expectedType = self.currentFunction.return_type
-    if returnType != expectedType:
+      returnType = VOID
+    expectedType = self.types[self.currentFunction.return_type]
+    if returnType is not expectedType:
       self.errors.append(f"Error: Function '{self.currentFunction.ident}' should return '{expectedType}', but returns '{returnType}'")
 
-  @multimethod
   def visit(self, node: BreakStmt):
     if self.loopNesting == 0:
       self.errors.append("Error: 'break' used outside of a loop")
 
-  @multimethod
   def visit(self, node: ContinueStmt):
     if self.loopNesting == 0:
       self.errors.append("Error: 'continue' used outside of a loop")
 
-  @multimethod
   def visit(self, node: WhileStmt):
-    condType = self.visit(node.cond)
-    if condType != 'bool':
+    condType = yield node.cond
+    if condType is not BOOL:
       self.errors.append(f"Error: The 'while' condition must be of type 'bool', found '{condType}'")
     self.loopNesting += 1
-    self.symtable = self.symtable.new_child()
+    self.symtable.push()
     for stmt in node.body:
-      self.visit(stmt)
-    self.symtable = self.symtable.parents
+      yield stmt
+    self.symtable.pop()
     self.loopNesting -= 1
 
-  @multimethod
   def visit(self, node: ForStmt):
     self.loopNesting += 1
-    self.symtable = self.symtable.new_child()
+    self.symtable.push()
 
     if node.initialization:
-      self.visit(node.initialization)
+      yield node.initialization
 
     if node.condition:
-      condType = self.visit(node.condition)
-      if condType != 'bool':
+      condType = yield node.condition
+      if condType is not BOOL:
         self.errors.append(f"Error: The 'for' condition must be of type 'bool', found '{condType}'")
 
     if node.increment:
-      self.visit(node.increment)
+      yield node.increment
 
     for stmt in node.body:
-      self.visit(stmt)
+      yield stmt
 
-    self.symtable = self.symtable.parents
+    self.symtable.pop()
     self.loopNesting -= 1
 
-  @multimethod
-  def visit(self, node: PrintStmt):
-    formatSpecifiers = re.findall(r'%[-+#0]*\d*(?:\.\d+)?[diuoxXfFeEgGaAcs]', node.format_string)
-    num_specifers = len(formatSpecifiers)
+  def checkFormat(self, node):
+    # Los argumentos contra las casillas del formato, compilado una vez
+    # por cadena distinta (ver mformat.py)
+    template = compile_format(node.format_string)
+    num_specifiers = len(template.types)
     num_args = len(node.args_list)
-    
-    if num_specifers != num_args:
-      self.errors.append(f"Error: Expected {num_specifers} arguments, found {num_args}")
-      return
-    
-    specifier_to_type = {
-      'd': 'int', 'i': 'int', 'u': 'int', 'o': 'int', 'x': 'int',
-      'X': 'int', 'f': 'float', 'F': 'float', 'e': 'float', 'E': 'float',
-      'g': 'float', 'G': 'float', 'a': 'float', 'A': 'float', 'c': 'int',
-      's': 'string'
-    }
-    
-    for i, (specifier,arg) in enumerate(zip(formatSpecifiers, node.args_list)):
-      specifier_key = specifier[-1]
-      expected_type = specifier_to_type.get(specifier_key, None)
-      
-      if expected_type is None:
-        self.errors.append(f"Error: Invalid format specifier '{specifier}'")
-        continue
-      
-      arg_type = self.visit(arg)
-      
-      if arg_type != expected_type:
+    if num_specifiers != num_args:
+      self.errors.append(f"Error: Expected {num_specifiers} arguments, found {num_args}")
+      return False
+    for i, (expected_type, arg) in enumerate(zip(template.types, node.args_list)):
+      arg_type = yield arg
+      if arg_type is not expected_type:
         self.errors.append(f"Error: Argument {i+1} must be of type '{expected_type}', found '{arg_type}'")
-      
-      
-      
-    return 'void'
-      
-  
-  @multimethod
+    return True
+
+  def visit(self, node: PrintStmt):
+    if (yield from self.checkFormat(node)):
+      return VOID
+
   def visit(self, node: SPrintStmt):
     buffer_name = node.buffer.ident
-    if buffer_name not in self.symtable.maps[0]:
+    if not self.symtable.in_scope(buffer_name):
       self.errors.append(f"Error: Buffer '{buffer_name}' not declared")
       return
     bufferType = self.lookup(buffer_name)
-    if bufferType != 'string':
+    if bufferType is not STRING:
       self.errors.append(f"Error: Buffer '{buffer_name}' must be of type 'string', found '{bufferType}'")
-    formatSpecifiers = re.findall(r'%[-+#0]*\d*(?:\.\d+)?[diuoxXfFeEgGaAcs]', node.format_string)
-    num_specifiers = len(formatSpecifiers)
-    num_args = len(node.args_list)
-    if num_specifiers != num_args:
-      self.errors.append(f"Error: Expected {num_specifiers} arguments, found {num_args}")
-      return
-    specifier_to_type = {
-      'd': 'int', 'i': 'int', 'u': 'int', 'o': 'int', 'x': 'int',
-      'X': 'int', 'f': 'float', 'F': 'float', 'e': 'float', 'E': 'float',
-      'g': 'float', 'G': 'float', 'a': 'float', 'A': 'float', 'c': 'int',
-      's': 'string'
-    }
-    for i, (specifier, arg) in enumerate(zip(formatSpecifiers, node.args_list)):
-      specifier_key = specifier[-1]
-      expected_type = specifier_to_type.get(specifier_key, None)
-      if expected_type is None:
-        self.errors.append(f"Error: Invalid format specifier '{specifier}'")
-        continue
-      arg_type = self.visit(arg)
-      if arg_type != expected_type:
-        self.errors.append(f"Error: Argument {i+1} must be of type '{expected_type}', found '{arg_type}'")
-    return 'void'
-    
-  @multimethod
+    if (yield from self.checkFormat(node)):
+      return VOID
+
   def visit(self, node: SizeStmt):
     varType = self.lookup(node.ident)
     if varType is None:
       self.errors.append(f"Error: Variable '{node.ident}' is not declared")
     elif not isinstance(varType, ArrayDecl):
       self.errors.append(f"Error: '{node.ident}' is not an array")
-    return 'int'
+    return INT
 
-  @multimethod
   def visit(self, node: ThisStmt):
     if self.currentClass is None:
       self.errors.append("Error: 'this' used outside of a class")
     else:
-      return self.currentClass.ident
+      return self.types[self.currentClass.ident]
 
-  @multimethod
   def visit(self, node: SuperStmt):
     if self.currentClass is None:
       self.errors.append("Error: 'super' used outside of a class")
@@ -410,14 +358,13 @@ class SemanticAnalyzer(Visitor):
         self.errors.append(f"Error: The constructor of '{superClass.ident}' expects {len(constructor.params)} arguments, found {len(node.args_list)}")
       else:
         for argExpr, param in zip(node.args_list, constructor.params):
-          argType = self.visit(argExpr)
-          paramType = param.var_type
+          argType = yield argExpr
+          paramType = self.types[param.var_type]
           if not self.checkAssignmentCompatibility(paramType, argType):
             self.errors.append(f"Error: Argument of type '{argType}' cannot be assigned to parameter '{param.ident}' of type '{paramType}'")
     else:
       self.errors.append(f"Error: No constructor found for class '{superClass.ident}'")
 
-  @multimethod
   def visit(self, node: CallExpr):
     if node.object_name:
       objectType = self.lookup(node.object_name)
@@ -436,11 +383,11 @@ class SemanticAnalyzer(Visitor):
         self.errors.append(f"Error: Method '{node.ident}' in class '{objectType}' expects {len(methodDecl.params)} arguments, found {len(node.args)}")
       else:
         for argExpr, param in zip(node.args, methodDecl.params):
-          argType = self.visit(argExpr)
-          paramType = param.var_type
+          argType = yield argExpr
+          paramType = self.types[param.var_type]
           if not self.checkAssignmentCompatibility(paramType, argType):
             self.errors.append(f"Error: Argument of type '{argType}' cannot be assigned to parameter '{param.ident}' of type '{paramType}' in method '{node.ident}'")
-      return methodDecl.return_type
+      return self.types[methodDecl.return_type]
     else:
       funcDecl = self.lookup(node.ident)
       if funcDecl is None or not isinstance(funcDecl, FuncDecl):
@@ -450,29 +397,27 @@ class SemanticAnalyzer(Visitor):
         self.errors.append(f"Error: Function '{node.ident}' expects {len(funcDecl.params)} arguments, found {len(node.args)}")
       else:
         for argExpr, param in zip(node.args, funcDecl.params):
-          argType = self.visit(argExpr)
-          paramType = param.var_type
+          argType = yield argExpr
+          paramType = self.types[param.var_type]
           if not self.checkAssignmentCompatibility(paramType, argType):
             self.errors.append(f"Error: Argument of type '{argType}' cannot be assigned to parameter '{param.ident}' of type '{paramType}' in function '{node.ident}'")
-      return funcDecl.return_type
+      return self.types[funcDecl.return_type]
 
-  @multimethod
   def visit(self, node: ConstExpr):
     if isinstance(node.value, bool):
-      return 'bool'
+      return BOOL
     elif node.value in {'TRUE', 'FALSE'}:
-      return 'bool'
+      return BOOL
     elif isinstance(node.value, int):
-      return 'int'
+      return INT
     elif isinstance(node.value, float):
-      return 'float'
+      return FLOAT
     elif isinstance(node.value, str):
-      return 'string'
+      return STRING
     else:
       self.errors.append(f"Error: Unknown constant type '{node.value}'")
       return None
 
-  @multimethod
   def visit(self, node: VarExpr):
     varType = self.lookup(node.ident)
     if varType is None:
@@ -480,7 +425,6 @@ class SemanticAnalyzer(Visitor):
       return None
     return varType
 
-  @multimethod
   def visit(self, node: ArrayLookupExpr):
     arrayDecl = self.lookup(node.ident)
     if arrayDecl is None:
@@ -489,23 +433,21 @@ class SemanticAnalyzer(Visitor):
     if not isinstance(arrayDecl, ArrayDecl):
       self.errors.append(f"Error: '{node.ident}' is not an array")
       return None
-    indexType = self.visit(node.index)
-    if indexType != 'int':
+    indexType = yield node.index
+    if indexType is not INT:
       self.errors.append(f"Error: Array index must be of type 'int', found '{indexType}'")
-    return arrayDecl.var_type
+    return self.types[arrayDecl.var_type]
 
-  @multimethod
   def visit(self, node: VarAssignExpr):
     varType = self.lookup(node.ident)
     if varType is None:
       self.errors.append(f"Error: Variable '{node.ident}' not declared")
       return None
-    exprType = self.visit(node.expr)
+    exprType = yield node.expr
     if not self.checkAssignmentCompatibility(varType, exprType):
       self.errors.append(f"Error: Cannot assign value of type '{exprType}' to variable '{node.ident}' of type '{varType}'")
     return varType
 
-  @multimethod
   def visit(self, node: ArrayAssignExpr):
     arrayDecl = self.lookup(node.ident)
     if arrayDecl is None:
@@ -514,16 +456,15 @@ class SemanticAnalyzer(Visitor):
     if not isinstance(arrayDecl, ArrayDecl):
       self.errors.append(f"Error: '{node.ident}' is not an array")
       return None
-    indexType = self.visit(node.index)
-    if indexType != 'int':
+    indexType = yield node.index
+    if indexType is not INT:
       self.errors.append(f"Error: Array index must be of type 'int', found '{indexType}'")
-    exprType = self.visit(node.expr)
-    elemType = arrayDecl.var_type
+    exprType = yield node.expr
+    elemType = self.types[arrayDecl.var_type]
     if not self.checkAssignmentCompatibility(elemType, exprType):
       self.errors.append(f"Error: Cannot assign value of type '{exprType}' to array element of type '{elemType}'")
     return elemType
 
-  @multimethod
   def visit(self, node: ArraySizeExpr):
     arrayDecl = self.lookup(node.ident)
     if arrayDecl is None:
@@ -532,9 +473,8 @@ class SemanticAnalyzer(Visitor):
     if not isinstance(arrayDecl, ArrayDecl):
       self.errors.append(f"Error: '{node.ident}' is not an array")
       return None
-    return 'int'
+    return INT
 
-  @multimethod
   def visit(self, node: CompoundAssignExpr):
     varName = node.ident
     operator = node.operator
@@ -545,10 +485,10 @@ class SemanticAnalyzer(Visitor):
       self.errors.append(f"Error: Variable '{varName}' not declared")
       return None
 
-    exprType = self.visit(expr)
+    exprType = yield expr
     binOperator = operator[0]
     binaryExpr = BinaryExpr(left=VarExpr(varName), operand=binOperator, right=expr)
-    resultType = self.visit(binaryExpr)
+    resultType = yield binaryExpr
 
     if resultType is None:
       self.errors.append(f"Error: Operation '{operator}' not supported between '{varType}' and '{exprType}'")
@@ -558,112 +498,107 @@ class SemanticAnalyzer(Visitor):
       self.errors.append(f"Error: Cannot assign value of type '{resultType}' to variable '{varName}' of type '{varType}'")
     return varType
 
-  @multimethod
   def visit(self, node: BinaryExpr):
-    leftType = self.visit(node.left)
-    rightType = self.visit(node.right)
+    leftType = yield node.left
+    rightType = yield node.right
     resultType = self.checkBinaryOperation(node.operand, leftType, rightType)
     if resultType is None:
       self.errors.append(f"Error: Operation '{node.operand}' not supported between '{leftType}' and '{rightType}'")
     return resultType
 
-  @multimethod
   def visit(self, node: PrefixIncExpr):
     if not isinstance(node.expr, VarExpr) and not isinstance(node.expr, ArrayLookupExpr):
       self.errors.append("Error: Operator '++' must be applied to a variable or array element")
       return None
-    varType = self.visit(node.expr)
-    if varType not in {'int', 'float'}:
+    varType = yield node.expr
+    if varType not in NUMERIC_TYPES:
       self.errors.append(f"Error: Operator '++' cannot be applied to variables of type '{varType}'")
     return varType
 
-  @multimethod
   def visit(self, node: PrefixDecExpr):
     if not isinstance(node.expr, VarExpr) and not isinstance(node.expr, ArrayLookupExpr):
       self.errors.append("Error: Operator '--' must be applied to a variable or array element")
       return None
-    varType = self.visit(node.expr)
-    if varType not in {'int', 'float'}:
+    varType = yield node.expr
+    if varType not in NUMERIC_TYPES:
       self.errors.append(f"Error: Operator '--' cannot be applied to variables of type '{varType}'")
     return varType
 
-  @multimethod
   def visit(self, node: PostfixIncExpr):
     if not isinstance(node.expr, VarExpr) and not isinstance(node.expr, ArrayLookupExpr):
       self.errors.append("Error: Operator '++' must be applied to a variable or array element")
       return None
-    varType = self.visit(node.expr)
-    if varType not in {'int', 'float'}:
+    varType = yield node.expr
+    if varType not in NUMERIC_TYPES:
       self.errors.append(f"Error: Operator '++' cannot be applied to variables of type '{varType}'")
     return varType
 
-  @multimethod
   def visit(self, node: PostfixDecExpr):
     if not isinstance(node.expr, VarExpr) and not isinstance(node.expr, ArrayLookupExpr):
       self.errors.append("Error: Operator '--' must be applied to a variable or array element")
       return None
-    varType = self.visit(node.expr)
-    if varType not in {'int', 'float'}:
+    varType = yield node.expr
+    if varType not in NUMERIC_TYPES:
       self.errors.append(f"Error: Operator '--' cannot be applied to variables of type '{varType}'")
     return varType
 
-  @multimethod
   def visit(self, node: ShortCircuitAndExpr):
-    leftType = self.visit(node.left)
-    if leftType != 'bool':
+    leftType = yield node.left
+    if leftType is not BOOL:
       self.errors.append(f"Error: Left expression of '&&' must be of type 'bool', found '{leftType}'")
-    rightType = self.visit(node.right)
-    if rightType != 'bool':
+    rightType = yield node.right
+    if rightType is not BOOL:
       self.errors.append(f"Error: Right expression of '&&' must be of type 'bool', found '{rightType}'")
-    return 'bool'
+    return BOOL
 
-  @multimethod
   def visit(self, node: ShortCircuitOrExpr):
-    leftType = self.visit(node.left)
-    if leftType != 'bool':
+    leftType = yield node.left
+    if leftType is not BOOL:
       self.errors.append(f"Error: Left expression of '||' must be of type 'bool', found '{leftType}'")
-    rightType = self.visit(node.right)
-    if rightType != 'bool':
+    rightType = yield node.right
+    if rightType is not BOOL:
       self.errors.append(f"Error: Right expression of '||' must be of type 'bool', found '{rightType}'")
-    return 'bool'
+    return BOOL
 
-  @multimethod
   def visit(self, node: UnaryExpr):
-    exprType = self.visit(node.expr)
+    exprType = yield node.expr
     resultType = self.checkUnaryOperation(node.operand, exprType)
     if resultType is None:
       self.errors.append(f"Error: Unary operation '{node.operand}' not supported for type '{exprType}'")
     return resultType
 
-  @multimethod
   def visit(self, node: CastExpr):
-    exprType = self.visit(node.expr)
-    targetType = node.target_type
+    exprType = yield node.expr
+    targetType = self.types[node.target_type]
     if not self.isCastValid(exprType, targetType):
       self.errors.append(f"Error: Cannot cast from {exprType} to {targetType}")
     return targetType
 
-  @multimethod
   def visit(self, node: GroupingExpr):
-    return self.visit(node.expr)
+    return (yield node.expr)
 
-  @multimethod
   def visit(self, node: IntToFloatExpr):
-    exprType = self.visit(node.expr)
-    if exprType != 'int':
+    exprType = yield node.expr
+    if exprType is not INT:
       self.errors.append(f"Error: Conversion from 'int' to 'float' requires an operand of type 'int', found '{exprType}'")
-    return 'float'
+    return FLOAT
 
-  @multimethod
   def visit(self, node: ClassDecl):
+    self.declareClass(node)
+    yield from self.checkClassBody(node)
+
+  def declareClass(self, node):
     className = node.ident
-    if className in self.symtable.maps[0]:
+    if self.symtable.in_scope(className):
       self.errors.append(f"Error: Class '{className}' already declared in this scope")
     else:
       self.symtable[className] = node
+    self.layout(node)
+
+  def checkClassBody(self, node):
     self.currentClass = node
-    self.symtable = self.symtable.new_child()
+    self.symtable.push()
     for member in node.body:
-      self.visit(member)
-    self.symtable = self.symtable.parents
+      yield member
+    self.symtable.pop()
     self.currentClass = None
@@ -7,31 +7,210 @@ Sirve como repositorio de información sobre el programa, incluido
 el código fuente, informe de errores, etc.
 '''
 from lexer    import Lexer
+from dfalexer import DFALexer
 from parser  import Parser
+from rdparser import RDParser
+from tokenbuffer import TokenBuffer
+from msource import MappedSource
+from symbols import SymbolTable
+from mspans import LineIndex, SpanTable
+from mreparse import Edit, Outline, reparse
+from mparsecache import ParseCache
+from marena import Arena, ArenaParser
+from mchecker import SemanticAnalyzer
+from mincheck import IncrementalChecker
+from mpasses import PassManager
 from rich import print
 
 import myAST as cast
 
+# Motores de análisis léxico disponibles
+LEXERS = {
+	'sly': Lexer,
+	'dfa': DFALexer,
+}
+
+# Parsers disponibles: LALR de SLY o descenso recursivo
+PARSERS = {
+	'sly': Parser,
+	'rd': RDParser,
+}
+
 class Context:
 
-	def __init__(self):
-		self.lexer  = Lexer()
-		self.parser = Parser()
+	def __init__(self, lexer='sly', buffered=False, parser='sly', cache=None, flat=False):
+		self.lexer  = LEXERS[lexer]()
+		# Con flat=True el AST se guarda en un Arena (ver marena.py); el
+		# parser de descenso recursivo lo construye directamente
+		self.parser = ArenaParser() if flat and parser == 'rd' else PARSERS[parser]()
+		self.flat = flat
+		self.buffered = buffered  # guardar los tokens en un TokenBuffer compacto
+		self.cache = ParseCache(cache) if isinstance(cache, str) else cache  # mparsecache.ParseCache
 		self.source = ''
+		self.symbols = None
+		self.lines = None   # inicio de cada línea, lo rellena el lexer
+		self.spans = None   # posición de cada nodo, la rellena el parser
+		self.outline = None # posición de cada declaración, para edit()
+		self.tokens = None
 		self.ast    = None
+		self.arena  = None
+		self.syntax_errors = 0
+		self.cache_key = None
 		self.have_errors = False
+		# Pasadas sobre self.ast (checker, DOT, plegado...) con sus resultados
+		# guardados hasta que el programa cambia; ver mpasses.py
+		self.passes = PassManager(self)
+		self.checker = None # IncrementalChecker de recheck()
+
+	def new_symbols(self): #one interned symbol table per compilation
+		self.symbols = SymbolTable()
+		self.lexer.symbols = self.symbols
+		return self.symbols
+
+	def new_positions(self): #line index and span table per compilation
+		self.lines = LineIndex()
+		self.spans = SpanTable()
+		self.outline = None
+		self.lexer.lines = self.lines
+
+	def load_cached(self, data): #restores a previous parse of the same source
+		self.cache_key = None
+		if self.cache is None or self.flat:
+			return False
+		if isinstance(data, str):
+			data = data.encode('utf-8')
+		self.cache_key = self.cache.key(data)
+		cached = self.cache.load(self.cache_key, columns=self.buffered)
+		if cached is None:
+			return False
+		self.ast = cached.program
+		self.symbols = self.lexer.symbols = cached.symbols
+		self.spans = cached.spans
+		self.lines = self.lexer.lines = cached.lines
+		if self.buffered:
+			self.tokens = TokenBuffer.from_columns(self.source, cached.columns, self.symbols)
+		self.syntax_errors = 0
+		return True
+
+	def store_cached(self, lex_errors):
+		# Sólo análisis sin errores: los demás se repiten para informarlos
+		self.syntax_errors = self.parser.syntax_errors
+		if self.cache_key is None or self.ast is None or self.syntax_errors or lex_errors:
+			return
+		columns = self.tokens.columns() if self.buffered else None
+		self.cache.store(self.cache_key, self.ast, self.symbols, self.spans, self.lines, columns)
+
+	def flatten(self):
+		# self.ast pasa a ser un Program cuyas declaraciones se construyen
+		# desde el Arena al recorrerlas, con sus posiciones en self.spans
+		self.arena = None
+		if not self.flat or self.ast is None:
+			return
+		self.arena = self.ast if isinstance(self.ast, Arena) else Arena.from_ast(self.ast, self.spans)
+		self.spans = SpanTable()
+		self.ast = self.arena.program(self.spans)
+
+	def close(self): #releases the memory-mapped file of parse_file, if any
+		if isinstance(self.source, MappedSource):
+			self.source.close()
+			self.source = ''
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
 
 	def parse(self, source): #makes work the Parser
+		self.close()
 		self.have_errors = False
 		self.source = source
-		self.ast = self.parser.parse(self.lexer.tokenize(self.source))
+		symbols = self.new_symbols()
+		self.new_positions()
+		if self.load_cached(source):
+			return
+		self.lexer.lex_errors = 0
+		if self.buffered:
+			self.tokens = TokenBuffer.from_tokens(source, self.lexer.tokenize(source), symbols)
+			self.ast = self.parser.parse(iter(self.tokens), self.spans)
+		else:
+			self.ast = self.parser.parse(self.lexer.tokenize(self.source), self.spans)
+		self.store_cached(self.lexer.lex_errors)
+		self.flatten()
+
+	def parse_file(self, path): #streaming over a memory-mapped file
+		# El archivo queda abierto para los diagnósticos (find_source, error)
+		# hasta el próximo parse o close(); si el análisis falla, se cierra
+		self.close()
+		self.have_errors = False
+		self.source = MappedSource(path)
+		try:
+			symbols = self.new_symbols()
+			self.new_positions()
+			if self.load_cached(self.source.data):
+				return
+			# Sólo el lexer DFA sabe continuar un token en el siguiente trozo
+			lexer = self.lexer if isinstance(self.lexer, DFALexer) else DFALexer(symbols, self.lines)
+			lexer.lex_errors = 0
+			tokens = lexer.tokenize_stream(self.source.chunks(), source=self.source)
+			if self.buffered:
+				self.tokens = TokenBuffer.from_tokens(self.source, tokens, symbols)
+				tokens = iter(self.tokens)
+			self.ast = self.parser.parse(tokens, self.spans)
+			self.store_cached(lexer.lex_errors)
+			self.flatten()
+		except BaseException:
+			self.close()
+			raise
+
+	def edit(self, start, end, text): #incremental reparse: source[start:end] = text
+		if self.ast is None or self.syntax_errors or self.arena is not None:
+			# Sólo se puede partir de un programa sin errores de sintaxis
+			# (tras recuperarse de un error el AST no cubre todo el código)
+			# guardado como árbol de objetos
+			self.parse(self.source[:start] + text + self.source[end:])
+			return self.ast
+		if not isinstance(self.source, str):
+			mapped = self.source
+			self.source = mapped[0:len(mapped)]
+			mapped.close()
+		if self.outline is None:
+			self.outline = Outline(self.ast, self.spans)
+		result = reparse(self.ast, self.source, Edit(start, end, text), self.lexer, self.parser,
+			self.spans, self.lines, self.outline)
+		if result.program is None:
+			self.parse(result.source)
+		else:
+			self.have_errors = False
+			self.syntax_errors = 0
+			self.source = result.source
+			self.tokens = None  # el TokenBuffer ya no corresponde al código fuente
+			self.ast = result.program
+		return self.ast
+
+	def check(self): #makes work the SemanticAnalyzer
+		checker = SemanticAnalyzer(self.symbols)
+		checker.visit(self.ast)
+		if checker.errors:
+			self.have_errors = True
+		return checker
+
+	def recheck(self): #incremental SemanticAnalyzer: only what changed since the last recheck
+		# Las declaraciones que edit() no tocó conservan sus nodos y sus
+		# errores; un parse() nuevo trae otra tabla de símbolos y empieza de cero
+		if self.checker is None or self.checker.symbols is not self.symbols:
+			self.checker = IncrementalChecker(self.symbols)
+		errors = self.checker.check(self.ast)
+		if errors:
+			self.have_errors = True
+		return errors
 
 	def run(self): #makes work the interpreter
 		if not self.have_errors:
 			return self.interp.interpret(self.ast)
 
 	def find_source(self, node): #it searches the line
-		indices = self.parser.index_position(node)
+		indices = self.spans.get(node)
 		if indices:
 			return self.source[indices[0]:indices[1]]
 		else:
@@ -39,18 +218,15 @@ class Context:
 
 	def error(self, position, message):
 		if isinstance(position, cast.Node):
-			lineno = self.parser.line_position(position)
-			(start, end) = (part_start, part_end) = self.parser.index_position(position)
-			while start >= 0 and self.source[start] != '\n':
-				start -=1
-
-			start += 1
-			while end < len(self.source) and self.source[end] != '\n':
-				end += 1
+			(part_start, part_end) = self.spans[position]
+			# Línea y columna por búsqueda binaria en el índice de líneas;
+			# sólo se extrae esa línea (self.source puede ser un MappedSource)
+			lineno, column = self.lines.locate(part_start)
+			start, end = self.lines.bounds(lineno, len(self.source))
 			print()
 			print(self.source[start:end])
-			print(" "*(part_start - start), end='')
-			print("^"*(part_end - part_start))
+			print(" "*column, end='')
+			print("^"*(min(part_end, end) - part_start))
 			print(f'{lineno}: {message}')
 
 		else:
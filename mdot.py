@@ -1,8 +1,141 @@
 from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
+import hashlib
+import io
+import os
+import re
+import shutil
+import tempfile
+from types import GeneratorType
+import graphviz
 from graphviz import Digraph
+from graphviz.quoting import attr_list, quote, quote_edge
 
 from myAST import *
+import mtables
+
+# Nombres de nodo de MakeDot: nunca llevan comillas
+_PLAIN_NAME = re.compile(r'n[0-9]+\Z').match
+
+# quote de graphviz con memoria acotada: las etiquetas se repiten mucho
+_quote_label = lru_cache(maxsize=1 << 16)(quote)
+
+class DotWriter:
+  '''
+  Mismos métodos que graphviz.Digraph (attr, node, edge), pero cada línea
+  se escribe en file (un archivo o un pipe) en cuanto se genera en lugar
+  de guardarse en memoria. El texto es el mismo que Digraph.source; close()
+  escribe la llave final.
+  '''
+  def __init__(self, file, name='ast'):
+    self.file = file
+    self.write = file.write
+    self.write(f'digraph {quote(name)} {{\n')
+
+  @staticmethod
+  def _attrs(label, attrs):
+    if attrs:
+      return attr_list(label, kwargs=attrs)
+    return '' if label is None else f' [label={_quote_label(label)}]'
+
+  def attr(self, kw, **attrs):
+    self.write(f'\t{kw}{attr_list(None, kwargs=attrs)}\n')
+
+  def node(self, name, label=None, **attrs):
+    name = name if _PLAIN_NAME(name) else quote(name)
+    self.write(f'\t{name}{self._attrs(label, attrs)}\n')
+
+  def edge(self, tail_name, head_name, label=None, **attrs):
+    tail_name = tail_name if _PLAIN_NAME(tail_name) else quote_edge(tail_name)
+    head_name = head_name if _PLAIN_NAME(head_name) else quote_edge(head_name)
+    self.write(f'\t{tail_name} -> {head_name}{self._attrs(label, attrs)}\n')
+
+  def close(self):
+    self.write('}\n')
+
+def write_dot(program, file, **options):
+  '''
+  Escribe en file el DOT de las declaraciones de program (como mc.py
+  --dot) sin armar el grafo en memoria. options: las de MakeDot.
+  '''
+  maker = MakeDot(file, **options)
+  for stmt in program.stmts:
+    maker.visit(stmt)
+  maker.close()
+
+def dot_source(decls, graph='ast', **options):
+  out = io.StringIO()
+  maker = MakeDot(out, graph=graph, **options)
+  for decl in decls:
+    maker.visit(decl)
+  maker.close()
+  return out.getvalue()
+
+def declaration_graphs(program, **options):
+  '''
+  Un DOT por cada FuncDecl y ClassDecl de nivel superior, más uno
+  ('globals') con el resto de las declaraciones si las hay: lista de
+  (nombre, DOT). Los nombres se repiten sólo si se repiten en el programa.
+  '''
+  graphs = []
+  rest = []
+  for decl in program.stmts:
+    if isinstance(decl, (FuncDecl, ClassDecl)):
+      graphs.append((str(decl.ident), dot_source([decl], str(decl.ident), **options)))
+    else:
+      rest.append(decl)
+  if rest:
+    graphs.append(('globals', dot_source(rest, 'globals', **options)))
+  return graphs
+
+def render_key(source, format):
+  # Un DOT describe todo el subárbol, así que su hash identifica el dibujo
+  h = hashlib.sha256(f'{graphviz.__version__}:{format}\n'.encode())
+  h.update(source.encode())
+  return h.hexdigest()
+
+def _render(job):
+  # En un proceso del pool: dibuja con Graphviz y guarda el archivo de forma atómica
+  source, path, format = job
+  data = graphviz.Source(source).pipe(format=format)
+  fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+  with os.fdopen(fd, 'wb') as f:
+    f.write(data)
+  os.replace(tmp, path)
+
+def render_graphs(program, directory, format='png', workers=None, cache=None, **options):
+  '''
+  Dibuja cada grafo de declaration_graphs(program, **options) en
+  directory/<nombre>.<format>. Los dibujos se guardan en cache (por
+  defecto junto a las tablas del parser, ver mtables.cache_dir) con el
+  hash de su DOT, así que una función que no cambió no se vuelve a
+  dibujar; los que faltan se dibujan en paralelo en un pool de procesos.
+  Devuelve los archivos escritos y cuántos grafos se dibujaron.
+  '''
+  cache = cache or os.path.join(mtables.cache_dir(), 'dot')
+  os.makedirs(cache, exist_ok=True)
+  os.makedirs(directory, exist_ok=True)
+  outputs = []
+  jobs = {}
+  seen = {}
+  for name, source in declaration_graphs(program, **options):
+    cached = os.path.join(cache, f'{render_key(source, format)}.{format}')
+    if cached not in jobs and not os.path.exists(cached):
+      jobs[cached] = (source, cached, format)
+    count = seen[name] = seen.get(name, 0) + 1
+    filename = f'{name}.{format}' if count == 1 else f'{name}_{count}.{format}'
+    outputs.append((cached, os.path.join(directory, filename)))
+  if len(jobs) > 1 and workers != 1:
+    with ProcessPoolExecutor(workers) as pool:
+      list(pool.map(_render, jobs.values()))
+  else:
+    for job in jobs.values():
+      _render(job)
+  for cached, path in outputs:
+    shutil.copyfile(cached, path)
+  return [path for _, path in outputs], len(jobs)
 
 @dataclass
 class MakeDot(Visitor):
@@ -19,11 +152,48 @@ class MakeDot(Visitor):
     'arrowhead' : 'none'
   }
   
-  dot = Digraph('ast')
-  dot.attr('node', **node_default)
-  dot.attr('edge', **edge_default)
-  
-  sequence = 0
+  def __init__(self, file=None, graph='ast', max_depth=None, max_nodes=None):
+    '''
+    Un grafo y una numeración por instancia. Con file, el DOT se escribe
+    ahí mientras se recorre el AST (DotWriter) en vez de armar un Digraph.
+
+    max_depth: los nodos a esa profundidad del AST (contando desde el
+    nodo visitado) se dibujan como un resumen de su subárbol.
+    max_nodes: una vez dibujados tantos nodos del AST, los subárboles que
+    quedan se dibujan también como resúmenes.
+    '''
+    self.dot = Digraph(graph) if file is None else DotWriter(file, graph)
+    self.dot.attr('node', **self.node_default)
+    self.dot.attr('edge', **self.edge_default)
+    self.sequence = 0
+    self.depth = 0
+    self.drawn = 0
+    if max_depth is not None or max_nodes is not None:
+      self.max_depth = float('inf') if max_depth is None else max_depth
+      self.max_nodes = float('inf') if max_nodes is None else max_nodes
+      # Tabla de la instancia: cada método pasa primero por los límites
+      self.visit_table = {cls: self.limited(method) for cls, method in self.visit_table.items()}
+
+  @staticmethod
+  def limited(method):
+    def visit(self, node):
+      if self.depth >= self.max_depth or self.drawn >= self.max_nodes:
+        return self.collapsed(node)
+      self.depth += 1
+      self.drawn += 1
+      result = method(self, node)
+      if result.__class__ is GeneratorType:
+        result = yield from result
+      self.depth -= 1
+      return result
+    return visit
+
+  def collapsed(self, node):
+    # Resumen de un subárbol que no se dibuja
+    name = self.name()
+    count = sum(1 for _ in nodes(node))
+    self.dot.node(name, label = f'{node.__class__.__name__}\n... {count} nodes', fillcolor = 'lightgrey')
+    return name
   
   def name(self):  
     self.sequence += 1
@@ -33,7 +203,7 @@ class MakeDot(Visitor):
     name = self.name()
     self.dot.node(name, label = 'Program')
     for stmt in p.stmts:
-      stmt_name = stmt.accept(self)
+      stmt_name = yield stmt
       self.dot.edge(name, stmt_name)
     return name
 
@@ -51,7 +221,7 @@ class MakeDot(Visitor):
     if(fd.params):
       self.dot.node(params_name, label = 'Params')
       for param in fd.params:
-        param_name = param.accept(self)
+        param_name = yield param
         self.dot.edge(params_name, param_name)
       self.dot.edge(name, params_name)
     
@@ -59,7 +229,7 @@ class MakeDot(Visitor):
     self.dot.node(body_name, label = 'Body')
     
     for stmt in fd.body:
-      stmt_name = stmt.accept(self)
+      stmt_name = yield stmt
       self.dot.edge(body_name, stmt_name)
     
     return name
@@ -68,7 +238,7 @@ class MakeDot(Visitor):
     name = self.name()
     if vd.expr:
       self.dot.node(name, label = f'{vd.var_type} {vd.ident} =')
-      expr_name = vd.expr.accept(self)
+      expr_name = yield vd.expr
       self.dot.edge(name, expr_name)
     else:
       self.dot.node(name, label = f'{vd.var_type} {vd.ident}')
@@ -81,21 +251,21 @@ class MakeDot(Visitor):
     else:
       self.dot.node(name, label = f'Class\n{cd.ident}')
     for stmt in cd.body:
-      stmt_name = stmt.accept(self)
+      stmt_name = yield stmt
       self.dot.edge(name, stmt_name)
     return name
   
   def visit(self, ad : ArrayDecl):
     name = self.name()
     self.dot.node(name, label = f'{ad.var_type} {ad.ident}')
-    size_name = self.visit(ad.size)
+    size_name = yield ad.size
     self.dot.edge(name, size_name, label='Size')
     return name
 
   def visit(self, es : ExprStmt):
     name = self.name()
     self.dot.node(name, label = 'Expression')
-    expr_name = es.expr.accept(self)
+    expr_name = yield es.expr
     self.dot.edge(name, expr_name)
     return name
 
@@ -110,7 +280,7 @@ class MakeDot(Visitor):
     
     cond_name = self.name()
     self.dot.node(cond_name, label='Cond')
-    cond_expr_name = is_.cond.accept(self)
+    cond_expr_name = yield is_.cond
     self.dot.edge(cond_name, cond_expr_name)
     self.dot.edge(name, cond_name)
     
@@ -118,7 +288,7 @@ class MakeDot(Visitor):
     then_name = self.name()
     self.dot.node(then_name, label='Then')
     for stmt in is_.then_stmt:
-      stmt_name = stmt.accept(self)
+      stmt_name = yield stmt
       self.dot.edge(then_name, stmt_name)
     self.dot.edge(name, then_name)
 
@@ -128,10 +298,10 @@ class MakeDot(Visitor):
       
       if isinstance(is_.else_stmt, list):
         for stmt in is_.else_stmt:
-          stmt_name = stmt.accept(self)
+          stmt_name = yield stmt
           self.dot.edge(else_name, stmt_name)
       else:
-        else_stmt_name = is_.else_stmt.accept(self)
+        else_stmt_name = yield is_.else_stmt
         self.dot.edge(else_name, else_stmt_name)
       
       self.dot.edge(name, else_name)
@@ -141,7 +311,7 @@ class MakeDot(Visitor):
     name = self.name()
     self.dot.node(name, label = 'Return')
     if rs.expr:
-      expr_name = rs.expr.accept(self)
+      expr_name = yield rs.expr
       self.dot.edge(name, expr_name)
     return name
 
@@ -153,10 +323,10 @@ class MakeDot(Visitor):
   def visit(self, ws : WhileStmt):
     name = self.name()
     self.dot.node(name, label = 'While')
-    cond_name = ws.cond.accept(self)
+    cond_name = yield ws.cond
     self.dot.edge(name, cond_name)
     for stmt in ws.body:
-      stmt_name = stmt.accept(self)
+      stmt_name = yield stmt
       self.dot.edge(name, stmt_name)
     return name
   
@@ -166,33 +336,33 @@ class MakeDot(Visitor):
     init_name = self.name()
     self.dot.node(init_name, label = 'Initialization')
     if isinstance(fs.initialization, VarDecl):
-      decl_name = fs.initialization.accept(self)
+      decl_name = yield fs.initialization
       self.dot.edge(init_name, decl_name)
     else:
-      expr_name = fs.initialization.accept(self)
+      expr_name = yield fs.initialization
       self.dot.edge(init_name, expr_name)
     self.dot.edge(name, init_name)
     
     cond_name = self.name()
     self.dot.node(cond_name, label = 'Condition')
-    cond_expr_name = fs.condition.accept(self)
+    cond_expr_name = yield fs.condition
     self.dot.edge(cond_name, cond_expr_name)
     self.dot.edge(name, cond_name)
     
     inc_name = self.name()
     self.dot.node(inc_name, label = 'Increment')
     if isinstance(fs.increment, VarAssignExpr):
-      assign_name = fs.increment.accept(self)
+      assign_name = yield fs.increment
       self.dot.edge(inc_name, assign_name)
     else:
-      expr_name = fs.increment.accept(self)
+      expr_name = yield fs.increment
       self.dot.edge(inc_name, expr_name)
     self.dot.edge(name, inc_name)
     
     body_name = self.name()
     self.dot.node(body_name, label = 'Body')
     for stmt in fs.body:
-      stmt_name = stmt.accept(self)
+      stmt_name = yield stmt
       self.dot.edge(body_name, stmt_name)
     self.dot.edge(name, body_name)
     return name
@@ -207,7 +377,7 @@ class MakeDot(Visitor):
       args_name = self.name()
       self.dot.node(args_name, label = 'Args')
       for arg in ps.args_list:
-        arg_name = arg.accept(self)
+        arg_name = yield arg
         self.dot.edge(args_name, arg_name)
       self.dot.edge(name, args_name)
     
@@ -232,7 +402,7 @@ class MakeDot(Visitor):
       args_name = self.name()
       self.dot.node(args_name, label = 'Args')
       for arg in sp.args_list:
-        arg_name = arg.accept(self)
+        arg_name = yield arg
         self.dot.edge(args_name, arg_name)
       self.dot.edge(name, args_name)
       
@@ -250,7 +420,7 @@ class MakeDot(Visitor):
       args_name = self.name()
       self.dot.node(args_name, label = 'Args')
       for arg in ns.args:
-        arg_name = arg.accept(self)
+        arg_name = yield arg
         self.dot.edge(args_name, arg_name)
       self.dot.edge(name, args_name)
     return name
@@ -269,7 +439,7 @@ class MakeDot(Visitor):
     name = self.name()
     self.dot.node(name, label = 'Super')
     for arg in ss.args_list:
-      arg_name = arg.accept(self)
+      arg_name = yield arg
       self.dot.edge(name, arg_name)
     return name
   
@@ -291,7 +461,7 @@ class MakeDot(Visitor):
     else:
       self.dot.node(name, label = f'Call {ce.ident}')
     for arg in ce.args:
-      arg_name = arg.accept(self)
+      arg_name = yield arg
       self.dot.edge(name, arg_name)
     return name
   
@@ -313,7 +483,7 @@ class MakeDot(Visitor):
     self.dot.node(ident_name, label = f'Ident {ale.ident}')
     self.dot.edge(name, ident_name)
     
-    index_name = ale.index.accept(self)
+    index_name = yield ale.index
     self.dot.edge(name, index_name, label='Index')
     
     return name
@@ -321,14 +491,14 @@ class MakeDot(Visitor):
   def visit(self, vae : VarAssignExpr):
     name = self.name()
     self.dot.node(name, label = f'{vae.ident} =')
-    expr_name = vae.expr.accept(self)
+    expr_name = yield vae.expr
     self.dot.edge(name, expr_name)
     return name
   
   def visit(self, aae : ArrayAssignExpr):
     name = self.name()
     self.dot.node(name, label = f'{aae.ident} =')
-    size_name = self.visit(aae.index)
+    size_name = yield aae.index
     self.dot.edge(name, size_name, label='Size')
     return name
   
@@ -340,15 +510,15 @@ class MakeDot(Visitor):
   def visit(self, itfe : IntToFloatExpr):
     name = self.name()
     self.dot.node(name, label = 'Int to Float')
-    expr_name = itfe.expr.accept(self)
+    expr_name = yield itfe.expr
     self.dot.edge(name, expr_name)
     return name
   
   def visit(self, be : BinaryExpr):
     name = self.name()
     self.dot.node(name, label = f'{be.operand}')
-    left_name = be.left.accept(self)
-    right_name = be.right.accept(self)
+    left_name = yield be.left
+    right_name = yield be.right
     self.dot.edge(name, left_name)
     self.dot.edge(name, right_name)
     return name
@@ -356,7 +526,7 @@ class MakeDot(Visitor):
   def visit(self, node: PrefixIncExpr):
     name = self.name()
     self.dot.node(name, label='PrefixInc++')
-    expr_name = node.expr.accept(self)
+    expr_name = yield node.expr
     self.dot.edge(name, expr_name, label='expr')
     return name
 
@@ -364,29 +534,29 @@ class MakeDot(Visitor):
   def visit(self, node: PrefixDecExpr):
     name = self.name()
     self.dot.node(name, label='PrefixDec--')
-    expr_name = node.expr.accept(self)
+    expr_name = yield node.expr
     self.dot.edge(name, expr_name, label='expr')
     return name
 
   def visit(self, node: PostfixIncExpr):
     name = self.name()
     self.dot.node(name, label='PostfixInc++')
-    expr_name = node.expr.accept(self)
+    expr_name = yield node.expr
     self.dot.edge(name, expr_name, label='expr')
     return name
       
   def visit(self, node: PostfixDecExpr):
     name = self.name()
     self.dot.node(name, label='PostfixDec--')
-    expr_name = node.expr.accept(self)
+    expr_name = yield node.expr
     self.dot.edge(name, expr_name, label='expr')
     return name
   
   def visit(self, node: ShortCircuitAndExpr):
     name = self.name()
     self.dot.node(name, label='ShortCircuitAnd')
-    left_name = node.left.accept(self)
-    right_name = node.right.accept(self)
+    left_name = yield node.left
+    right_name = yield node.right
     self.dot.edge(name, left_name, label='left')
     self.dot.edge(name, right_name, label='right')
     return name
@@ -394,8 +564,8 @@ class MakeDot(Visitor):
   def visit(self, node: ShortCircuitOrExpr):
     name = self.name()
     self.dot.node(name, label='ShortCircuitOr')
-    left_name = node.left.accept(self)
-    right_name = node.right.accept(self)
+    left_name = yield node.left
+    right_name = yield node.right
     self.dot.edge(name, left_name, label='left')
     self.dot.edge(name, right_name, label='right')
     return name
@@ -403,31 +573,36 @@ class MakeDot(Visitor):
   def visit(self, ue : UnaryExpr):
     name = self.name()
     self.dot.node(name, label = f'{ue.operand}')
-    expr_name = ue.expr.accept(self)
+    expr_name = yield ue.expr
     self.dot.edge(name, expr_name)
     return name
   
   def visit(self, node: CastExpr):
     name = self.name()
     self.dot.node(name, label=f'Cast to {node.target_type}')
-    expr_name = node.expr.accept(self)
+    expr_name = yield node.expr
     self.dot.edge(name, expr_name)
     return name
   
   def visit(self, node: CompoundAssignExpr):
         name = self.name()
         self.dot.node(name, label=f'{node.ident} {node.operator}')
-        expr_name = node.expr.accept(self)
+        expr_name = yield node.expr
         self.dot.edge(name, expr_name, label='Expr')
         return name
   
   def visit(self, ge : GroupingExpr):
     name = self.name()
     self.dot.node(name, label = 'Grouping')
-    expr_name = ge.expr.accept(self)
+    expr_name = yield ge.expr
     self.dot.edge(name, expr_name)
     return name
   
+  def close(self):
+    # Termina el DOT escrito en el archivo (no hace nada con un Digraph)
+    if isinstance(self.dot, DotWriter):
+      self.dot.close()
+
   def generate_dot(self):
     print(self.dot.source)
   
@@ -0,0 +1,114 @@
+# mformat.py
+'''
+Cadenas de formato de printf, sprintf y del builtin format, compiladas una
+sola vez por cadena distinta.
+
+compile_format(cadena) devuelve un FormatTemplate: los trozos de texto
+literal (con los escapes \\n, \\t... ya traducidos y "%%" ya convertido en
+"%") y, entre ellos, una casilla por especificador (%d, %5.2f, %s...) con
+el tipo que espera (symbols.Type). Las plantillas se guardan por cadena,
+así que el checker y la ejecución de un printf dentro de un bucle no
+vuelven a analizar el formato:
+
+    template = compile_format(node.format_string)
+    template.types          # (INT, FLOAT, STRING)
+    template.render(args)   # el texto, con un solo "%" de Python
+
+Un argumento que no corresponde a su casilla al ejecutar produce
+FormatError.
+'''
+from functools import lru_cache
+import re
+
+from symbols import INT, FLOAT, STRING
+
+SPECIFIER = re.compile(r'%%|%[-+#0]*\d*(?:\.\d+)?[diuoxXfFeEgGaAcs]')
+ESCAPES = re.compile(r'\\(.)')
+ESCAPED = {'n': '\n', 't': '\t', 'r': '\r', '0': '\0', '\\': '\\', '"': '"', "'": "'"}
+
+SPECIFIER_TO_TYPE = {
+    'd': INT, 'i': INT, 'u': INT, 'o': INT, 'x': INT,
+    'X': INT, 'f': FLOAT, 'F': FLOAT, 'e': FLOAT, 'E': FLOAT,
+    'g': FLOAT, 'G': FLOAT, 'a': FLOAT, 'A': FLOAT, 'c': INT,
+    's': STRING
+}
+
+
+class FormatError(Exception):
+    pass
+
+
+def unescape(text):
+    return ESCAPES.sub(lambda m: ESCAPED.get(m.group(1), m.group(0)), text)
+
+
+class FormatTemplate:
+    '''
+    chunks[0] specs[0] chunks[1] ... specs[-1] chunks[-1]: len(chunks) es
+    len(specs) + 1. types[k] es el tipo que espera la casilla k.
+    '''
+    __slots__ = ('source', 'chunks', 'specs', 'types', '_format', '_hex')
+
+    def __init__(self, source):
+        self.source = source
+        chunks = []
+        specs = []
+        literal = []
+        pos = 0
+        for m in SPECIFIER.finditer(source):
+            literal.append(source[pos:m.start()])
+            pos = m.end()
+            if m.group() == '%%':
+                literal.append('%')
+            else:
+                chunks.append(unescape(''.join(literal)))
+                literal = []
+                specs.append(m.group())
+        literal.append(source[pos:])
+        chunks.append(unescape(''.join(literal)))
+        self.chunks = tuple(chunks)
+        self.specs = tuple(specs)
+        self.types = tuple(SPECIFIER_TO_TYPE[spec[-1]] for spec in specs)
+        # Todo el formato como un solo formato de Python; %a y %A (flotante
+        # en hexadecimal) no existen en Python y se convierten aparte
+        self._hex = tuple(k for k, spec in enumerate(specs) if spec[-1] in 'aA')
+        pieces = [chunks[0].replace('%', '%%')]
+        for k, spec in enumerate(specs):
+            pieces.append('%s' if k in self._hex else spec)
+            pieces.append(chunks[k + 1].replace('%', '%%'))
+        self._format = ''.join(pieces).__mod__
+
+    def __len__(self):
+        return len(self.specs)
+
+    def __repr__(self):
+        return f'FormatTemplate({self.source!r})'
+
+    def render(self, args):
+        '''
+        El texto con args en las casillas.
+        '''
+        if len(args) != len(self.specs):
+            raise FormatError(f'Expected {len(self.specs)} arguments, found {len(args)}')
+        args = tuple(args)
+        if self._hex:
+            args = list(args)
+            for k in self._hex:
+                try:
+                    text = float.hex(float(args[k]))
+                except (TypeError, ValueError) as e:
+                    raise FormatError(f'Argument {k + 1}: {e}') from None
+                args[k] = text.upper() if self.specs[k][-1] == 'A' else text
+            args = tuple(args)
+        try:
+            return self._format(args)
+        except (TypeError, ValueError, OverflowError) as e:
+            raise FormatError(str(e)) from None
+
+
+@lru_cache(maxsize=1 << 12)
+def compile_format(source):
+    '''
+    La plantilla de source, compartida por todas sus apariciones.
+    '''
+    return FormatTemplate(source)
@@ -0,0 +1,182 @@
+# mincheck.py
+'''
+Checker incremental: después de una edición sólo se revisan los cuerpos
+de las declaraciones que cambiaron y de las que dependen de un nombre
+global que cambió; para el resto se reutilizan los errores anteriores.
+
+Usa las dos fases de mparcheck. La fase 1 (firmas y globales) se repite
+entera cada vez: es una fracción pequeña del checker. De la fase 2,
+IncrementalChecker guarda por cada declaración con cuerpo (FuncDecl o
+ClassDecl, por identidad del nodo, que Context.edit conserva para las
+que no tocó):
+
+  errors   los errores de su cuerpo
+  deps     los nombres globales que buscó su cuerpo (encontrados o no) y
+           la firma que vio de cada uno, o None si no estaba declarado
+
+La firma de un nombre global es lo que el checker puede leer de él desde
+otro cuerpo: el Type de una variable u objeto, el tipo de un arreglo, el
+tipo de retorno y los parámetros de una función, los miembros de una
+clase y la firma de su superclase. Así, cambiar el cuerpo de una función
+no obliga a revisar a las que la llaman; cambiar sus parámetros, sí.
+
+    checker = IncrementalChecker(ctxt.symbols)
+    errors = checker.check(ctxt.ast)
+    ctxt.edit(start, end, text)
+    errors = checker.check(ctxt.ast)    # checker.rechecked, checker.reused
+
+Los errores son siempre los de SemanticAnalyzer(symbols).visit(program).
+'''
+from mparcheck import BodyChecker, SignatureChecker, merge
+from myAST import ArrayDecl, ClassDecl, FuncDecl, VarDecl
+from symbols import ScopedTable, Symbol, Type, TypeTable
+
+
+class DependencyTable(ScopedTable):
+    # Anota los nombres que se resuelven en el ámbito global o no se encuentran
+    def __init__(self, symbols):
+        super().__init__(symbols)
+        self.used = set()
+
+    def lookup(self, name):
+        if name.__class__ is Symbol and name.table is self.symbols:
+            try:
+                stack = self.bindings[name.id]
+            except IndexError:
+                stack = None
+        else:
+            stack = self._find(name)
+        if not stack or stack[-1][0] == 0:
+            self.used.add(str(name.name if name.__class__ is Type else name))
+        return stack[-1][1] if stack else None
+
+    def lookup_all(self, name):
+        self.used.add(str(name.name if name.__class__ is Type else name))
+        return super().lookup_all(name)
+
+
+class DependencyChecker(BodyChecker):
+    '''
+    BodyChecker que devuelve, con los errores de cada cuerpo, los nombres
+    globales que usó.
+    '''
+    def __init__(self, snapshot):
+        super().__init__(snapshot)
+        self.symtable = DependencyTable(snapshot.symbols)
+
+    def check_body(self, node):
+        self.symtable.used = set()
+        errors = super().check_body(node)
+        return errors, self.symtable.used
+
+
+def member_signature(member):
+    if isinstance(member, FuncDecl):
+        return ('func', str(member.ident), str(member.return_type),
+                tuple((str(p.var_type), str(p.ident)) for p in member.params))
+    if isinstance(member, (VarDecl, ArrayDecl)):
+        return (member.__class__.__name__, str(member.ident), str(member.var_type))
+    return (member.__class__.__name__,)
+
+
+class Entry:
+    __slots__ = ('decl', 'errors', 'deps')
+
+    def __init__(self, decl, errors, deps):
+        self.decl = decl
+        self.errors = errors
+        self.deps = deps
+
+
+class IncrementalChecker:
+    def __init__(self, symbols=None):
+        self.symbols = symbols
+        # Los mismos tipos en todas las revisiones: las firmas de las
+        # variables globales se comparan con "is"
+        self.types = TypeTable()
+        self.cache = {}         # id(decl) -> Entry
+        self.dependents = {}    # nombre global -> {id(decl), ...}
+        self.bound = {}         # nombre global -> (índice, declaración, valor, firma)
+        self.memo = {}          # id(FuncDecl/ArrayDecl) -> (nodo, firma)
+        self.rechecked = 0
+        self.reused = 0
+
+    def signature(self, value, bound):
+        # Firma de un valor del ámbito global; bound tiene las asignaciones
+        # anteriores, entre ellas la de la superclase
+        if isinstance(value, ClassDecl):
+            base = bound.get(str(value.super_class)) if value.super_class else None
+            base = base[3] if base is not None and isinstance(base[2], ClassDecl) else None
+            return ('class', str(value.super_class), tuple(map(member_signature, value.body)), base)
+        if isinstance(value, (FuncDecl, ArrayDecl)):
+            cached = self.memo.get(id(value))
+            if cached is None or cached[0] is not value:
+                cached = self.memo[id(value)] = (value, member_signature(value))
+            return cached[1]
+        return value
+
+    def bindings(self, signatures, stmts):
+        # nombre -> (índice, declaración, valor, firma) de su asignación en
+        # el ámbito global; un nombre sólo se asigna una vez
+        bound = {}
+        for index, name, value in signatures.bindings:
+            key = str(name)
+            if key not in bound:
+                bound[key] = (index, stmts[index], value, self.signature(value, bound))
+        return bound
+
+    def check(self, program):
+        '''
+        Los errores de program; revisa sólo los cuerpos que pueden haber
+        cambiado desde la revisión anterior.
+        '''
+        signatures = SignatureChecker(self.symbols)
+        signatures.types = self.types
+        signatures.visit(program)
+        stmts = program.stmts
+        bound = self.bindings(signatures, stmts)
+        units = signatures.units
+        position = {id(stmts[k]): k for k in units}
+        cache = self.cache
+
+        def visible(name, k):
+            binding = bound.get(name)
+            return binding[3] if binding is not None and binding[0] <= k else None
+
+        # Declaraciones nuevas o editadas
+        dirty = {k for k in units if id(stmts[k]) not in cache}
+        # Nombres cuya asignación cambió: se revisan las declaraciones que
+        # ahora ven otra firma
+        old = self.bound
+        for name in old.keys() | bound.keys():
+            before, after = old.get(name), bound.get(name)
+            if before is not None and after is not None and \
+               before[1] is after[1] and before[3] == after[3]:
+                continue
+            for key in self.dependents.get(name, ()):
+                k = position.get(key)
+                if k is not None and k not in dirty and cache[key].deps[name] != visible(name, k):
+                    dirty.add(k)
+        # Las que ya no están en el programa
+        for key in cache.keys() - position.keys():
+            self.forget(key)
+
+        dirty = sorted(dirty)
+        if dirty:
+            checker = DependencyChecker(signatures.snapshot(program))
+            for k, (errors, used) in zip(dirty, checker.check(dirty)):
+                key = id(stmts[k])
+                if key in cache:
+                    self.forget(key)
+                cache[key] = Entry(stmts[k], errors, {name: visible(name, k) for name in used})
+                for name in used:
+                    self.dependents.setdefault(name, set()).add(key)
+        self.bound = bound
+        self.memo = {key: self.memo[key] for key in self.memo.keys() & position.keys()}
+        self.rechecked = len(dirty)
+        self.reused = len(units) - len(dirty)
+        return merge(signatures, {k: cache[id(stmts[k])].errors for k in units})
+
+    def forget(self, key):
+        for name in self.cache.pop(key).deps:
+            self.dependents[name].discard(key)
@@ -0,0 +1,91 @@
+# mlayout.py
+'''
+Disposición de las clases: se arma una vez por ClassDecl, a partir de la
+de su superclase, en lugar de recorrer ClassDecl.body en cada llamada.
+
+  fields       nombre -> posición del campo en el objeto; primero los de
+               la superclase, en su orden, y después los propios
+  vtable       métodos en orden de casilla: los de la superclase primero;
+               un método que redefine otro ocupa su casilla
+  slots        nombre -> casilla del método en vtable
+  constructor  el constructor propio (no se hereda), o None
+
+Así method(nombre) y field(nombre) son una consulta a un diccionario, y
+un intérprete puede guardar un objeto como una lista de len(fields)
+valores más su ClassLayout, y llamar por casilla.
+
+Como en el checker, si una clase declara dos veces un miembro vale el
+primero.
+'''
+from myAST import ArrayDecl, ClassDecl, FuncDecl, VarDecl
+
+
+class ClassLayout:
+    def __init__(self, decl, base=None):
+        self.decl = decl
+        self.name = decl.ident
+        self.base = base
+        self.fields = dict(base.fields) if base is not None else {}
+        self.field_decls = list(base.field_decls) if base is not None else []
+        self.vtable = list(base.vtable) if base is not None else []
+        self.slots = dict(base.slots) if base is not None else {}
+        self.constructor = None
+        own = set()             # métodos propios ya vistos
+        own_fields = set()
+        for member in decl.body:
+            if isinstance(member, FuncDecl):
+                if member.ident == decl.ident:
+                    if self.constructor is None:
+                        self.constructor = member
+                elif member.ident not in own:
+                    own.add(member.ident)
+                    slot = self.slots.get(member.ident)
+                    if slot is None:
+                        self.slots[member.ident] = len(self.vtable)
+                        self.vtable.append(member)
+                    else:
+                        self.vtable[slot] = member
+            elif isinstance(member, (VarDecl, ArrayDecl)):
+                if member.ident not in own_fields:
+                    # Un campo con el nombre de uno heredado lo oculta; el
+                    # heredado conserva su posición para los métodos de la
+                    # superclase
+                    own_fields.add(member.ident)
+                    self.fields[member.ident] = len(self.field_decls)
+                    self.field_decls.append(member)
+
+    def __repr__(self):
+        return f'ClassLayout({self.name}, {len(self.fields)} fields, {len(self.vtable)} methods)'
+
+    def method(self, name):
+        '''
+        FuncDecl del método name, propio o heredado, o None.
+        '''
+        slot = self.slots.get(name)
+        return self.vtable[slot] if slot is not None else None
+
+    def field(self, name):
+        '''
+        Posición del campo name en el objeto, o None.
+        '''
+        return self.fields.get(name)
+
+    def is_subclass(self, other):
+        layout = self
+        while layout is not None:
+            if layout is other:
+                return True
+            layout = layout.base
+        return False
+
+
+def class_layouts(program):
+    '''
+    ClassLayout de cada ClassDecl de nivel superior, por nombre, en orden
+    de declaración. Una superclase que no se declaró antes no aporta nada.
+    '''
+    layouts = {}
+    for decl in program.stmts:
+        if isinstance(decl, ClassDecl) and decl.ident not in layouts:
+            layouts[decl.ident] = ClassLayout(decl, layouts.get(decl.super_class))
+    return layouts
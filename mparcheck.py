@@ -0,0 +1,218 @@
+# mparcheck.py
+'''
+Checker en paralelo: los cuerpos de las funciones y clases de nivel
+superior se revisan en un pool de procesos.
+
+Lo que un cuerpo ve del resto del programa es el ámbito global tal como
+estaba al declararlo, así que se revisa en dos fases:
+
+  1. en serie, un SignatureChecker recorre el nivel superior: declara
+     funciones y clases (nombre, duplicados, disposición, métodos para
+     checkMainFunction) sin entrar en sus cuerpos, revisa completas las
+     variables, arreglos y objetos globales y anota cada asignación del
+     ámbito global con el índice de la declaración que la hizo;
+  2. cada proceso recibe una parte contigua de las declaraciones con
+     cuerpo y, con un BodyChecker, repite las asignaciones globales
+     anotadas hasta la declaración que va a revisar y revisa su cuerpo.
+
+Los errores se juntan en el orden de las declaraciones (los de la fase 1
+de cada una antes que los de su cuerpo) y al final los de main, así que
+la lista es la misma que la de SemanticAnalyzer(symbols).visit(program).
+
+    errors = check_parallel(ctxt.ast, ctxt.symbols, workers=4)
+
+Con el arranque "fork" los procesos heredan el programa y lo anotado en
+la fase 1 sin serializarlos; con otro arranque se envían una vez a cada
+proceso con pickle.
+'''
+from concurrent.futures import ProcessPoolExecutor
+import gc
+import multiprocessing
+import os
+
+from mchecker import SemanticAnalyzer
+from myAST import ClassDecl, FuncDecl, Program
+from symbols import ScopedTable
+
+
+class Snapshot:
+    '''
+    Lo que deja la fase 1 para la 2: program, la TypeTable (los tipos se
+    comparan con "is", así que los cuerpos usan los mismos) y bindings,
+    las asignaciones del ámbito global como (índice, nombre, valor).
+    '''
+    def __init__(self, program, symbols, types, bindings):
+        self.program = program
+        self.symbols = symbols
+        self.types = types
+        self.bindings = bindings
+
+
+class RecordingTable(ScopedTable):
+    # Anota las asignaciones del ámbito global con la declaración en curso
+    def __init__(self, symbols, log):
+        super().__init__(symbols)
+        self.log = log
+        self.index = 0
+
+    def __setitem__(self, name, value):
+        if len(self.scopes) == 1:
+            self.log.append((self.index, name, value))
+        super().__setitem__(name, value)
+
+
+class SignatureChecker(SemanticAnalyzer):
+    '''
+    Fase 1. Después de visit(program): units, los índices de las
+    declaraciones cuyo cuerpo falta revisar, y marks[k], la cantidad de
+    errores anotados hasta el final de la declaración k.
+    '''
+    def __init__(self, symbols=None):
+        super().__init__(symbols)
+        self.bindings = []
+        self.symtable = RecordingTable(self.symtable.symbols, self.bindings)
+        self.units = []
+        self.marks = []
+
+    def visit(self, node: Program):
+        for k, stmt in enumerate(node.stmts):
+            self.symtable.index = k
+            yield stmt
+            self.marks.append(len(self.errors))
+        self.checkMainFunction()
+
+    def visit(self, node: FuncDecl):
+        if self.declareFunction(node):
+            self.units.append(self.symtable.index)
+
+    def visit(self, node: ClassDecl):
+        self.declareClass(node)
+        self.units.append(self.symtable.index)
+        # Los métodos cuentan para checkMainFunction: se registran como al
+        # declararlos en el ámbito de la clase, donde vale el primer miembro
+        # con cada nombre
+        members = set()
+        for member in node.body:
+            if isinstance(member, FuncDecl) and member.ident not in members:
+                self.functionsDeclared[member.ident] = member
+            members.add(member.ident)
+
+    def snapshot(self, program):
+        return Snapshot(program, self.symtable.symbols, self.types, self.bindings)
+
+
+class BodyChecker(SemanticAnalyzer):
+    '''
+    Fase 2: check(units) revisa los cuerpos de las declaraciones units de
+    snapshot.program, en orden, y devuelve los errores de cada una.
+    '''
+    def __init__(self, snapshot):
+        super().__init__(snapshot.symbols)
+        self.types = snapshot.types
+        self.snapshot = snapshot
+        self.replayed = 0
+
+    def replay(self, index):
+        # Las asignaciones globales de las declaraciones 0..index
+        bindings = self.snapshot.bindings
+        k = self.replayed
+        while k < len(bindings) and bindings[k][0] <= index:
+            _, name, value = bindings[k]
+            self.symtable[name] = value
+            if isinstance(value, ClassDecl):
+                self.layout(value)
+            k += 1
+        self.replayed = k
+
+    def check(self, units):
+        stmts = self.snapshot.program.stmts
+        results = []
+        for index in units:
+            self.replay(index)
+            results.append(self.check_body(stmts[index]))
+        return results
+
+    def check_body(self, node):
+        self.errors = []
+        self.visit(node)
+        return self.errors
+
+    def visit(self, node: FuncDecl):
+        if len(self.symtable.scopes) > 1:
+            # Un método: se declara en el ámbito de su clase, como siempre
+            return SemanticAnalyzer.visit_table[FuncDecl](self, node)
+        return self.checkFunctionBody(node)
+
+    def visit(self, node: ClassDecl):
+        self.layout(node)
+        return self.checkClassBody(node)
+
+
+_snapshot = None
+
+def _start(snapshot):
+    # initializer del pool: el snapshot queda en el proceso para cada parte
+    global _snapshot
+    _snapshot = snapshot
+
+def _check(units):
+    return BodyChecker(_snapshot).check(units)
+
+def split(units, parts):
+    '''
+    units en parts partes contiguas de tamaños parecidos.
+    '''
+    parts = max(1, min(parts, len(units)))
+    size, extra = divmod(len(units), parts)
+    chunks = []
+    start = 0
+    for p in range(parts):
+        end = start + size + (p < extra)
+        chunks.append(units[start:end])
+        start = end
+    return chunks
+
+def check_parallel(program, symbols=None, workers=None, chunks_per_worker=4):
+    '''
+    Los errores de SemanticAnalyzer(symbols).visit(program), con los
+    cuerpos de las declaraciones revisados en workers procesos (por
+    defecto, uno por CPU). Cada proceso recibe chunks_per_worker partes
+    para repartir mejor funciones de tamaños distintos.
+    '''
+    signatures = SignatureChecker(symbols)
+    signatures.visit(program)
+    snapshot = signatures.snapshot(program)
+    units = signatures.units
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(units) < 2:
+        bodies = BodyChecker(snapshot).check(units)
+    else:
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+        # Con fork, el recolector de los procesos no recorre (y así no
+        # copia) los objetos heredados
+        gc.freeze()
+        try:
+            with ProcessPoolExecutor(workers, mp_context=context,
+                                     initializer=_start, initargs=(snapshot,)) as pool:
+                bodies = [errors for part in pool.map(_check, split(units, workers * chunks_per_worker))
+                          for errors in part]
+        finally:
+            gc.unfreeze()
+
+    return merge(signatures, dict(zip(units, bodies)))
+
+def merge(signatures, bodies):
+    '''
+    Los errores de la fase 1 (SignatureChecker ya visitado) y los de cada
+    cuerpo (bodies: índice -> errores), en el orden del checker en serie.
+    '''
+    errors = []
+    start = 0
+    for k, end in enumerate(signatures.marks):
+        errors.extend(signatures.errors[start:end])
+        errors.extend(bodies.get(k, ()))
+        start = end
+    errors.extend(signatures.errors[start:])   # checkMainFunction
+    return errors
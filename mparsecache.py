@@ -0,0 +1,278 @@
+# mparsecache.py
+'''
+Cache persistente de análisis sintácticos, direccionada por contenido.
+
+Cada entrada guarda el Program, la posición de cada nodo (SpanTable), el
+índice de líneas y, si se pidió, las columnas del TokenBuffer de un código
+fuente, bajo el hash de ese código fuente más la versión del formato. La
+versión incluye el contenido de los dos lexers, los dos parsers y myAST.py,
+así que cualquier cambio de los tokens, de la gramática, de sus acciones o
+de las clases del AST invalida las entradas anteriores sin hacer nada. Los
+dos lexers y los dos parsers dan el mismo AST con las mismas posiciones,
+así que comparten las entradas.
+
+  - Sólo se guardan análisis sin errores léxicos ni de sintaxis: los que
+    tienen errores se repiten para volver a informarlos.
+  - Con el programa se guarda la tabla de símbolos de la compilación: al
+    leer, los identificadores del AST vuelven a ser Symbol de esa tabla, con
+    los mismos ids, sin internarlos uno a uno.
+  - Las posiciones se guardan como dos arrays paralelos a la lista de
+    nodos, que al leer se convierte directamente en la SpanTable.
+  - Escritura atómica (archivo temporal + os.replace): varios procesos
+    pueden escribir la misma entrada a la vez y un lector nunca ve una a
+    medias. Una entrada ilegible cuenta como fallo y se borra.
+  - Cuando el directorio supera max_bytes se borran las entradas usadas
+    hace más tiempo (cada acierto actualiza la fecha de la entrada).
+  - Cada proceso puede añadir sus contadores a un archivo de estadísticas
+    compartido (flush_stats); totals() los suma.
+
+Variables de entorno (ver mc.py):
+  MC_PARSE_CACHE    directorio de la cache; si no se define no se usa
+'''
+from array import array
+import dataclasses
+import gc
+import hashlib
+import io
+import os
+import pickle
+import sys
+import tempfile
+
+import lexer
+import dfalexer
+import parser
+import rdparser
+import myAST
+import mtables
+import symbols
+from mspans import LineIndex, SpanTable
+from myAST import nodes
+from symbols import Symbol, SymbolTable
+
+# Incrementar cuando cambie el formato de las entradas
+CACHE_VERSION = 2
+NO_SPAN = -1    # producción vacía de SLY: (None, None)
+
+MAX_BYTES = 256 << 20
+
+STATS = ('hits', 'misses', 'writes', 'evictions', 'errors')
+
+_format_key = None
+
+
+def format_key():
+    '''
+    Versión del formato: la de la cache, la de Python (pickle) y el
+    contenido de los módulos que producen el AST y la SymbolTable.
+    '''
+    global _format_key
+    if _format_key is None:
+        h = hashlib.sha256()
+        h.update(f'{CACHE_VERSION}:{sys.version_info[0]}.{sys.version_info[1]}\n'.encode())
+        for module in (lexer, dfalexer, parser, rdparser, myAST, symbols):
+            with open(module.__file__, 'rb') as f:
+                h.update(hashlib.sha256(f.read()).digest())
+        _format_key = h.digest()
+    return _format_key
+
+
+@dataclasses.dataclass
+class CachedParse:
+    program: myAST.Program
+    symbols: SymbolTable
+    spans: SpanTable
+    lines: LineIndex
+    columns: tuple = None    # columnas del TokenBuffer, si las había
+
+
+def _reduce_symbol(sym):
+    # Symbol.__reduce__ lo guarda como str; aquí se conserva con su tabla
+    return Symbol, (sym.text, sym.id, sym.table)
+
+
+class _Pickler(pickle.Pickler):
+    dispatch_table = {Symbol: _reduce_symbol}
+
+
+class ParseCache:
+    def __init__(self, directory=None, max_bytes=MAX_BYTES):
+        self.directory = directory or os.path.join(mtables.cache_dir(), 'parse')
+        self.max_bytes = max_bytes
+        for name in STATS:
+            setattr(self, name, 0)
+
+    def key(self, data):
+        h = hashlib.sha256(format_key())
+        h.update(data)
+        return h.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, f'{key}.parse')
+
+    def load(self, key, columns=False):
+        '''
+        Entrada de key, o None. Con columns=True una entrada sin las
+        columnas del TokenBuffer cuenta como fallo.
+        '''
+        path = self.path(key)
+        # Se crean muchos objetos y ninguno es basura: el recolector sólo
+        # haría recorrerlos una y otra vez
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(path, 'rb') as f:
+                version, stored_key, symbols, program, ast_nodes, starts, ends, lines, cols = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            self.errors += 1
+            self.misses += 1
+            self._remove(path)
+            return None
+        finally:
+            if enabled:
+                gc.enable()
+        if version != CACHE_VERSION or stored_key != key or (columns and cols is None):
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        table = SpanTable()
+        table.offsets = dict(zip(map(id, ast_nodes), zip(starts, ends)))
+        for node, start in zip(ast_nodes, starts):
+            if start == NO_SPAN:
+                table[node] = (None, None)
+        index = LineIndex()
+        index.starts = lines
+        return CachedParse(program, symbols, table, index, cols)
+
+    def store(self, key, program, symbols, spans, lines, columns=None):
+        ast_nodes = []
+        starts = array('l')
+        ends = array('l')
+        get = spans.get
+        for node in nodes(program):
+            span = get(node)
+            if span is not None:
+                start, end = span
+                ast_nodes.append(node)
+                starts.append(NO_SPAN if start is None else start)
+                ends.append(NO_SPAN if end is None else end)
+        data = (CACHE_VERSION, key, symbols, program, ast_nodes, starts, ends, lines.starts, columns)
+        buffer = io.BytesIO()
+        _Pickler(buffer, pickle.HIGHEST_PROTOCOL).dump(data)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(buffer.getbuffer())
+                os.replace(tmp, self.path(key))
+            except BaseException:
+                self._remove(tmp)
+                raise
+        except OSError:
+            # La cache es opcional: si no se puede escribir, seguimos sin ella
+            self.errors += 1
+            return
+        self.writes += 1
+        self.evict()
+
+    def _remove(self, path):
+        try:
+            os.unlink(path)
+            return True
+        except OSError:
+            return False
+
+    def entries(self):
+        '''
+        (fecha de uso, tamaño, ruta) de cada entrada.
+        '''
+        result = []
+        try:
+            scan = os.scandir(self.directory)
+        except OSError:
+            return result
+        with scan:
+            for entry in scan:
+                if entry.name.endswith('.parse'):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue    # la ha borrado otro proceso
+                    result.append((st.st_mtime, st.st_size, entry.path))
+        return result
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        # Se libera hasta el 90% del límite para no borrar en cada escritura
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes * 0.9:
+                break
+            if self._remove(path):
+                self.evictions += 1
+            total -= size
+
+    def stats(self):
+        return {name: getattr(self, name) for name in STATS}
+
+    def report(self, stats=None):
+        stats = stats or self.stats()
+        lookups = stats['hits'] + stats['misses']
+        rate = stats['hits'] / lookups * 100 if lookups else 0.0
+        return (f'parse cache: {stats["hits"]} aciertos, {stats["misses"]} fallos ({rate:.1f}% aciertos), '
+                f'{stats["writes"]} escrituras, {stats["evictions"]} desalojos, {stats["errors"]} errores')
+
+    # Estadísticas compartidas entre procesos: una línea por proceso,
+    # escrita con O_APPEND (atómica para escrituras pequeñas)
+
+    def stats_path(self):
+        return os.path.join(self.directory, 'stats')
+
+    def flush_stats(self):
+        line = ' '.join(str(getattr(self, name)) for name in STATS) + '\n'
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd = os.open(self.stats_path(), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                os.write(fd, line.encode())
+            finally:
+                os.close(fd)
+        except OSError:
+            return
+        for name in STATS:
+            setattr(self, name, 0)
+
+    def totals(self):
+        totals = dict.fromkeys(STATS, 0)
+        try:
+            with open(self.stats_path()) as f:
+                for line in f:
+                    values = line.split()
+                    if len(values) == len(STATS):
+                        for name, value in zip(STATS, values):
+                            totals[name] += int(value)
+        except OSError:
+            pass
+        return totals
+
+
+if __name__ == '__main__':
+    # python mparsecache.py [directorio]: estadísticas acumuladas
+    cache = ParseCache(sys.argv[1] if len(sys.argv) > 1 else os.environ.get('MC_PARSE_CACHE'))
+    entries = cache.entries()
+    print(cache.report(cache.totals()))
+    print(f'{len(entries)} entradas, {sum(size for _, size, _ in entries) / 1e6:.1f} MB en {cache.directory}')
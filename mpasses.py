@@ -0,0 +1,299 @@
+# mpasses.py
+'''
+Pasadas sobre el Program de un Context.
+
+Una pasada (Pass) es un análisis, que calcula un resultado a partir del
+Program (los errores del checker, el DOT, las direcciones de los nombres,
+el AST plano...), o una transformación, que devuelve un Program nuevo o
+modificado (por ejemplo, plegar constantes), o una orden, que recibe
+argumentos y produce una salida (escribir el DOT en un archivo, dibujar
+los png); el resultado de una orden no se guarda. Cada una declara:
+
+  requires     pasadas cuyo resultado usa; se ejecutan antes que ella y
+               run() las encuentra en manager.results
+  invalidates  sólo transformaciones: análisis que deja obsoletos (ALL,
+               todos); también se descartan los que dependen de ellos
+
+Un PassManager ejecuta las pasadas en el orden de sus dependencias y
+guarda el resultado de cada análisis hasta que una transformación lo
+invalida o el Context pasa a tener otro Program (parse, edit). De cada
+pasada anota las veces que se ejecutó, las que se usó el resultado ya
+calculado, el tiempo y, con trace_memory=True (tracemalloc), la memoria
+reservada durante la pasada y la que quedó reservada al terminar; el
+seguimiento de tracemalloc hace las pasadas varias veces más lentas, así
+que los tiempos de ese modo no se comparan con los normales.
+
+    manager = PassManager(ctxt)
+    manager.get('check').errors
+    manager.run('fold', 'check', 'dot')
+    manager.call('write_dot', sys.stdout)
+    print(manager.report())
+'''
+from dataclasses import dataclass
+import time
+import tracemalloc
+
+from marena import Arena, Declarations
+from mchecker import SemanticAnalyzer
+from mdot import dot_source, render_graphs, write_dot
+from mlayout import class_layouts
+from mparcheck import check_parallel
+from mresolve import resolve as resolve_names
+from myAST import FIELDS, KIND, BinaryExpr, ConstExpr, GroupingExpr, Node, Program, UnaryExpr, nodes
+
+ANALYSIS = 'analysis'
+TRANSFORM = 'transform'
+COMMAND = 'command'
+ALL = '*'
+
+
+@dataclass
+class Pass:
+    name: str
+    run: object                 # run(manager, program, *args): resultado o Program nuevo
+    kind: str = ANALYSIS
+    requires: tuple = ()
+    invalidates: tuple = ()
+
+
+@dataclass
+class PassStats:
+    runs: int = 0
+    hits: int = 0               # veces que se usó el resultado guardado
+    seconds: float = 0.0
+    allocated: int = 0          # bytes: máximo reservado durante la pasada
+    retained: int = 0           # bytes que quedaron reservados al terminar
+
+
+class PassManager:
+    def __init__(self, ctxt, passes=None, trace_memory=False):
+        self.ctxt = ctxt
+        self.passes = {}
+        self.results = {}
+        self.stats = {}
+        self.program = ctxt.ast
+        self.trace_memory = trace_memory
+        self._running = set()
+        for p in PASSES if passes is None else passes:
+            self.register(p)
+
+    def register(self, p):
+        if p.name in self.passes:
+            raise ValueError(f'Pass {p.name!r} already registered')
+        for name in p.requires:
+            if name not in self.passes:
+                raise ValueError(f'Pass {p.name!r} requires unknown pass {name!r}')
+        self.passes[p.name] = p
+        self.stats[p.name] = PassStats()
+        return p
+
+    def invalidate(self, names=ALL):
+        '''
+        Descarta los resultados de names (ALL: todos) y los de los análisis
+        que dependen de ellos.
+        '''
+        if names == ALL:
+            self.results.clear()
+            return
+        pending = list(names)
+        while pending:
+            name = pending.pop()
+            if name in self.results:
+                del self.results[name]
+                pending.extend(p.name for p in self.passes.values() if name in p.requires)
+
+    def get(self, name):
+        '''
+        Resultado de la pasada name (para una transformación, el Program que
+        devolvió), ejecutando antes lo que haga falta.
+        '''
+        if self.ctxt.ast is not self.program:
+            # Otro Program (parse, edit): nada de lo guardado le corresponde
+            self.program = self.ctxt.ast
+            self.results.clear()
+        p = self.passes[name]
+        if p.kind == COMMAND:
+            raise ValueError(f'Pass {name!r} is a command, use call()')
+        if p.kind == ANALYSIS and name in self.results:
+            self.stats[name].hits += 1
+            return self.results[name]
+        if name in self._running:
+            raise ValueError(f'Pass {name!r} depends on itself')
+        self._running.add(name)
+        try:
+            for required in p.requires:
+                self.get(required)
+            result = self._measure(p)
+        finally:
+            self._running.discard(name)
+        if p.kind == TRANSFORM:
+            self.invalidate(p.invalidates)
+            self.program = self.ctxt.ast = result
+        else:
+            self.results[name] = result
+        return result
+
+    def call(self, name, *args, **options):
+        '''
+        Ejecuta la orden name con args y options, después de las pasadas
+        que requiere; devuelve su resultado sin guardarlo.
+        '''
+        if self.ctxt.ast is not self.program:
+            self.program = self.ctxt.ast
+            self.results.clear()
+        p = self.passes[name]
+        if p.kind != COMMAND:
+            raise ValueError(f'Pass {name!r} is not a command, use get()')
+        for required in p.requires:
+            self.get(required)
+        return self._measure(p, *args, **options)
+
+    def run(self, *names):
+        '''
+        Ejecuta las pasadas names en ese orden; devuelve sus resultados.
+        '''
+        return [self.get(name) for name in names]
+
+    def _measure(self, p, *args, **options):
+        stats = self.stats[p.name]
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if self.trace_memory and not tracing:
+            tracemalloc.start()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        try:
+            return p.run(self, self.program, *args, **options)
+        finally:
+            stats.seconds += time.perf_counter() - t0
+            stats.runs += 1
+            if self.trace_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                stats.allocated += peak - before
+                stats.retained += current - before
+                if not tracing:
+                    tracemalloc.stop()
+
+    def report(self):
+        lines = [f'{"pass":14} {"runs":>5} {"hits":>5} {"ms":>10} {"alloc MB":>9} {"kept MB":>8}']
+        for name, s in self.stats.items():
+            lines.append(f'{name:14} {s.runs:5} {s.hits:5} {s.seconds * 1000:10.1f} '
+                         f'{s.allocated / 1e6:9.2f} {s.retained / 1e6:8.2f}')
+        return '\n'.join(lines)
+
+
+# Pasadas predefinidas
+
+def check(manager, program):
+    checker = SemanticAnalyzer(manager.ctxt.symbols)
+    checker.visit(program)
+    if checker.errors:
+        manager.ctxt.have_errors = True
+    return checker
+
+def dot(manager, program):
+    return dot_source(program.stmts)
+
+def parallel_check(manager, program, workers=None):
+    # Los errores de check con los cuerpos revisados en workers procesos,
+    # ver mparcheck.py
+    errors = check_parallel(program, manager.ctxt.symbols, workers)
+    if errors:
+        manager.ctxt.have_errors = True
+    return errors
+
+def dot_file(manager, program, file, **options):
+    # El DOT se escribe en file mientras se recorre el AST, ver mdot.write_dot
+    write_dot(program, file, **options)
+
+def png(manager, program, directory, **options):
+    # Un dibujo por función y clase, ver mdot.render_graphs
+    return render_graphs(program, directory, **options)
+
+def resolve(manager, program):
+    # Dirección (ámbito, casilla) de cada nombre, ver mresolve.py
+    return resolve_names(program, manager.ctxt.symbols)
+
+def layouts(manager, program):
+    # ClassLayout de cada clase, ver mlayout.py
+    return class_layouts(program)
+
+def arena(manager, program):
+    # Bajada al AST plano (ver marena.py); un Program que ya es plano
+    # (Context(flat=True)) devuelve su Arena
+    if isinstance(program.stmts, Declarations):
+        return program.stmts.arena
+    return Arena.from_ast(program, manager.ctxt.spans)
+
+FOLD_OPS = {
+    '+': lambda a, b: a + b,
+    '-': lambda a, b: a - b,
+    '*': lambda a, b: a * b,
+}
+NUMBERS = (int, float)
+
+def folded(node, constant):
+    # El ConstExpr que reemplaza a node, o None si no es constante. Sólo
+    # aritmética de enteros y flotantes que no depende del intérprete: sin
+    # división ni módulo (división por cero, redondeo de enteros)
+    cls = node.__class__
+    if cls is BinaryExpr:
+        left, right = node.left, node.right
+        if (left.__class__ is ConstExpr and right.__class__ is ConstExpr and node.operand in FOLD_OPS
+                and left.value.__class__ in NUMBERS and right.value.__class__ in NUMBERS):
+            return ConstExpr(constant(FOLD_OPS[node.operand](left.value, right.value)))
+    elif cls is UnaryExpr:
+        expr = node.expr
+        if node.operand == '-' and expr.__class__ is ConstExpr and expr.value.__class__ in NUMBERS:
+            return ConstExpr(constant(-expr.value))
+    elif cls is GroupingExpr:
+        if node.expr.__class__ is ConstExpr:
+            return node.expr
+    return None
+
+def fold(manager, program):
+    '''
+    Pliega las expresiones constantes: cambia en su padre cada BinaryExpr,
+    UnaryExpr y GroupingExpr de operandos constantes por un ConstExpr con
+    la posición de la expresión. Modifica el árbol; con un AST plano el
+    Program nuevo tiene sus declaraciones como objetos.
+    '''
+    spans = manager.ctxt.spans
+    symbols = manager.ctxt.symbols
+    constant = symbols.constant if symbols is not None else lambda value: value
+    new_program = Program(list(program.stmts))
+    if spans is not None and spans.get(program) is not None:
+        spans[new_program] = spans[program]
+
+    def replace(value):
+        if isinstance(value, Node):
+            new = folded(value, constant)
+            if new is None:
+                return value
+            if spans is not None and spans.get(new) is None and spans.get(value) is not None:
+                spans[new] = spans[value]
+            return new
+        if value.__class__ is list:
+            value[:] = [replace(item) for item in value]
+        return value
+
+    # Los hijos antes que los padres: al revés del preorden
+    for node in reversed(list(nodes(new_program))):
+        for name in FIELDS[KIND[node.__class__]]:
+            value = getattr(node, name)
+            if isinstance(value, Node) or value.__class__ is list:
+                setattr(node, name, replace(value))
+    return new_program
+
+PASSES = [
+    Pass('check', check),
+    Pass('dot', dot),
+    Pass('resolve', resolve),
+    Pass('layouts', layouts),
+    Pass('arena', arena),
+    Pass('fold', fold, TRANSFORM, invalidates=ALL),
+    Pass('parallel_check', parallel_check, COMMAND),
+    Pass('write_dot', dot_file, COMMAND),
+    Pass('png', png, COMMAND),
+]
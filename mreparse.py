@@ -0,0 +1,128 @@
+# mreparse.py
+'''
+Análisis incremental a nivel de declaraciones de nivel superior.
+
+Tras una edición del código fuente sólo se vuelven a lexear y analizar las
+declaraciones (FuncDecl, ClassDecl, VarDecl, ObjectDecl) cuyo fragmento
+toca la edición; el resto de nodos se reutiliza tal cual. El resultado es
+el mismo Program que daría analizar todo el código fuente editado:
+
+  - la región se lexea desde el fin de la declaración anterior (siempre un
+    ';' o un '}', que no se extienden) y el lexer se detiene cuando vuelve
+    a empezar un token justo donde empezaba una declaración posterior; si
+    un token cruza ese punto (por ejemplo al abrir un comentario o una
+    cadena) la región se amplía hasta la siguiente declaración;
+  - las declaraciones de la región se analizan como un programa; si hay un
+    error de sintaxis, o el programa queda vacío, se devuelve None y hay
+    que analizar todo (para informar los errores igual que siempre);
+  - los nodos reutilizados conservan sus posiciones: la SpanTable aplica el
+    desplazamiento de la edición al consultarlas y el LineIndex se
+    actualiza sólo en la región.
+'''
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+
+from mspans import LineIndex
+from myAST import Program
+
+
+@dataclass
+class Edit:
+    start: int      # source[start:end] se reemplaza por text
+    end: int
+    text: str
+
+    def apply(self, source):
+        return source[:self.start] + self.text + source[self.end:]
+
+
+@dataclass
+class Reparse:
+    program: Program
+    source: str
+    reused: int = 0
+    reparsed: int = 0
+
+
+class Outline:
+    '''
+    Inicio y fin de cada declaración de nivel superior, en orden; permite
+    encontrar por búsqueda binaria las que toca una edición.
+    '''
+    def __init__(self, program, spans):
+        self.starts = array('L')
+        self.ends = array('L')
+        for decl in program.stmts:
+            start, end = spans[decl]
+            self.starts.append(start)
+            self.ends.append(end)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def splice(self, lo, hi, starts, ends, delta):
+        shift = lambda column: array('L', [offset + delta for offset in column]) if delta else column
+        self.starts = self.starts[:lo] + starts + shift(self.starts[hi:])
+        self.ends = self.ends[:lo] + ends + shift(self.ends[hi:])
+
+
+def reparse(program, source, edit, lexer, parser, spans, lines, outline):
+    '''
+    Aplica edit a source y actualiza program. spans, lines y outline son
+    los de program y se actualizan en el sitio. Si Reparse.program es None
+    hay que analizar todo de nuevo, con tablas nuevas.
+    '''
+    new_source = edit.apply(source)
+    delta = len(edit.text) - (edit.end - edit.start)
+    starts, ends = outline.starts, outline.ends
+    count = len(outline)
+
+    # Declaraciones que tocan la edición: decls[lo:hi]
+    lo = bisect_left(ends, edit.start)
+    hi = bisect_right(starts, edit.end)
+    region_start = ends[lo - 1] if lo > 0 else 0
+
+    # Se lexea desde region_start hasta sincronizar con una declaración posterior
+    fragment = LineIndex()
+    saved = lexer.lines
+    lexer.lines = fragment
+    tokens = []
+    try:
+        for tok in lexer.tokenize(new_source, lines.line(region_start), region_start):
+            while hi < count and starts[hi] + delta < tok.index:
+                hi += 1
+            if hi < count and starts[hi] + delta == tok.index:
+                break
+            tokens.append(tok)
+        else:
+            hi = count
+    finally:
+        lexer.lines = saved
+    region_end = starts[hi] if hi < count else len(source)
+
+    # Las posiciones registradas a partir de aquí son del código fuente editado
+    spans.shift(region_end, delta)
+    decls = []
+    if tokens:
+        errors = []
+        parser.error = lambda tok: errors.append(tok)
+        try:
+            result = parser.parse(iter(tokens), spans)
+        finally:
+            del parser.error
+        if result is None or errors:
+            return Reparse(None, new_source)
+        decls = result.stmts
+
+    stmts = program.stmts[:lo] + decls + program.stmts[hi:]
+    if not stmts:
+        return Reparse(None, new_source)
+    new_program = Program(stmts)
+    spans[new_program] = (spans[stmts[0]][0], spans[stmts[-1]][1])
+
+    lines.splice(region_start, region_end, fragment.starts[1:], delta)
+    outline.splice(lo, hi,
+                   array('L', [spans[decl][0] for decl in decls]),
+                   array('L', [spans[decl][1] for decl in decls]), delta)
+    return Reparse(new_program, new_source, reused=len(stmts) - len(decls), reparsed=len(decls))
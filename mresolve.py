@@ -0,0 +1,244 @@
+# mresolve.py
+'''
+Resolución de nombres: una pasada después del análisis sintáctico que da
+a cada declaración una casilla (slot) en el marco de su ámbito y a cada
+referencia la dirección de la declaración que ve.
+
+Los ámbitos son los mismos que abre el checker: el global (Program), cada
+FuncDecl (parámetros y cuerpo), ClassDecl, la rama then y la rama else de
+un IfStmt, el cuerpo de un WhileStmt y todo un ForStmt. Una dirección es
+
+  (depth, slot)    depth ámbitos hacia afuera del de la referencia (0: el
+                   mismo), casilla slot de ese marco
+  (GLOBAL, slot)   casilla slot del marco global
+
+así que quien ejecute el programa con un marco (una lista) por ámbito
+abierto lee una variable con frames[-1 - depth][slot], sin buscar su
+nombre. Como en el checker, un nombre se ve desde su declaración hasta el
+final de su ámbito (también en su propio inicializador) y una segunda
+declaración en el mismo ámbito reutiliza la casilla de la primera.
+
+Las direcciones se guardan aparte, como las posiciones (mspans.SpanTable),
+por id de nodo: valen mientras el Program exista y no cambie.
+
+    resolution = resolve(program, ctxt.symbols)
+    resolution[var_expr]        # (depth, slot)
+    resolution.frame_size(func_decl)
+'''
+from myAST import *
+from symbols import ScopedTable
+
+GLOBAL = -1     # depth de una dirección del marco global
+
+
+class Resolution:
+    '''
+    Dirección de cada declaración y referencia, tamaño del marco de cada
+    ámbito y las referencias a nombres no declarados.
+    '''
+    def __init__(self):
+        self.addresses = {}     # id(nodo) -> (depth, slot)
+        self.frames = {}        # id(nodo que abre el ámbito) -> casillas
+        self.unresolved = []
+        self._pool = {}         # una tupla por dirección distinta
+
+    def __len__(self):
+        return len(self.addresses)
+
+    def __contains__(self, node):
+        return id(node) in self.addresses
+
+    def __getitem__(self, node):
+        return self.addresses[id(node)]
+
+    def __setitem__(self, node, address):
+        self.addresses[id(node)] = self._pool.setdefault(address, address)
+
+    def get(self, node, default=None):
+        return self.addresses.get(id(node), default)
+
+    def frame_size(self, node):
+        '''
+        Casillas del marco que abre node (Program: el global; IfStmt: la
+        rama then, la rama else es node.else_stmt).
+        '''
+        return self.frames[id(node)]
+
+
+class Resolver(Visitor):
+    '''
+    Recorre el AST con los ámbitos del checker. enter, leave, declare y
+    reference son los únicos puntos donde se tocan los ámbitos: una
+    subclase puede cambiarlos para recorrer el programa con otro entorno.
+    '''
+    def __init__(self, symbols=None):
+        self.table = ScopedTable(symbols)   # nombre -> (ámbito, casilla)
+        self.resolution = Resolution()
+        self.sizes = [0]                    # casillas usadas en cada ámbito abierto
+        self.scopes = [None]
+
+    def address(self, binding):
+        depth, slot = binding
+        if depth == 0:
+            return (GLOBAL, slot)
+        return (len(self.sizes) - 1 - depth, slot)
+
+    def enter(self, node):
+        self.table.push()
+        self.sizes.append(0)
+        self.scopes.append(node)
+
+    def leave(self):
+        self.table.pop()
+        self.resolution.frames[id(self.scopes.pop())] = self.sizes.pop()
+
+    def declare(self, node, name):
+        if self.table.in_scope(name):
+            binding = self.table.lookup(name)
+        else:
+            binding = (len(self.sizes) - 1, self.sizes[-1])
+            self.sizes[-1] += 1
+            self.table[name] = binding
+        self.resolution[node] = self.address(binding)
+
+    def reference(self, node, name):
+        binding = self.table.lookup(name)
+        if binding is None:
+            self.resolution.unresolved.append(node)
+            return
+        # address() y Resolution.__setitem__ en línea: es lo más frecuente
+        depth, slot = binding
+        address = (GLOBAL, slot) if depth == 0 else (len(self.sizes) - 1 - depth, slot)
+        resolution = self.resolution
+        resolution.addresses[id(node)] = resolution._pool.setdefault(address, address)
+
+    def children(self, node):
+        for name in FIELDS[KIND[node.__class__]]:
+            value = getattr(node, name)
+            if isinstance(value, Node):
+                yield value
+            elif is_list(value):
+                for item in value:
+                    if isinstance(item, Node):
+                        yield item
+
+    def body(self, stmts):
+        if isinstance(stmts, Node):
+            yield stmts
+        else:
+            for stmt in stmts:
+                yield stmt
+
+    # Visit methods
+
+    def visit(self, node: Node):
+        yield from self.children(node)
+
+    # Las expresiones más frecuentes, sin pasar por children()
+
+    def visit(self, node: ConstExpr):
+        pass
+
+    def visit(self, node: BinaryExpr):
+        yield node.left
+        yield node.right
+
+    def visit(self, node: ExprStmt):
+        yield node.expr
+
+    def visit(self, node: Program):
+        for stmt in node.stmts:
+            yield stmt
+        self.resolution.frames[id(node)] = self.sizes[0]
+
+    def visit(self, node: FuncDecl):
+        self.declare(node, node.ident)
+        self.enter(node)
+        for param in node.params:
+            self.declare(param, param.ident)
+        yield from self.body(node.body)
+        self.leave()
+
+    def visit(self, node: ClassDecl):
+        self.declare(node, node.ident)
+        self.enter(node)
+        yield from self.body(node.body)
+        self.leave()
+
+    def visit(self, node: VarDecl):
+        self.declare(node, node.ident)
+        if node.expr:
+            yield node.expr
+
+    def visit(self, node: ArrayDecl):
+        self.declare(node, node.ident)
+        yield node.size
+
+    def visit(self, node: ObjectDecl):
+        self.declare(node, node.instance_name)
+        yield from self.children(node)
+
+    def visit(self, node: IfStmt):
+        yield node.cond
+        self.enter(node)
+        yield from self.body(node.then_stmt)
+        self.leave()
+        if node.else_stmt:
+            self.enter(node.else_stmt)
+            yield from self.body(node.else_stmt)
+            self.leave()
+
+    def visit(self, node: WhileStmt):
+        yield node.cond
+        self.enter(node)
+        yield from self.body(node.body)
+        self.leave()
+
+    def visit(self, node: ForStmt):
+        self.enter(node)
+        for part in (node.initialization, node.condition, node.increment):
+            if part:
+                yield part
+        yield from self.body(node.body)
+        self.leave()
+
+    def visit(self, node: VarExpr):
+        self.reference(node, node.ident)
+
+    def visit(self, node: VarAssignExpr):
+        self.reference(node, node.ident)
+        yield node.expr
+
+    def visit(self, node: ArrayLookupExpr):
+        self.reference(node, node.ident)
+        yield node.index
+
+    def visit(self, node: ArrayAssignExpr):
+        self.reference(node, node.ident)
+        yield node.index
+        yield node.expr
+
+    def visit(self, node: ArraySizeExpr):
+        self.reference(node, node.ident)
+
+    def visit(self, node: CompoundAssignExpr):
+        self.reference(node, node.ident)
+        yield node.expr
+
+    def visit(self, node: CallExpr):
+        # Los parsers dejan los argumentos de una llamada a función en
+        # object_name: sólo un nombre ahí es el objeto de un método
+        if node.object_name and not isinstance(node.object_name, list):
+            self.reference(node, node.object_name)
+        else:
+            self.reference(node, node.ident)
+        yield from self.children(node)
+
+
+def resolve(program, symbols=None):
+    '''
+    Resolution de program; symbols es la SymbolTable de la compilación.
+    '''
+    resolver = Resolver(symbols)
+    resolver.visit(program)
+    return resolver.resolution
@@ -0,0 +1,459 @@
+# mserial.py
+'''
+Formato binario para guardar un Program de myAST o pasarlo a otro proceso.
+
+Mucho más compacto y rápido de escribir que pickle. Tanto Writer como
+Reader trabajan en streaming sobre un archivo: una declaración de nivel
+superior cada vez.
+
+Archivo:
+
+  cabecera   MAGIC, versión, flags (SPANS) y el esquema: nombre y número
+             de campos de cada clase de nodo, en el orden de sus tags
+  registros  uno por declaración de nivel superior:
+               DECL, longitud + entradas nuevas de la tabla, longitud + nodo
+             y al final END (con la posición del Program si hay SPANS)
+
+Todos los enteros son varints (LEB128). Cada valor de un nodo empieza por
+un tag: NONE, LIST (longitud y elementos), REF (entrada de la tabla), INT
+(zigzag), EMPTY (la tupla vacía compartida de myAST), BODY (longitud y
+los bytes del cuerpo de un FuncDecl) o NODE_BASE + clase, seguido de sus
+campos en orden. La tabla de cadenas y constantes no repite valores. Es
+acumulativa: cada registro añade las que usa por primera vez, así que un
+lector puede saltar el nodo de un registro sin decodificarlo.
+
+Con SPANS, tras el tag de cada nodo va su posición: 0 si no tiene, 1 si
+es (None, None) o zigzag(inicio - inicio anterior) + 2 y la longitud. La
+posición anterior vuelve a 0 al empezar cada registro y cada cuerpo.
+
+El cuerpo de cada FuncDecl se escribe aparte (BODY), de modo que el
+Reader puede devolverlo sin decodificar (lazy=True: un LazyBody que se
+decodifica al recorrerlo) y Reader.find carga una sola función.
+'''
+import dataclasses
+import io
+import struct
+from collections.abc import Sequence
+
+import myAST
+from myAST import Node, Program, FuncDecl, EMPTY
+from symbols import Symbol
+
+MAGIC = b'MCAST'
+FORMAT_VERSION = 1
+
+SPANS = 1           # flags
+
+# Registros
+END, DECL = 0, 1
+
+# Tags de valor
+NONE, LIST, REF, INT, EMPTY_TAG, BODY = range(6)
+NODE_BASE = 8
+
+# Tipos de entrada de la tabla
+STR, SYMBOL, FLOAT, BOOL, BIGINT = range(5)
+
+CLASSES = [cls for cls in vars(myAST).values() if isinstance(cls, type) and issubclass(cls, Node)]
+TAG = {cls: NODE_BASE + k for k, cls in enumerate(CLASSES)}
+FIELDS = {cls: tuple(f.name for f in dataclasses.fields(cls)) for cls in CLASSES}
+
+_double = struct.Struct('<d')
+
+
+def write_varint(out, n):
+    while n >= 0x80:
+        out.append((n & 0x7f) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def read_varint(data, pos):
+    b = data[pos]
+    if b < 0x80:
+        return b, pos + 1
+    n = b & 0x7f
+    shift = 7
+    pos += 1
+    while True:
+        b = data[pos]
+        pos += 1
+        n |= (b & 0x7f) << shift
+        if b < 0x80:
+            return n, pos
+        shift += 7
+
+
+def zigzag(n):
+    return n << 1 if n >= 0 else (-n << 1) - 1
+
+
+def unzigzag(n):
+    return n >> 1 if not n & 1 else -((n + 1) >> 1)
+
+
+def _read_file_varint(file):
+    n = shift = 0
+    while True:
+        b = file.read(1)
+        if not b:
+            raise EOFError('archivo truncado')
+        b = b[0]
+        n |= (b & 0x7f) << shift
+        if b < 0x80:
+            return n
+        shift += 7
+
+
+class Writer:
+    def __init__(self, file, spans=None):
+        self.file = file
+        self.spans = spans
+        self.table = {}       # (clase, valor) -> índice
+        header = bytearray(MAGIC)
+        write_varint(header, FORMAT_VERSION)
+        write_varint(header, SPANS if spans is not None else 0)
+        write_varint(header, len(CLASSES))
+        for cls in CLASSES:
+            name = cls.__name__.encode()
+            write_varint(header, len(name))
+            header += name
+            write_varint(header, len(FIELDS[cls]))
+        file.write(header)
+
+    def _ref(self, value, entries):
+        key = (value.__class__, value)
+        k = self.table.get(key)
+        if k is None:
+            k = self.table[key] = len(self.table)
+            cls = value.__class__
+            if cls is str or cls is Symbol:
+                data = str(value).encode('utf-8')
+                entries.append(STR if cls is str else SYMBOL)
+                write_varint(entries, len(data))
+                entries += data
+            elif cls is float:
+                entries.append(FLOAT)
+                entries += _double.pack(value)
+            elif cls is bool:
+                entries.append(BOOL)
+                entries.append(value)
+            elif cls is int:
+                entries.append(BIGINT)
+                write_varint(entries, zigzag(value))
+            else:
+                raise TypeError(f'valor no serializable en el AST: {value!r}')
+        return k
+
+    def _encode(self, root, out, entries):
+        # Preorden sin recursión; prev es la posición anterior (SPANS)
+        get = self.spans.get if self.spans is not None else None
+        prev = 0
+        stack = [root]
+        while stack:
+            value = stack.pop()
+            cls = value.__class__
+            tag = TAG.get(cls)
+            if tag is not None:
+                write_varint(out, tag)
+                if get is not None:
+                    span = get(value)
+                    if span is None:
+                        out.append(0)
+                    elif span[0] is None:
+                        out.append(1)
+                    else:
+                        write_varint(out, zigzag(span[0] - prev) + 2)
+                        write_varint(out, span[1] - span[0])
+                        prev = span[0]
+                fields = [getattr(value, name) for name in FIELDS[cls]]
+                if cls is FuncDecl:
+                    fields[-1] = _Body(fields[-1])
+                fields.reverse()
+                stack.extend(fields)
+            elif value is None:
+                out.append(NONE)
+            elif cls is list:
+                out.append(LIST)
+                write_varint(out, len(value))
+                stack.extend(reversed(value))
+            elif cls is int:
+                out.append(INT)
+                write_varint(out, zigzag(value))
+            elif value is EMPTY:
+                out.append(EMPTY_TAG)
+            elif cls is LazyBody:
+                # Un cuerpo leído con lazy=True se escribe ya decodificado
+                stack.append(value.load())
+            elif cls is _Body:
+                body = bytearray()
+                self._encode(value.stmts, body, entries)
+                out.append(BODY)
+                write_varint(out, len(body))
+                out += body
+            else:
+                out.append(REF)
+                write_varint(out, self._ref(value, entries))
+
+    def write(self, decl):
+        '''
+        Escribe una declaración de nivel superior.
+        '''
+        entries = bytearray()
+        data = bytearray()
+        self._encode(decl, data, entries)
+        record = bytearray([DECL])
+        write_varint(record, len(entries))
+        record += entries
+        write_varint(record, len(data))
+        self.file.write(record)
+        self.file.write(data)
+
+    def close(self, program=None):
+        record = bytearray([END])
+        if self.spans is not None:
+            span = self.spans.get(program) if program is not None else None
+            if span is None or span[0] is None:
+                record.append(0)
+            else:
+                write_varint(record, span[0] + 1)
+                write_varint(record, span[1] - span[0])
+        self.file.write(record)
+
+
+class _Body:
+    # Marca el cuerpo de un FuncDecl para escribirlo como BODY
+    __slots__ = ('stmts',)
+
+    def __init__(self, stmts):
+        self.stmts = stmts
+
+
+class LazyBody(Sequence):
+    '''
+    Cuerpo de un FuncDecl sin decodificar; se decodifica (una vez) al
+    recorrerlo o indexarlo.
+    '''
+    def __init__(self, reader, data, start, end):
+        self.reader = reader
+        self.data = data
+        self.start = start
+        self.end = end
+        self.stmts = None
+
+    def load(self):
+        if self.stmts is None:
+            self.stmts, _ = self.reader._decode(self.data, self.start)
+            self.data = None
+        return self.stmts
+
+    def __len__(self):
+        return len(self.load())
+
+    def __getitem__(self, k):
+        return self.load()[k]
+
+    def __iter__(self):
+        return iter(self.load())
+
+    def __eq__(self, other):
+        return self.load() == (other.load() if isinstance(other, LazyBody) else other)
+
+    def __repr__(self):
+        return repr(self.load()) if self.stmts is not None else f'LazyBody({self.end - self.start} bytes)'
+
+
+class Reader:
+    def __init__(self, file, symbols=None, spans=None, lazy=False):
+        '''
+        symbols: SymbolTable donde internar los identificadores (si no, str)
+        spans: SpanTable donde registrar las posiciones, si el archivo las tiene
+        lazy: no decodificar los cuerpos de las funciones hasta recorrerlos
+        '''
+        self.file = file
+        self.symbols = symbols
+        self.spans = spans
+        self.lazy = lazy
+        self.table = []
+        self.program_span = None
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError('no es un AST serializado de MiniC++')
+        version = _read_file_varint(file)
+        if version != FORMAT_VERSION:
+            raise ValueError(f'versión de formato {version}, se esperaba {FORMAT_VERSION}')
+        self.has_spans = bool(_read_file_varint(file) & SPANS)
+        known = {cls.__name__: cls for cls in CLASSES}
+        self.classes = []
+        for _ in range(_read_file_varint(file)):
+            name = file.read(_read_file_varint(file)).decode()
+            count = _read_file_varint(file)
+            cls = known.get(name)
+            if cls is None or len(FIELDS[cls]) != count:
+                raise ValueError(f'la clase {name} no coincide con myAST')
+            self.classes.append((cls, count))
+
+    def _read_entries(self, data):
+        table = self.table
+        intern = self.symbols.intern if self.symbols is not None else str
+        pos = 0
+        while pos < len(data):
+            type = data[pos]
+            pos += 1
+            if type == STR or type == SYMBOL:
+                n, pos = read_varint(data, pos)
+                text = str(data[pos:pos + n], 'utf-8')
+                pos += n
+                table.append(intern(text) if type == SYMBOL else text)
+            elif type == FLOAT:
+                table.append(_double.unpack_from(data, pos)[0])
+                pos += 8
+            elif type == BOOL:
+                table.append(bool(data[pos]))
+                pos += 1
+            else:
+                n, pos = read_varint(data, pos)
+                table.append(unzigzag(n))
+
+    def _decode(self, data, pos):
+        # Decodifica un valor en preorden sin recursión; devuelve (valor, fin)
+        table = self.table
+        classes = self.classes
+        # Directamente en la capa actual de la SpanTable
+        offsets = self.spans.offsets if self.has_spans and self.spans is not None else None
+        has_spans = self.has_spans
+        lazy = self.lazy
+        prev = 0
+        stack = []      # [constructor, campos que faltan, campos, posición]
+        while True:
+            tag = data[pos]
+            if tag < 0x80:
+                pos += 1
+            else:
+                tag, pos = read_varint(data, pos)
+            if tag >= NODE_BASE:
+                cls, count = classes[tag - NODE_BASE]
+                span = None
+                if has_spans:
+                    code, pos = read_varint(data, pos)
+                    if code == 1:
+                        span = (None, None)
+                    elif code:
+                        length, pos = read_varint(data, pos)
+                        prev += unzigzag(code - 2)
+                        span = (prev, prev + length)
+                if count:
+                    stack.append([cls, count, [], span])
+                    continue
+                value = cls()
+                if span is not None and offsets is not None:
+                    offsets[id(value)] = span
+            elif tag == REF:
+                k, pos = read_varint(data, pos)
+                value = table[k]
+            elif tag == NONE:
+                value = None
+            elif tag == LIST:
+                n, pos = read_varint(data, pos)
+                if n:
+                    stack.append([None, n, [], None])
+                    continue
+                value = []
+            elif tag == INT:
+                n, pos = read_varint(data, pos)
+                value = unzigzag(n)
+            elif tag == EMPTY_TAG:
+                value = EMPTY
+            elif tag == BODY:
+                n, pos = read_varint(data, pos)
+                if lazy:
+                    value = LazyBody(self, data, pos, pos + n)
+                else:
+                    value, _ = self._decode(data, pos)
+                pos += n
+            else:
+                raise ValueError(f'tag desconocido {tag}')
+            # Entregar el valor a los nodos y listas pendientes
+            while stack:
+                frame = stack[-1]
+                frame[2].append(value)
+                frame[1] -= 1
+                if frame[1]:
+                    break
+                stack.pop()
+                cls = frame[0]
+                if cls is None:
+                    value = frame[2]
+                else:
+                    value = cls(*frame[2])
+                    if frame[3] is not None and offsets is not None:
+                        offsets[id(value)] = frame[3]
+            else:
+                return value, pos
+
+    def _records(self):
+        # (tipo, bytes del nodo) de cada registro; la tabla se lee siempre
+        file = self.file
+        while True:
+            kind = file.read(1)
+            if not kind:
+                raise EOFError('archivo truncado')
+            if kind[0] == END:
+                if self.has_spans:
+                    start = _read_file_varint(file)
+                    if start:
+                        self.program_span = (start - 1, start - 1 + _read_file_varint(file))
+                return
+            self._read_entries(file.read(_read_file_varint(file)))
+            yield file.read(_read_file_varint(file))
+
+    def __iter__(self):
+        '''
+        Declaraciones de nivel superior, a medida que se leen.
+        '''
+        for data in self._records():
+            yield self._decode(data, 0)[0]
+
+    def load(self):
+        program = Program(list(self))
+        if self.spans is not None and self.program_span is not None:
+            self.spans[program] = self.program_span
+        return program
+
+    def find(self, ident):
+        '''
+        Primera función de nivel superior llamada ident, decodificando sólo
+        su cabecera y la de las demás declaraciones; None si no está.
+        '''
+        lazy = self.lazy
+        self.lazy = True
+        try:
+            for data in self._records():
+                decl = self._decode(data, 0)[0]
+                if isinstance(decl, FuncDecl) and decl.ident == ident:
+                    if not lazy:
+                        decl.body = decl.body.load()
+                    return decl
+        finally:
+            self.lazy = lazy
+        return None
+
+
+def dump(program, file, spans=None):
+    writer = Writer(file, spans)
+    for decl in program.stmts:
+        writer.write(decl)
+    writer.close(program)
+
+
+def load(file, symbols=None, spans=None, lazy=False):
+    return Reader(file, symbols, spans, lazy).load()
+
+
+def dumps(program, spans=None):
+    out = io.BytesIO()
+    dump(program, out, spans)
+    return out.getvalue()
+
+
+def loads(data, symbols=None, spans=None, lazy=False):
+    return load(io.BytesIO(data), symbols, spans, lazy)
@@ -0,0 +1,123 @@
+# msource.py
+'''
+Código fuente respaldado por un archivo mapeado en memoria (mmap).
+
+Permite lexear archivos muy grandes por trozos sin cargar nunca una copia
+decodificada completa en memoria. Los tokens siguen usando desplazamientos
+en caracteres (igual que cuando se lexea un str), así que MappedSource
+guarda un punto de control (carácter, byte) al comienzo de cada trozo para
+poder traducir un desplazamiento en caracteres a bytes y decodificar sólo
+el fragmento que se pide (find_source, error, valores de tokens).
+'''
+import bisect
+import codecs
+import mmap
+
+CHUNK_SIZE = 1 << 20
+
+
+class MappedSource:
+    def __init__(self, path, encoding='utf-8', chunk_size=CHUNK_SIZE):
+        self.path = path
+        self.encoding = encoding
+        self.chunk_size = chunk_size
+        self.file = open(path, 'rb')
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Archivo vacío: no se puede mapear
+            self.data = b''
+        # Puntos de control al inicio de cada trozo, rellenados por chunks()
+        self.char_marks = [0]
+        self.byte_marks = [0]
+        self.ascii_chunks = []
+        self.length = None
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def chunks(self):
+        '''
+        Genera el texto decodificado trozo a trozo. Una secuencia multibyte
+        partida entre dos trozos la resuelve el decodificador incremental.
+        Cada llamada vuelve a empezar los puntos de control; si otra llamada
+        (por ejemplo len()) los completa mientras ésta sigue, quedan los de
+        la otra.
+        '''
+        self.char_marks = char_marks = [0]
+        self.byte_marks = byte_marks = [0]
+        self.ascii_chunks = ascii_chunks = []
+        decoder = codecs.getincrementaldecoder(self.encoding)()
+        data = self.data
+        size = len(data)
+        chars = 0
+        for start in range(0, size, self.chunk_size):
+            raw = data[start:start + self.chunk_size]
+            final = start + self.chunk_size >= size
+            text = decoder.decode(raw, final)
+            ascii_chunks.append(len(text) == len(raw) and text.isascii())
+            chars += len(text)
+            pending = len(decoder.getstate()[0])
+            char_marks.append(chars)
+            byte_marks.append(min(size, start + self.chunk_size) - pending)
+            yield text
+        self.length = chars
+
+    def __len__(self):
+        if self.length is None:
+            for _ in self.chunks():
+                pass
+        return self.length
+
+    def _decode_chunk(self, i):
+        return self.data[self.byte_marks[i]:self.byte_marks[i + 1]].decode(self.encoding)
+
+    def char_to_byte(self, offset):
+        i = min(bisect.bisect_right(self.char_marks, offset) - 1, len(self.ascii_chunks) - 1)
+        if i < 0:
+            return offset
+        delta = offset - self.char_marks[i]
+        if self.ascii_chunks[i]:
+            return self.byte_marks[i] + delta
+        return self.byte_marks[i] + len(self._decode_chunk(i)[:delta].encode(self.encoding))
+
+    def byte_to_char(self, offset):
+        i = min(bisect.bisect_right(self.byte_marks, offset) - 1, len(self.ascii_chunks) - 1)
+        if i < 0:
+            return offset
+        delta = offset - self.byte_marks[i]
+        if self.ascii_chunks[i]:
+            return self.char_marks[i] + delta
+        raw = self.data[self.byte_marks[i]:self.byte_marks[i] + delta]
+        return self.char_marks[i] + len(raw.decode(self.encoding))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            raw = self.data[self.char_to_byte(start):self.char_to_byte(max(start, stop))]
+            return raw.decode(self.encoding)[::step]
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError('source index out of range')
+        return self[key:key + 1]
+
+    # '\n' nunca aparece dentro de una secuencia multibyte UTF-8, así que
+    # se puede buscar directamente en los bytes
+    def find(self, sub, start=0, end=None):
+        end = len(self) if end is None else end
+        pos = self.data.find(sub.encode(self.encoding), self.char_to_byte(start), self.char_to_byte(end))
+        return -1 if pos < 0 else self.byte_to_char(pos)
+
+    def rfind(self, sub, start=0, end=None):
+        end = len(self) if end is None else end
+        pos = self.data.rfind(sub.encode(self.encoding), self.char_to_byte(start), self.char_to_byte(end))
+        return -1 if pos < 0 else self.byte_to_char(pos)
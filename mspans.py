@@ -0,0 +1,147 @@
+# mspans.py
+'''
+Posiciones de la compilación para los diagnósticos.
+
+LineIndex guarda el desplazamiento de inicio de cada línea y lo rellena el
+lexer a medida que cuenta saltos de línea, así que el número de línea de
+un desplazamiento (una búsqueda binaria) coincide con el lineno de los
+tokens, incluso donde el lexer no cuenta líneas (saltos de línea dentro de
+un STRINGLIT).
+
+SpanTable guarda, para cada nodo del AST, el desplazamiento de inicio y de
+fin de su fragmento de código fuente. La rellena el parser.
+
+Ambos se pueden actualizar tras una edición sin volver a lexear todo el
+código fuente (ver mreparse.py).
+'''
+from array import array
+from bisect import bisect_right
+
+
+class LineIndex:
+    def __init__(self):
+        self.starts = array('L', [0])
+
+    def __len__(self):
+        return len(self.starts)
+
+    def add(self, offset):
+        self.starts.append(offset)
+
+    def newlines(self, text, start, end, base=0):
+        '''
+        Registra el inicio de línea que sigue a cada '\\n' de text[start:end];
+        base es el desplazamiento de text dentro del código fuente completo.
+        '''
+        find = text.find
+        append = self.starts.append
+        pos = find('\n', start, end)
+        while pos >= 0:
+            append(base + pos + 1)
+            pos = find('\n', pos + 1, end)
+
+    def splice(self, start, end, fragment, delta):
+        '''
+        Reemplaza los inicios de línea de (start, end] por los de fragment
+        (ya en posiciones del código fuente editado) y desplaza delta los
+        posteriores a end.
+        '''
+        starts = self.starts
+        lo = bisect_right(starts, start)
+        hi = bisect_right(starts, end)
+        tail = array('L', [offset + delta for offset in starts[hi:]]) if delta else starts[hi:]
+        self.starts = starts[:lo] + fragment + tail
+
+    def line(self, offset):
+        return bisect_right(self.starts, offset)
+
+    def locate(self, offset):
+        '''
+        (línea, columna) de offset; ambas como las cuenta el lexer.
+        '''
+        lineno = bisect_right(self.starts, offset)
+        return lineno, offset - self.starts[lineno - 1]
+
+    def bounds(self, lineno, length):
+        '''
+        (inicio, fin) de la línea lineno sin el salto de línea; length es
+        la longitud del código fuente, el fin de la última línea.
+        '''
+        start = self.starts[lineno - 1]
+        end = self.starts[lineno] - 1 if lineno < len(self.starts) else length
+        return start, end
+
+
+class SpanTable:
+    '''
+    Tras una edición (ver mreparse.py) los nodos reutilizados conservan
+    las posiciones del código fuente anterior: en lugar de recorrerlos
+    todos, la tabla guarda la edición (posición, desplazamiento) y la
+    aplica al consultarlos. Cada análisis posterior escribe en una capa
+    nueva; las capas se consultan de la más nueva a la más antigua.
+    '''
+    MAX_LAYERS = 32
+
+    def __init__(self):
+        self.offsets = {}    # capa actual: id(nodo) -> (inicio, fin)
+        self.older = []      # capas anteriores: (offsets, primera edición pendiente)
+        self.edits = []      # (posición, desplazamiento)
+
+    def __len__(self):
+        return len(self.offsets) + sum(len(offsets) for offsets, _ in self.older)
+
+    def __contains__(self, node):
+        return self.get(node) is not None
+
+    def __getitem__(self, node):
+        span = self.get(node)
+        if span is None:
+            raise KeyError(node)
+        return span
+
+    def __setitem__(self, node, span):
+        self.offsets[id(node)] = span
+
+    def get(self, node, default=None):
+        key = id(node)
+        span = self.offsets.get(key)
+        if span is not None or not self.older:
+            return span if span is not None else default
+        for offsets, first in reversed(self.older):
+            span = offsets.get(key)
+            if span is not None:
+                return self._shifted(span, first)
+        return default
+
+    def _shifted(self, span, first):
+        start, end = span
+        if start is None:
+            # Producción vacía en SLY: no tiene posición
+            return span
+        for pos, delta in self.edits[first:]:
+            if start >= pos:
+                start += delta
+                end += delta
+        return start, end
+
+    def shift(self, pos, delta):
+        '''
+        Las posiciones registradas hasta ahora que empiezan en pos o después
+        se desplazan delta; lo que se registre a partir de aquí va en una
+        capa nueva, con posiciones del código fuente editado.
+        '''
+        self.older.append((self.offsets, len(self.edits)))
+        self.edits.append((pos, delta))
+        self.offsets = {}
+        if len(self.older) > self.MAX_LAYERS:
+            self.compact()
+
+    def compact(self):
+        merged = {}
+        for offsets, first in self.older:
+            for key, span in offsets.items():
+                merged[key] = self._shifted(span, first)
+        merged.update(self.offsets)
+        self.offsets = merged
+        self.older = []
+        self.edits = []
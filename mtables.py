@@ -0,0 +1,127 @@
+# mtables.py
+'''
+Cache de las tablas LALR del Parser.
+
+SLY construye el autómata LALR completo cada vez que se define la clase
+Parser, es decir, en cada arranque del compilador. Este módulo guarda las
+tablas ya construidas en un archivo versionado, identificado por un hash
+de la gramática, y las vuelve a cargar en los siguientes arranques. Las
+tablas sólo se reconstruyen cuando cambia la gramática de parser.py (o la
+versión de SLY / del formato de la cache).
+
+Variables de entorno:
+  MC_CACHE_DIR      directorio de la cache (por defecto __pycache__ junto a este archivo)
+  MC_PARSER_DEBUG   si se define, archivo donde escribir el volcado de depuración de SLY
+'''
+import glob
+import hashlib
+import marshal
+import os
+import tempfile
+
+import sly
+from sly.yacc import YaccError
+
+# Incrementar cuando cambie el formato del archivo de tablas
+TABLES_VERSION = 1
+
+
+class LRTables:
+    '''
+    Tablas LALR cargadas desde la cache. Expone sólo lo que necesita
+    sly.Parser.parse() (lr_action, lr_goto y defaulted_states).
+    '''
+    def __init__(self, lr_action, lr_goto, defaulted_states):
+        self.lr_action = lr_action
+        self.lr_goto = lr_goto
+        self.defaulted_states = defaulted_states
+
+
+def cache_dir():
+    return os.environ.get('MC_CACHE_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), '__pycache__')
+
+
+def grammar_hash(cls):
+    '''
+    Hash estable de la gramática ya construida: tokens, precedencias y
+    producciones, junto con las versiones de SLY y del formato.
+    '''
+    h = hashlib.sha256()
+    h.update(f'{TABLES_VERSION}:{sly.__version__}\n'.encode())
+    h.update(repr(sorted(cls.tokens)).encode())
+    h.update(repr(getattr(cls, 'precedence', ())).encode())
+    for p in cls._grammar.Productions:
+        h.update(repr((p.name, p.prod, p.prec)).encode())
+    return h.hexdigest()
+
+
+def table_path(key):
+    return os.path.join(cache_dir(), f'parsetab-{key[:16]}.marshal')
+
+
+def load_tables(path, key):
+    try:
+        with open(path, 'rb') as f:
+            version, stored_key, lr_action, lr_goto, defaulted = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if version != TABLES_VERSION or stored_key != key:
+        return None
+    return LRTables(lr_action, lr_goto, defaulted)
+
+
+def save_tables(path, key, lrtable):
+    data = (TABLES_VERSION, key, lrtable.lr_action, lrtable.lr_goto, lrtable.defaulted_states)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Escritura atómica: varios procesos pueden arrancar a la vez
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            marshal.dump(data, f)
+        os.replace(tmp, path)
+    except OSError:
+        # La cache es opcional: si no se puede escribir, seguimos sin ella
+        return
+    # Las tablas de otras versiones de la gramática ya no se usan
+    for old in glob.glob(os.path.join(os.path.dirname(path), 'parsetab-*.marshal')):
+        if old != path:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+
+def write_debugfile(cls, path):
+    with open(path, 'w') as f:
+        f.write(str(cls._grammar))
+        f.write('\n')
+        f.write(str(cls._lrtable))
+    cls.log.info('Parser debugging for %s written to %s', cls.__qualname__, path)
+
+
+def build(cls, definitions):
+    '''
+    Reemplazo de sly.Parser._build que usa la cache de tablas.
+    Los métodos privados de sly.Parser se llaman por su nombre real.
+    '''
+    rules = [(name, value) for name, value in definitions
+             if callable(value) and hasattr(value, 'rules')]
+
+    if not cls._Parser__validate_specification():
+        raise YaccError('Invalid parser specification')
+
+    # La gramática es barata de construir; las tablas LR son lo costoso
+    cls._Parser__build_grammar(rules)
+
+    key = grammar_hash(cls)
+    path = table_path(key)
+    tables = None if cls.debugfile else load_tables(path, key)
+    if tables is None:
+        if not cls._Parser__build_lrtables():
+            raise YaccError('Can\'t build parsing tables')
+        save_tables(path, key, cls._lrtable)
+    else:
+        cls._lrtable = tables
+
+    if cls.debugfile:
+        write_debugfile(cls, cls.debugfile)
@@ -1,134 +1,268 @@
 from __future__ import annotations
-from dataclasses import dataclass,field
-from multimethod import multimeta
-from typing import List, Union
+import collections.abc
+import dataclasses
+import sys
+from dataclasses import dataclass
+from types import GeneratorType
+from typing import Optional, Sequence, Union
+
+from symbols import Symbol
 '''
 Clases abstractas para el AST
+
+Los nodos usan __slots__ (sin __dict__ por instancia) y las listas de
+hijos vacías se reemplazan por la tupla vacía compartida EMPTY, así que
+un programa grande ocupa bastante menos memoria. Los campos de un nodo
+no se pueden añadir después de crearlo.
 '''
 
-@dataclass
-class Visitor (metaclass = multimeta):
-  pass
+EMPTY = ()
+
+# Un identificador: Symbol si el parser internó los nombres, si no str
+Name = Union[Symbol, str]
+
+def share_empty(*names):
+  '''
+  __post_init__ que cambia las listas vacías de names por EMPTY.
+  '''
+  def __post_init__(self):
+    for name in names:
+      value = getattr(self, name)
+      if value.__class__ is list and not value:
+        setattr(self, name, EMPTY)
+  return __post_init__
+
+class _VisitNamespace(dict):
+  # Cuerpo de una clase Visitor: cada "def visit" anotado se acumula en
+  # lugar de reemplazar al anterior
+  def __init__(self):
+    super().__init__()
+    self.visits = []
+
+  def __setitem__(self, key, value):
+    if key == 'visit' and _visited_type(value) is not None:
+      self.visits.append(value)
+    else:
+      super().__setitem__(key, value)
+
+def _visited_type(func):
+  # Anotación del parámetro del nodo (el que sigue a self), o None
+  code = getattr(func, '__code__', None)
+  if code is None or code.co_argcount < 2:
+    return None
+  return getattr(func, '__annotations__', {}).get(code.co_varnames[1])
+
+class VisitorMeta(type):
+  '''
+  Una clase Visitor define un "def visit(self, node: Clase)" por cada
+  clase de nodo. En lugar de despachar por tipo en cada llamada (como
+  multimethod), la metaclase arma una vez por clase Visitor la tabla
+  visit_table: clase de nodo -> función; Visitor.visit sólo la indexa.
+  '''
+  @classmethod
+  def __prepare__(mcls, name, bases, **kwds):
+    return _VisitNamespace()
 
-@dataclass
+  def __new__(mcls, name, bases, namespace, **kwds):
+    cls = super().__new__(mcls, name, bases, dict(namespace), **kwds)
+    table = {}
+    for base in reversed(cls.__mro__[1:]):
+      table.update(base.__dict__.get('visit_table', {}))
+    names = sys.modules[cls.__module__].__dict__
+    for func in namespace.visits:
+      node_type = _visited_type(func)
+      if isinstance(node_type, str):
+        # from __future__ import annotations: se resuelve en el módulo
+        node_type = eval(node_type, names)
+      table[node_type] = func
+    cls.visit_table = table
+    return cls
+
+class Visitor (metaclass = VisitorMeta):
+  '''
+  visit(node) recorre el árbol con una pila explícita, sin recursión de
+  Python, así que no hay límite de profundidad (cadenas de "a + b + ..."
+  o de "else if" generadas).
+
+  Un método visit devuelve su resultado directamente o es un generador:
+  "resultado = yield hijo" visita el hijo y reanuda el método con lo que
+  devolvió. Lo que va antes del primer yield es el gancho previo del nodo
+  (pre), lo que va después del último, el posterior (post), y el return
+  del generador es el resultado del nodo.
+  '''
+  def visit(self, node):
+    table = self.visit_table
+    try:
+      method = table[node.__class__]
+    except KeyError:
+      method = self.dispatch(node.__class__)
+    value = method(self, node)
+    if value.__class__ is not GeneratorType:
+      return value
+    # Pila de métodos a medio ejecutar; value es el resultado del último hijo
+    stack = [value]
+    value = None
+    while stack:
+      try:
+        child = stack[-1].send(value)
+      except StopIteration as stop:
+        stack.pop()
+        value = stop.value
+        continue
+      try:
+        method = table[child.__class__]
+      except KeyError:
+        method = self.dispatch(child.__class__)
+      value = method(self, child)
+      if value.__class__ is GeneratorType:
+        stack.append(value)
+        value = None
+    return value
+
+  @classmethod
+  def dispatch(cls, node_type):
+    '''
+    Método para node_type: el de la clase más cercana en su MRO, que
+    queda en la tabla para las siguientes llamadas.
+    '''
+    table = cls.visit_table
+    for base in node_type.__mro__:
+      method = table.get(base)
+      if method is not None:
+        table[node_type] = method
+        return method
+    raise TypeError(f"{cls.__name__}: no visit method for {node_type.__name__}")
+
+@dataclass(slots=True)
 class Node:
   def accept(self, v: Visitor):
     return v.visit(self)
   
-@dataclass
+@dataclass(slots=True)
 class Expression (Node):
   pass
 
-@dataclass
+@dataclass(slots=True)
 class Statement (Node):
   pass
 
+@dataclass(slots=True)
 class Declaration(Statement):
   pass
 
 '''
 Clases declarativas para el AST
 '''
-@dataclass
+@dataclass(slots=True)
 class FuncDecl(Declaration):
-  return_type : str
-  ident : str
-  params : List[VarDecl] = field(default_factory = list)
-  body : List[Statement] = field(default_factory = list)
+  return_type : Optional[str]
+  ident : Name
+  params : Sequence[VarDecl] = EMPTY
+  body : Sequence[Statement] = EMPTY
+  __post_init__ = share_empty('params', 'body')
   
-@dataclass
+@dataclass(slots=True)
 class VarDecl(Declaration):
   var_type : str
-  ident : str
-  expr : Expression = None
-@dataclass
+  ident : Name
+  expr : Optional[Expression] = None
+@dataclass(slots=True)
 class ClassDecl(Declaration):
-  ident : str
-  super_class : str
-  body : List[Statement] = field(default_factory = list)
+  ident : Name
+  super_class : Optional[Name]
+  body : Sequence[Statement] = EMPTY
+  __post_init__ = share_empty('body')
   
-@dataclass
+@dataclass(slots=True)
 class ArrayDecl(Declaration):
   var_type : str
-  ident : str
+  ident : Name
   size : Expression
   
-@dataclass
+@dataclass(slots=True)
 class ObjectDecl(Declaration):
-  class_type: str
-  instance_name: str
-  args : List[Expression] = field(default_factory = list)
+  class_type: Name
+  instance_name: Name
+  args : Optional[Sequence[Expression]] = EMPTY
+  __post_init__ = share_empty('args')
 
 '''
 Acciones sin valores asociados
 '''
-@dataclass
+@dataclass(slots=True)
 class Program (Statement):
-  stmts: List[Statement] = field (default_factory = list)
+  stmts: Sequence[Statement] = EMPTY
+  __post_init__ = share_empty('stmts')
   
-@dataclass
+@dataclass(slots=True)
 class ExprStmt(Statement):
   expr: Expression
   
   
-@dataclass
+@dataclass(slots=True)
 class IfStmt(Statement):
   cond : Expression
-  then_stmt : List[Statement] = field(default_factory = list)
-  else_stmt : List[Statement] = field(default_factory = list) 
+  then_stmt : Sequence[Statement] = EMPTY
+  else_stmt : Sequence[Statement] = EMPTY 
+  __post_init__ = share_empty('then_stmt', 'else_stmt')
   
-@dataclass
+@dataclass(slots=True)
 class ReturnStmt(Statement):
-  expr : Expression = None
+  expr : Optional[Expression] = None
 
-@dataclass
+@dataclass(slots=True)
 class BreakStmt(Statement):
   pass
 
-@dataclass
+@dataclass(slots=True)
 class WhileStmt(Statement):
   cond : Expression
-  body : List[Statement] = field(default_factory = list)
+  body : Sequence[Statement] = EMPTY
+  __post_init__ = share_empty('body')
   
-@dataclass
+@dataclass(slots=True)
 class ForStmt(Statement):
-  initialization: Statement  # Puede ser VarDecl o ExprStmt
-  condition: Expression
-  increment: Statement
-  body: List[Statement] = field(default_factory = list)
+  initialization: Optional[Statement]  # Puede ser VarDecl o ExprStmt
+  condition: Optional[Expression]
+  increment: Optional[Expression]
+  body: Sequence[Statement] = EMPTY
+  __post_init__ = share_empty('body')
   
-@dataclass
+@dataclass(slots=True)
 class PrintStmt(Statement):
   format_string : str
-  args_list : List[Expression] = field(default_factory = list)
+  args_list : Sequence[Expression] = EMPTY
+  __post_init__ = share_empty('args_list')
 
-@dataclass 
+@dataclass(slots=True)
 class SPrintStmt(Statement):
   buffer : VarExpr 
   format_string : str
-  args_list : List[Expression] = field(default_factory = list)
+  args_list : Sequence[Expression] = EMPTY
+  __post_init__ = share_empty('args_list')
 
-@dataclass
+@dataclass(slots=True)
 class ContinueStmt(Statement):
   pass
 
-@dataclass
+@dataclass(slots=True)
 class SizeStmt(Statement):
-  ident : str
+  ident : Name
 
-@dataclass
+@dataclass(slots=True)
 class ThisStmt(Statement):
   pass
 
-@dataclass
+@dataclass(slots=True)
 class SuperStmt(Statement):
-  args_list : List[Expression] = field(default_factory = list)
+  args_list : Sequence[Expression] = EMPTY
+  __post_init__ = share_empty('args_list')
   
-@dataclass
+@dataclass(slots=True)
 class PrivateStmt(Statement):
   pass
 
-@dataclass
+@dataclass(slots=True)
 class PublicStmt(Statement):
   pass
 
@@ -136,96 +270,128 @@ class PublicStmt(Statement):
 Expresiones con valores asociados
 '''
 
-@dataclass
+@dataclass(slots=True)
 class NullExpr(Expression):
   pass
 
-@dataclass
+@dataclass(slots=True)
 class CallExpr(Expression):
-  ident : str
-  object_name : str = None
-  args : List[Expression] = field(default_factory = list)
+  ident : Name
+  object_name : Optional[Name] = None
+  args : Sequence[Expression] = EMPTY
+  __post_init__ = share_empty('args')
 
-@dataclass
+@dataclass(slots=True)
 class ConstExpr(Expression):
   value : Union[int, float, bool, str]
   
-@dataclass
+@dataclass(slots=True)
 class CompoundAssignExpr(Expression):
-    ident: str
+    ident: Name
     operator: str  
     expr: Expression
 
-@dataclass
+@dataclass(slots=True)
 class VarExpr(Expression):
-  ident : str
+  ident : Name
     
-@dataclass
+@dataclass(slots=True)
 class ArrayLookupExpr(Expression):
-  ident : str
+  ident : Name
   index : Expression
 
-@dataclass
+@dataclass(slots=True)
 class VarAssignExpr(Expression):
-  ident : str
+  ident : Name
   expr : Expression
   
-@dataclass
+@dataclass(slots=True)
 class ArrayAssignExpr(Expression):
-  ident : str
+  ident : Name
   index : Expression
   expr : Expression
 
-@dataclass
+@dataclass(slots=True)
 class ArraySizeExpr(Expression):
-  ident : str
+  ident : Name
   
-@dataclass
+@dataclass(slots=True)
 class IntToFloatExpr(Expression):
   expr : Expression
   
-@dataclass
+@dataclass(slots=True)
 class BinaryExpr(Expression):
   left: Expression
   operand: str
   right: Expression
   
-@dataclass
+@dataclass(slots=True)
 class UnaryExpr(Expression):
   operand: str
   expr: Expression
   
-@dataclass
+@dataclass(slots=True)
 class CastExpr(Expression):
   target_type: str
   expr: Expression
   
-@dataclass
+@dataclass(slots=True)
 class GroupingExpr(Expression):
   expr: Expression
   
-@dataclass
+@dataclass(slots=True)
 class PrefixIncExpr(Expression):
   expr: Expression
   
-@dataclass
+@dataclass(slots=True)
 class PrefixDecExpr(Expression):
   expr: Expression 
   
-@dataclass
+@dataclass(slots=True)
 class PostfixIncExpr(Expression):
   expr: Expression
   
-@dataclass
+@dataclass(slots=True)
 class PostfixDecExpr(Expression):
   expr: Expression
   
-@dataclass 
+@dataclass(slots=True)
 class ShortCircuitAndExpr(Expression):
   left: Expression
   right: Expression
   
-@dataclass
+@dataclass(slots=True)
 class ShortCircuitOrExpr(Expression):
   left: Expression
   right: Expression
+
+
+# Clases de nodo en orden de definición: KINDS[k] es la clase de tipo k,
+# KIND la inversa y FIELDS[k] los nombres de sus campos, en orden
+KINDS = [cls for cls in list(globals().values()) if isinstance(cls, type) and issubclass(cls, Node)]
+KIND = {cls: kind for kind, cls in enumerate(KINDS)}
+FIELDS = [tuple(f.name for f in dataclasses.fields(cls)) for cls in KINDS]
+
+def is_list(value):
+  '''
+  Lista de hijos de un nodo: una list o una secuencia que construye sus
+  elementos al recorrerla (marena.Declarations, mserial.LazyBody). EMPTY
+  y las cadenas no.
+  '''
+  cls = value.__class__
+  return cls is list or (cls is not tuple and cls is not str and isinstance(value, collections.abc.Sequence))
+
+def nodes(program):
+  '''
+  Todos los nodos del AST, sin recursión.
+  '''
+  stack = [program]
+  while stack:
+    node = stack.pop()
+    if node.__class__ is list:
+      stack.extend(node)
+    elif isinstance(node, Node):
+      yield node
+      stack.extend(getattr(node, name) for name in FIELDS[KIND[node.__class__]])
+    elif is_list(node):
+      stack.extend(node)
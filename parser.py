@@ -1,12 +1,15 @@
 from dataclasses import dataclass
+import os
 import sly
 from rich import print
 from lexer import Lexer
 from myAST import *
+import mtables
+from mspans import SpanTable
 
 class Parser(sly.Parser):
-    # Nombre del archivo de depuración generado por SLY
-    debugfile = 'parser.out'
+    # Archivo de depuración de SLY: sólo se escribe si se pide (MC_PARSER_DEBUG=parser.out)
+    debugfile = os.environ.get('MC_PARSER_DEBUG')
     
     # Importamos los tokens desde el lexer
     tokens = Lexer.tokens
@@ -23,6 +26,21 @@ class Parser(sly.Parser):
     def __init__(self):
         self.debugging = True
 
+    # Las tablas LALR se cargan de la cache (ver mtables.py) en lugar de
+    # reconstruirse en cada arranque
+    @classmethod
+    def _build(cls, definitions):
+        mtables.build(cls, definitions)
+
+    # Las posiciones de los nodos se guardan en la SpanTable de la
+    # compilación (ver mspans.py)
+    def parse(self, tokens, spans=None):
+        self.spans = spans if spans is not None else SpanTable()
+        self._index_positions = self.spans.offsets
+        self._line_positions = {}
+        self.syntax_errors = 0
+        return super().parse(tokens)
+
     # Reglas de gramática
     
     # Programa inicial: lista de declaraciones
@@ -30,9 +48,12 @@ class Parser(sly.Parser):
     def program(self, p):
         return Program(p.decl_list)
 
+    # Las listas se extienden en el sitio: copiarlas en cada reducción
+    # hace que el análisis sea cuadrático en el número de elementos
     @_("decl_list decl")
     def decl_list(self, p):
-        return p.decl_list + [p.decl]
+        p.decl_list.append(p.decl)
+        return p.decl_list
 
     @_("decl")
     def decl_list(self, p):
@@ -48,13 +69,24 @@ class Parser(sly.Parser):
     def class_decl(self, p):
         return ClassDecl(p.IDENT, None, p.class_body)
 
-    @_("access_specifier class_body")
+    # Herencia simple: class B : A { ... }; o class B : public A { ... };
+    @_("CLASS IDENT ':' base_class '{' class_body '}' ';'")
+    def class_decl(self, p):
+        return ClassDecl(p.IDENT, p.base_class, p.class_body)
+
+    @_("IDENT", "PUBLIC IDENT")
+    def base_class(self, p):
+        return p.IDENT
+
+    # Recursiva por la izquierda para poder añadir al final de la lista
+    @_("class_body access_specifier")
     def class_body(self, p):
         return p.class_body
 
-    @_("class_member class_body")
+    @_("class_body class_member")
     def class_body(self, p):
-        return [p.class_member] + p.class_body
+        p.class_body.append(p.class_member)
+        return p.class_body
 
     @_("empty")
     def class_body(self, p):
@@ -88,7 +120,8 @@ class Parser(sly.Parser):
 
     @_("param_list ',' param")
     def param_list(self, p):
-        return p.param_list + [p.param]
+        p.param_list.append(p.param)
+        return p.param_list
 
     @_("param")
     def param_list(self, p):
@@ -109,7 +142,8 @@ class Parser(sly.Parser):
       
     @_("block_items block_item")
     def block_items(self, p):
-        return p.block_items + [p.block_item]
+        p.block_items.append(p.block_item)
+        return p.block_items
       
     @_("block_item")
     def block_items(self, p):
@@ -271,7 +305,8 @@ class Parser(sly.Parser):
 
     @_("args_list ',' expr")
     def args_list(self, p):
-        return p.args_list + [p.expr]
+        p.args_list.append(p.expr)
+        return p.args_list
 
     @_("expr")
     def args_list(self, p):
@@ -453,6 +488,7 @@ class Parser(sly.Parser):
 
     # Manejo de errores de sintaxis
     def error(self, p):
+        self.syntax_errors += 1
         if p:
             lineo = p.lineno
             value = p.value
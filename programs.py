@@ -0,0 +1,196 @@
+# programs.py
+'''
+Generadores de programas MiniC++ sintéticos para los benchmarks y las
+pruebas.
+Todos producen programas que pasan el SemanticAnalyzer sin errores.
+'''
+
+def identifier_heavy(functions=100, locals_=30, depth=3, globals_=20):
+    '''
+    Muchas variables globales y locales, bloques anidados y referencias.
+    '''
+    lines = [f'int g{k} = {k};' for k in range(globals_)]
+    for f in range(functions):
+        lines.append(f'int f{f}(int a, int b) {{')
+        for v in range(locals_):
+            lines.append(f'  int v{v} = a + g{v % globals_} * b;')
+        indent = '  '
+        for d in range(depth):
+            lines.append(f'{indent}while (a < b) {{')
+            indent += '  '
+            for v in range(0, locals_, 3):
+                lines.append(f'{indent}int w{d}_{v} = v{v} + v{(v + 1) % locals_} - g{v % globals_};')
+                lines.append(f'{indent}v{v} = w{d}_{v} * a + b;')
+        for d in range(depth):
+            indent = indent[:-2]
+            lines.append(f'{indent}}}')
+        lines.append(f'  return v0 + v{locals_ - 1};')
+        lines.append('}')
+    lines.append('int main() {')
+    lines.append('  return 0;')
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+def many_functions(functions=1000, statements=10):
+    '''
+    Muchas funciones de nivel superior con cuerpos cortos.
+    '''
+    lines = []
+    for f in range(functions):
+        lines.append(f'int f{f}(int x) {{')
+        lines.append('  int y = x;')
+        for s in range(statements):
+            lines.append(f'  y = y + {s} * x;')
+        lines.append('  return y;')
+        lines.append('}')
+    lines.append('int main() {')
+    lines.append('  return 0;')
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+def long_expression(depth=100_000):
+    '''
+    Una expresión "x + 1 + 1 + ..." de depth operadores: como la gramática
+    es recursiva por la izquierda, un árbol de BinaryExpr de esa altura.
+    '''
+    return ('int main() {\n'
+            '  int x = 0;\n'
+            f'  x = x{" + 1" * depth};\n'
+            '  return x;\n'
+            '}\n')
+
+def else_if_ladder(depth=100_000):
+    '''
+    Una cadena de depth "else if": cada IfStmt es el else del anterior.
+    '''
+    lines = ['int main() {', '  int x = 0;', '  if (x == 0) { x = 1; }']
+    for k in range(1, depth):
+        lines.append(f'  else if (x == {k}) {{ x = {k + 1}; }}')
+    lines.append('  else { x = 0; }')
+    lines.append('  return x;')
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+def nested_parentheses(depth=100_000):
+    '''
+    Una expresión "(1 + (1 + (... x)))" con depth paréntesis anidados.
+    '''
+    return ('int main() {\n'
+            '  int x = 0;\n'
+            f'  x = {"(1 + " * depth}x{")" * depth};\n'
+            '  return x;\n'
+            '}\n')
+
+def literal_table(rows=10_000, distinct=64):
+    '''
+    Tablas de datos: arrays que se llenan con literales (enteros grandes,
+    flotantes y cadenas) que se repiten entre un conjunto de distinct.
+    '''
+    lines = ['int main() {',
+             f'  int ids[{rows}];',
+             f'  float prices[{rows}];',
+             f'  string names[{rows}];']
+    for k in range(rows):
+        v = k % distinct
+        lines.append(f'  ids[{k}] = {100000 + v};')
+        lines.append(f'  prices[{k}] = {v}.25;')
+        lines.append(f'  names[{k}] = "item{v}";')
+    lines.append('  return 0;')
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+def constant_expressions(functions=1000, statements=10):
+    '''
+    Como many_functions, con subexpresiones constantes para plegar.
+    '''
+    lines = []
+    for f in range(functions):
+        lines.append(f'int f{f}(int x) {{')
+        lines.append(f'  int y = x + (2 * {f} - -1);')
+        for s in range(statements):
+            lines.append(f'  y = y + ({s} * 4 + 1) * x;')
+        lines.append('  return y;')
+        lines.append('}')
+    lines.append('int main() {')
+    lines.append('  return 0;')
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+def class_heavy(classes=100, methods=20, calls=20, depth=5):
+    '''
+    Clases con muchos métodos en cadenas de herencia de depth niveles (cada
+    clase redefine algunos métodos de su superclase) y un main con calls
+    llamadas a métodos por clase, la mayoría heredados.
+    '''
+    lines = []
+    for c in range(classes):
+        base = f' : public C{c - 1}' if c % depth else ''
+        lines.append(f'class C{c}{base} {{')
+        lines.append('  public:')
+        lines.append(f'    int f{c};')
+        lines.append(f'    C{c}() {{ f{c} = {c}; }}')
+        for m in range(methods):
+            if c % depth == 0 or m % depth == c % depth:
+                lines.append(f'    int m{m}(int a) {{ return a + {m}; }}')
+        lines.append('};')
+    lines.append('int main() {')
+    lines.append('  int r = 0;')
+    for c in range(classes):
+        lines.append(f'  C{c} o{c};')
+        for k in range(calls):
+            lines.append(f'  r = r + o{c}.m{(k * 7) % methods}(r);')
+    lines.append('  return r;')
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+FORMATS = [
+    ('"x=%d\\n"', ['i']),
+    ('"%s: %5.2f (%d)\\n"', ['s', 'f', 'i']),
+    ('"[%-8s|%08.3f|%x]"', ['s', 'f', 'i']),
+    ('"%d/%d/%d %s\\t%e\\n"', ['i', 'i', 'i', 's', 'f']),
+]
+
+def printf_heavy(statements=10_000, errors=0):
+    '''
+    Un main con statements printf/sprintf que reutilizan unos pocos
+    formatos; cada errors-ésimo lleva un argumento del tipo equivocado.
+    '''
+    names = {'i': 'n', 'f': 'p', 's': 'name'}
+    lines = ['int main() {',
+             '  int n = 42;',
+             '  float p = 3.5;',
+             '  string name = "item";',
+             '  string buffer;']
+    for k in range(statements):
+        fmt, kinds = FORMATS[k % len(FORMATS)]
+        args = [names[kind] for kind in kinds]
+        if errors and k % errors == 0:
+            args[0] = 'p' if kinds[0] != 'f' else 'name'
+        if k % 2:
+            lines.append(f'  sprintf(buffer, {fmt}, {", ".join(args)});')
+        else:
+            lines.append(f'  printf({fmt}, {", ".join(args)});')
+    lines.append('  return 0;')
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+def call_chain(functions=1000, statements=10, globals_=100):
+    '''
+    Funciones sin parámetros que leen una variable global cada una
+    (g{f % globals_}) y llaman a la anterior, así que cada función depende
+    de una global y de su vecina.
+    '''
+    lines = [f'int g{k} = {k};' for k in range(globals_)]
+    for f in range(functions):
+        lines.append(f'int f{f}() {{')
+        lines.append(f'  int y = g{f % globals_};')
+        for s in range(statements):
+            lines.append(f'  y = y + {s} * g{f % globals_};')
+        if f:
+            lines.append(f'  y = y + f{f - 1}();')
+        lines.append('  return y;')
+        lines.append('}')
+    lines.append('int main() {')
+    lines.append(f'  return f{functions - 1}();')
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
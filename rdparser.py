@@ -0,0 +1,712 @@
+# rdparser.py
+'''
+Parser alternativo para MiniC++: descenso recursivo para declaraciones y
+sentencias, y precedence climbing (Pratt) para las expresiones.
+
+Reconoce exactamente el mismo lenguaje que la gramática LALR de
+parser.Parser y construye los mismos nodos de myAST, incluidas sus
+particularidades:
+
+  - un bloque '{ ... }' se devuelve como lista de sentencias, y un bloque
+    anidado como lista dentro de esa lista;
+  - 'f(a, b)' construye CallExpr(f, [a, b]), con los argumentos en el
+    campo object_name (regla IDENT '(' args_list ')');
+  - el tamaño de un parámetro arreglo es el INTLIT tal cual, sin ConstExpr;
+  - args_list y param_list admiten una coma inicial ('f(, a)');
+  - el else se asocia al if más cercano.
+
+En lugar de una reducción (y una llamada a Python) por cada nivel de la
+cascada logical_or_expr -> ... -> postfix_expr, un operando se lee una
+sola vez y cada operador binario se consulta en una tabla de precedencias.
+Ni las sentencias ni las expresiones anidadas usan una llamada por nivel
+(ver RDParser.stmt y RDParser.expression): como SLY, que guarda su pila
+en una lista, acepta programas anidados a cualquier profundidad.
+
+Las posiciones se registran igual que en SLY (line_position/index_position
+por id del nodo: línea e índice del primer token, fin del último; los
+desplazamientos van a la SpanTable que se pase a parse()), así que
+Context.find_source y Context.error funcionan con cualquiera de los dos
+parsers. Los errores de sintaxis se informan en el mismo token y con
+el mismo mensaje que parser.Parser y la recuperación es la de SLY cuando
+la gramática no tiene reglas 'error' (ver RDParser.parse).
+'''
+from sly.yacc import ERROR_COUNT
+
+from parser import Parser
+from mspans import SpanTable
+from myAST import *
+
+# Especificadores de tipo
+TYPES = frozenset({'VOID', 'INT', 'FLOAT', 'BOOL', 'STRING'})
+
+# Literales que producen ConstExpr
+CONSTANTS = frozenset({'INTLIT', 'FLOATLIT', 'BOOLIT', 'STRINGLIT', 'TRUE', 'FALSE'})
+
+# Operadores de asignación compuesta
+COMPOUND_ASSIGN = frozenset({'PLUS_ASSIGN', 'MINUS_ASSIGN', 'MULT_ASSIGN', 'DIV_ASSIGN'})
+
+# Operadores unarios que producen UnaryExpr
+UNARY = frozenset({'+', '-', '!', 'NOT'})
+
+# Operadores binarios: precedencia (mayor liga más) y constructor del nodo.
+# Todos son asociativos por la izquierda, como en la gramática de SLY.
+OR_PREC, AND_PREC, EQUALITY_PREC, RELATIONAL_PREC, ADDITIVE_PREC, MULTIPLICATIVE_PREC = range(1, 7)
+
+BINARY = {
+    'OR': OR_PREC,
+    'AND': AND_PREC,
+    'EQ': EQUALITY_PREC, 'NE': EQUALITY_PREC,
+    'LT': RELATIONAL_PREC, 'LE': RELATIONAL_PREC, 'GT': RELATIONAL_PREC, 'GE': RELATIONAL_PREC,
+    '+': ADDITIVE_PREC, '-': ADDITIVE_PREC,
+    '*': MULTIPLICATIVE_PREC, '/': MULTIPLICATIVE_PREC, '%': MULTIPLICATIVE_PREC,
+}
+
+
+class ParseError(Exception):
+    pass
+
+
+class EndToken:
+    '''
+    Centinela de fin de entrada: evita comprobar None en cada consulta.
+    '''
+    type = '$end'
+    value = None
+    lineno = None
+    index = None
+    end = None
+
+
+END = EndToken()
+
+
+class RDParser:
+    # Mismos mensajes de error que el parser de SLY
+    error = Parser.error
+
+    def __init__(self):
+        self.spans = SpanTable()
+        self._line_positions = {}                       # id -> lineno
+        self._index_positions = self.spans.offsets      # id -> (inicio, fin)
+
+    def line_position(self, value):
+        return self._line_positions[id(value)]
+
+    def index_position(self, value):
+        return self._index_positions[id(value)]
+
+    def parse(self, tokens, spans=None):
+        self._tokens = iter(tokens)
+        self._ahead = []
+        self.spans = spans if spans is not None else SpanTable()
+        self._line_positions = {}
+        self._index_positions = self.spans.offsets
+        self.syntax_errors = 0
+        self.last = None
+        self.tok = next(self._tokens, END)
+        self._pulled = None
+        while True:
+            try:
+                return self.program()
+            except ParseError:
+                pass
+            # Recuperación igual que SLY sin reglas 'error': se informa el
+            # error (salvo que se hayan desplazado menos de ERROR_COUNT tokens
+            # desde el anterior), se descarta todo lo analizado y el token
+            # inválido, y se vuelve a empezar el programa desde el siguiente
+            tok = self.tok
+            if self._pulled is None or self._consumed() - self._restart >= ERROR_COUNT:
+                self.error(None if tok is END else tok)
+            if tok is END:
+                return None
+            self._advance()
+            if self._pulled is None:
+                self._pulled = 0
+                self._tokens = self._counting(self._tokens)
+            self._restart = self._consumed()
+
+    def _counting(self, tokens):
+        # Sólo se instala tras el primer error: cuenta los tokens leídos
+        for tok in tokens:
+            self._pulled += 1
+            yield tok
+
+    def _consumed(self):
+        # Tokens desplazados desde que se instaló _counting
+        in_hand = sum(tok is not END for tok in [self.tok] + self._ahead)
+        return self._pulled - in_hand
+
+    # Manejo de tokens
+
+    def _advance(self):
+        self.last = self.tok
+        ahead = self._ahead
+        self.tok = ahead.pop() if ahead else next(self._tokens, END)
+
+    def _peek(self):
+        # Un token más allá del actual; nunca hace falta más
+        ahead = self._ahead
+        if not ahead:
+            ahead.append(next(self._tokens, END))
+        return ahead[0]
+
+    def _expect(self, type):
+        tok = self.tok
+        if tok.type != type:
+            self._fail()
+        self._advance()
+        return tok
+
+    def _fail(self):
+        raise ParseError()
+
+    def _mark(self, node, first):
+        # Igual que SLY: línea e inicio del primer token, fin del último
+        self._line_positions[id(node)] = first.lineno
+        self._index_positions[id(node)] = (first.index, self.last.end)
+        return node
+
+    # Declaraciones
+
+    def program(self):
+        first = self.tok
+        decls = [self.decl()]
+        while self.tok is not END:
+            decls.append(self.decl())
+        return self._mark(Program(decls), first)
+
+    def decl(self):
+        type = self.tok.type
+        if type in TYPES:
+            return self.var_or_func_decl()
+        if type == 'CLASS':
+            return self.class_decl()
+        if type == 'IDENT':
+            return self.object_decl()
+        self._fail()
+
+    def var_or_func_decl(self):
+        first = self.tok
+        self._advance()
+        ident = self._expect('IDENT').value
+        if self.tok.type == '(':
+            return self.func_rest(first, first.value, ident)
+        return self.var_decl_rest(first, ident)
+
+    def func_rest(self, first, return_type, ident):
+        self._expect('(')
+        params = self.param_list()
+        self._expect(')')
+        body = self.compound_stmt()
+        return self._mark(FuncDecl(return_type, ident, params, body), first)
+
+    def var_decl(self):
+        first = self.tok
+        if first.type not in TYPES:
+            self._fail()
+        self._advance()
+        return self.var_decl_rest(first, self._expect('IDENT').value)
+
+    def var_decl_rest(self, first, ident):
+        # type_spec IDENT ya leídos
+        type = self.tok.type
+        if type == ';':
+            self._advance()
+            return self._mark(VarDecl(first.value, ident), first)
+        if type == '=':
+            self._advance()
+            expr = self.assignment_expr()
+            self._expect(';')
+            return self._mark(VarDecl(first.value, ident, expr), first)
+        if type == '[':
+            self._advance()
+            size = self.expr()
+            self._expect(']')
+            self._expect(';')
+            return self._mark(ArrayDecl(first.value, ident, size), first)
+        self._fail()
+
+    def class_decl(self):
+        first = self.tok
+        self._advance()
+        ident = self._expect('IDENT').value
+        super_class = None
+        if self.tok.type == ':':
+            self._advance()
+            if self.tok.type == 'PUBLIC':
+                self._advance()
+            super_class = self._expect('IDENT').value
+        self._expect('{')
+        body = self.class_body()
+        self._expect('}')
+        self._expect(';')
+        return self._mark(ClassDecl(ident, super_class, body), first)
+
+    def class_body(self):
+        members = []
+        while True:
+            type = self.tok.type
+            if type == 'PRIVATE' or type == 'PUBLIC':
+                self._advance()
+                self._expect(':')
+            elif type in TYPES:
+                members.append(self.var_or_func_decl())
+            elif type == 'IDENT':
+                # Constructor
+                first = self.tok
+                self._advance()
+                members.append(self.func_rest(first, None, first.value))
+            elif type == '}':
+                return members
+            else:
+                self._fail()
+
+    def object_decl(self):
+        first = self.tok
+        class_type = self._expect('IDENT').value
+        instance_name = self._expect('IDENT').value
+        if self.tok.type == '=':
+            self._advance()
+            self._expect('NEW')
+            self._expect('IDENT')
+            self._expect('(')
+            args = self.args_list()
+            self._expect(')')
+            self._expect(';')
+            return self._mark(ObjectDecl(class_type=class_type, instance_name=instance_name, args=args), first)
+        self._expect(';')
+        return self._mark(ObjectDecl(class_type=class_type, instance_name=instance_name, args=None), first)
+
+    def param_list(self):
+        # (vacío | param) (',' param)*
+        params = []
+        type = self.tok.type
+        if type != ',' and type != ')':
+            params.append(self.param())
+        while self.tok.type == ',':
+            self._advance()
+            params.append(self.param())
+        return params
+
+    def param(self):
+        first = self.tok
+        if first.type not in TYPES:
+            self._fail()
+        self._advance()
+        ident = self._expect('IDENT').value
+        if self.tok.type == '[':
+            self._advance()
+            size = self._expect('INTLIT').value
+            self._expect(']')
+            return self._mark(ArrayDecl(ident=ident, var_type=first.value, size=size), first)
+        return self._mark(VarDecl(first.value, ident), first)
+
+    def args_list(self):
+        # (vacío | expr) (',' expr)*
+        args = []
+        type = self.tok.type
+        if type != ',' and type != ')':
+            args.append(self.expr())
+        while self.tok.type == ',':
+            self._advance()
+            args.append(self.expr())
+        return args
+
+    # Sentencias
+    #
+    # Las sentencias compuestas ('{ ... }', if, while, for) no se leen con
+    # una llamada por nivel: stmt() guarda en una pila un marco por cada una
+    # que está abierta, y cada marco recibe la sentencia que le falta. Así
+    # una cadena de N "else if" o N bloques anidados no agota la pila de
+    # Python, igual que en SLY.
+
+    def compound_stmt(self):
+        if self.tok.type != '{':
+            self._fail()
+        return self.stmt()
+
+    def stmt(self):
+        stack = []      # ['{', items], ['IF', first, cond], ['ELSE', first, cond, then]...
+        while True:
+            # Abre marcos hasta leer una sentencia simple
+            tok = self.tok
+            type = tok.type
+            if type in TYPES and stack and stack[-1][0] == '{':
+                result = self.var_decl()
+            elif type == '{':
+                self._advance()
+                stack.append(['{', []])
+                continue
+            elif type == 'IF' or type == 'WHILE':
+                self._advance()
+                self._expect('(')
+                cond = self.expr()
+                self._expect(')')
+                stack.append([type, tok, cond])
+                continue
+            elif type == 'FOR':
+                stack.append(self.for_control())
+                # El cuerpo de un for es siempre un bloque
+                if self.tok.type != '{':
+                    self._fail()
+                continue
+            elif type == 'IDENT' and self._peek().type == 'IDENT':
+                result = self.object_decl()
+            else:
+                method = STATEMENTS.get(type)
+                result = method(self) if method is not None else self.expr_stmt()
+
+            # Entrega la sentencia leída a los marcos que la esperan
+            while stack:
+                frame = stack[-1]
+                kind = frame[0]
+                if kind == '{':
+                    frame[1].append(result)
+                    if self.tok.type != '}':
+                        break
+                    self._advance()
+                    result = stack.pop()[1]
+                elif kind == 'IF':
+                    # El else se asocia al if más cercano: el del tope
+                    if self.tok.type == 'ELSE':
+                        self._advance()
+                        frame[0] = 'ELSE'
+                        frame.append(result)
+                        break
+                    stack.pop()
+                    result = self._mark(IfStmt(cond=frame[2], then_stmt=result), frame[1])
+                elif kind == 'ELSE':
+                    stack.pop()
+                    result = self._mark(IfStmt(cond=frame[2], then_stmt=frame[3], else_stmt=result), frame[1])
+                elif kind == 'WHILE':
+                    stack.pop()
+                    result = self._mark(WhileStmt(cond=frame[2], body=result), frame[1])
+                else:
+                    _, first, init, cond, incr = stack.pop()
+                    result = self._mark(ForStmt(initialization=init, condition=cond, increment=incr, body=result), first)
+            else:
+                return result
+
+    def for_control(self):
+        # FOR '(' for_init ';' for_cond ';' for_incr ')': el marco del for
+        first = self.tok
+        self._advance()
+        self._expect('(')
+        type = self.tok.type
+        if type == ';':
+            init = None
+        elif type in TYPES:
+            init = self.var_decl_no_semi()
+        else:
+            init = self.assignment_expr()
+        self._expect(';')
+        cond = None if self.tok.type == ';' else self.expr()
+        self._expect(';')
+        incr = None if self.tok.type == ')' else self.assignment_expr()
+        self._expect(')')
+        return ['FOR', first, init, cond, incr]
+
+    def expr_stmt(self):
+        first = self.tok
+        expr = self.assignment_expr()
+        self._expect(';')
+        return self._mark(ExprStmt(expr), first)
+
+    def var_decl_no_semi(self):
+        first = self.tok
+        self._advance()
+        ident = self._expect('IDENT').value
+        type = self.tok.type
+        if type == '=':
+            self._advance()
+            return self._mark(VarDecl(first.value, ident, self.assignment_expr()), first)
+        if type == '[':
+            self._advance()
+            size = self.expr()
+            self._expect(']')
+            return self._mark(ArrayDecl(first.value, ident, size), first)
+        return self._mark(VarDecl(first.value, ident), first)
+
+    def return_stmt(self):
+        first = self.tok
+        self._advance()
+        if self.tok.type == ';':
+            self._advance()
+            return self._mark(ReturnStmt(), first)
+        expr = self.expr()
+        self._expect(';')
+        return self._mark(ReturnStmt(expr), first)
+
+    def _keyword_stmt(self, node_class):
+        # BREAK ';'  CONTINUE ';'  THIS ';'
+        first = self.tok
+        self._advance()
+        self._expect(';')
+        return self._mark(node_class(), first)
+
+    def break_stmt(self):
+        return self._keyword_stmt(BreakStmt)
+
+    def continue_stmt(self):
+        return self._keyword_stmt(ContinueStmt)
+
+    def this_stmt(self):
+        return self._keyword_stmt(ThisStmt)
+
+    def super_stmt(self):
+        first = self.tok
+        self._advance()
+        self._expect('(')
+        args = self.args_list()
+        self._expect(')')
+        self._expect(';')
+        return self._mark(SuperStmt(args), first)
+
+    def printf_stmt(self):
+        first = self.tok
+        self._advance()
+        self._expect('(')
+        format_string = self._expect('STRINGLIT').value
+        args = []
+        if self.tok.type == ',':
+            self._advance()
+            args = self.args_list()
+        self._expect(')')
+        self._expect(';')
+        return self._mark(PrintStmt(format_string, args), first)
+
+    def sprintf_stmt(self):
+        first = self.tok
+        self._advance()
+        self._expect('(')
+        buffer = self.expr()
+        self._expect(',')
+        format_string = self._expect('STRINGLIT').value
+        args = []
+        if self.tok.type == ',':
+            self._advance()
+            args = self.args_list()
+        self._expect(')')
+        self._expect(';')
+        return self._mark(SPrintStmt(buffer, format_string, args), first)
+
+    # Expresiones
+    #
+    # Tampoco aquí hay una llamada por nivel de anidamiento: expression()
+    # aplica precedence climbing con pilas explícitas de operandos y
+    # operadores, los prefijos de cada operando se acumulan en una lista y
+    # '(' expr ')', IDENT '[' expr ']' y los argumentos de una llamada
+    # suspenden la expresión en curso en una pila de marcos.
+
+    def assignment_expr(self):
+        # Las asignaciones son asociativas por la derecha: se juntan los
+        # destinos y se construyen desde el último
+        targets = []
+        while True:
+            first = self.tok
+            if first.type != 'IDENT':
+                value = self.expr()
+                break
+            type = self._peek().type
+            if type == '=':
+                self._advance()
+                self._advance()
+                targets.append((VarAssignExpr, first, None))
+            elif type in COMPOUND_ASSIGN:
+                self._advance()
+                targets.append((CompoundAssignExpr, first, self.tok.value))
+                self._advance()
+            elif type == '[':
+                # IDENT '[' expr ']' es una asignación sólo si sigue '='
+                self._advance()
+                self._advance()
+                index = self.expr()
+                self._expect(']')
+                if self.tok.type != '=':
+                    lookup = self._mark(ArrayLookupExpr(first.value, index), first)
+                    value = self.expression(lookup, first)
+                    break
+                self._advance()
+                targets.append((ArrayAssignExpr, first, index))
+            else:
+                value = self.expr()
+                break
+        for node_class, first, extra in reversed(targets):
+            if node_class is VarAssignExpr:
+                value = VarAssignExpr(first.value, value)
+            elif node_class is CompoundAssignExpr:
+                value = CompoundAssignExpr(ident=first.value, operator=extra, expr=value)
+            else:
+                value = ArrayAssignExpr(first.value, extra, value)
+            self._mark(value, first)
+        return value
+
+    def expr(self):
+        return self.expression()
+
+    def expression(self, node=None, first=None):
+        '''
+        Lee una expresión. Con node, su primer operando primario ya está
+        leído y empieza en el token first.
+        '''
+        binary = BINARY
+        frames = []         # [clase, primer token, nombre, método, argumentos, estado suspendido]
+        operands = []       # (nodo, primer token) a la izquierda de cada operador
+        operators = []      # (precedencia, token)
+        prefixes = []       # (token, tipo de la conversión o None) del operando en curso
+        while True:
+            if node is None:
+                # Prefijos: ++, --, + - ! NOT y conversiones '(' type_spec ')'
+                while True:
+                    tok = self.tok
+                    type = tok.type
+                    if type == 'INCREMENT' or type == 'DECREMENT' or type in UNARY:
+                        self._advance()
+                        prefixes.append((tok, None))
+                    elif type == '(' and self._peek().type in TYPES:
+                        self._advance()
+                        prefixes.append((tok, self.tok.value))
+                        self._advance()
+                        self._expect(')')
+                    else:
+                        break
+
+                # Operando primario, o un marco que lo deja pendiente
+                first = self.tok
+                type = first.type
+                frame = None
+                if type in CONSTANTS:
+                    self._advance()
+                    node = self._mark(ConstExpr(first.value), first)
+                elif type == 'IDENT':
+                    self._advance()
+                    type = self.tok.type
+                    if type == '(':
+                        self._advance()
+                        frame = ['CALL', first, first.value, None, []]
+                    elif type == '[':
+                        self._advance()
+                        frame = ['[', first, first.value]
+                    elif type == '.':
+                        self._advance()
+                        if self.tok.type == 'SIZE':
+                            self._advance()
+                            node = self._mark(ArraySizeExpr(first.value), first)
+                        else:
+                            ident = self._expect('IDENT').value
+                            self._expect('(')
+                            frame = ['CALL', first, first.value, ident, []]
+                    else:
+                        node = self._mark(VarExpr(first.value), first)
+                elif type == '(':
+                    self._advance()
+                    frame = ['(', first]
+                elif type == 'NULL':
+                    self._advance()
+                    node = self._mark(NullExpr(), first)
+                else:
+                    self._fail()
+
+                if frame is not None:
+                    # args_list: (vacío | expr) (',' expr)*
+                    type = self.tok.type
+                    if frame[0] == 'CALL' and type == ')':
+                        self._advance()
+                        node = self._call(frame)
+                    else:
+                        if frame[0] == 'CALL' and type == ',':
+                            self._advance()
+                        frame.append((operands, operators, prefixes))
+                        frames.append(frame)
+                        operands, operators, prefixes = [], [], []
+                        continue
+
+            # Sufijos, y después los prefijos del más cercano al operando
+            while True:
+                type = self.tok.type
+                if type == 'INCREMENT':
+                    self._advance()
+                    node = self._mark(PostfixIncExpr(node), first)
+                elif type == 'DECREMENT':
+                    self._advance()
+                    node = self._mark(PostfixDecExpr(node), first)
+                else:
+                    break
+            if prefixes:
+                for tok, target_type in reversed(prefixes):
+                    type = tok.type
+                    if type == 'INCREMENT':
+                        node = PrefixIncExpr(node)
+                    elif type == 'DECREMENT':
+                        node = PrefixDecExpr(node)
+                    elif target_type is not None:
+                        node = CastExpr(target_type, node)
+                    else:
+                        node = UnaryExpr(tok.value, node)
+                    self._mark(node, tok)
+                first = prefixes[0][0]
+                prefixes = []
+
+            # Se reducen los operadores que ligan al menos tanto como el
+            # siguiente (asociatividad izquierda) antes de avanzar sobre él,
+            # para que cada nodo termine en su último operando
+            op = self.tok
+            prec = binary.get(op.type)
+            while operators and (prec is None or operators[-1][0] >= prec):
+                op_prec, op_tok = operators.pop()
+                left, first = operands.pop()
+                if op_prec == OR_PREC:
+                    node = ShortCircuitOrExpr(left, node)
+                elif op_prec == AND_PREC:
+                    node = ShortCircuitAndExpr(left, node)
+                else:
+                    node = BinaryExpr(left, op_tok.value, node)
+                self._mark(node, first)
+            if prec is not None:
+                self._advance()
+                operands.append((node, first))
+                operators.append((prec, op))
+                node = None
+                continue
+
+            # La expresión terminó: completa el marco que la contenía
+            if not frames:
+                return node
+            frame = frames[-1]
+            kind = frame[0]
+            if kind == 'CALL':
+                frame[4].append(node)
+                if self.tok.type == ',':
+                    self._advance()
+                    node = None
+                    continue
+                self._expect(')')
+                node = self._call(frame)
+            elif kind == '(':
+                self._expect(')')
+                node = self._mark(GroupingExpr(node), frame[1])
+            else:
+                self._expect(']')
+                node = self._mark(ArrayLookupExpr(frame[2], node), frame[1])
+            frames.pop()
+            operands, operators, prefixes = frame[-1]
+            first = frame[1]
+
+    def _call(self, frame):
+        # IDENT '(' args_list ')' pone los argumentos en object_name
+        first, name, method, args = frame[1:5]
+        if method is None:
+            return self._mark(CallExpr(name, args), first)
+        return self._mark(CallExpr(object_name=name, ident=method, args=args), first)
+
+
+# Sentencias simples que empiezan con una palabra clave
+STATEMENTS = {
+    'RETURN': RDParser.return_stmt,
+    'BREAK': RDParser.break_stmt,
+    'CONTINUE': RDParser.continue_stmt,
+    'THIS': RDParser.this_stmt,
+    'SUPER': RDParser.super_stmt,
+    'PRINTF': RDParser.printf_stmt,
+    'SPRINTF': RDParser.sprintf_stmt,
+}
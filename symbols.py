@@ -0,0 +1,224 @@
+# symbols.py
+'''
+Tabla de símbolos internados, compartida por lexer, parser y checker.
+
+Cada compilación crea un SymbolTable. El lexer interna cada identificador
+distinto una sola vez y le asigna un id entero denso; el token lleva un
+Symbol, que es el propio texto del identificador (str) más su id, así que
+los nodos del AST siguen guardando el nombre tal cual para los mensajes de
+error y el checker puede indexar por id.
+
+La tabla también guarda las constantes de la compilación: el lexer pasa
+cada literal por SymbolTable.constant, así que todas las apariciones de
+un mismo valor comparten un objeto. Los tipos del checker son
+descriptores canónicos (Type, uno por nombre en cada TypeTable) que se
+comparan por identidad.
+'''
+
+class Symbol:
+  '''
+  Identificador internado. Se compara, imprime y hashea como su texto,
+  así que puede estar donde antes había un str; el id se lee de un slot.
+  '''
+  __slots__ = ('text', 'id', 'table')
+
+  def __init__(self, text, id, table):
+    self.text = text
+    self.id = id
+    self.table = table
+
+  def __str__(self):
+    return self.text
+
+  def __repr__(self):
+    return repr(self.text)
+
+  def __format__(self, spec):
+    return format(self.text, spec)
+
+  def __eq__(self, other):
+    if other.__class__ is Symbol:
+      return self is other or self.text == other.text
+    return self.text == other
+
+  def __hash__(self):
+    return hash(self.text)
+
+  def __reduce__(self):
+    # Al serializar se conserva sólo el texto
+    return (str, (self.text,))
+
+
+class SymbolTable:
+  def __init__(self):
+    self.ids = {}        # texto -> Symbol
+    self.names = []      # id -> Symbol
+    self.constants = {}  # (clase, valor) -> valor canónico
+
+  def __len__(self):
+    return len(self.names)
+
+  def intern(self, text):
+    sym = self.ids.get(text)
+    if sym is None:
+      sym = Symbol(str(text), len(self.names), self)
+      self.ids[sym.text] = sym
+      self.names.append(sym)
+    return sym
+
+  def id(self, name):
+    if type(name) is Symbol and name.table is self:
+      return name.id
+    return self.intern(name).id
+
+  def find(self, name):
+    '''
+    Id de name sin internarlo; None si nunca se ha visto.
+    '''
+    if type(name) is Symbol and name.table is self:
+      return name.id
+    sym = self.ids.get(name)
+    return None if sym is None else sym.id
+
+  def text(self, id):
+    return self.names[id].text
+
+  def constant(self, value):
+    '''
+    Objeto canónico del literal value; la clase es parte de la clave para
+    no mezclar 1, 1.0 y True.
+    '''
+    return self.constants.setdefault((value.__class__, value), value)
+
+
+class Type:
+  '''
+  Descriptor de tipo. Hay uno solo por nombre en cada TypeTable, así que
+  dos tipos se comparan con "is"; se imprime como su nombre.
+  '''
+  __slots__ = ('name',)
+
+  def __init__(self, name):
+    self.name = name
+
+  def __str__(self):
+    return str(self.name)
+
+  def __repr__(self):
+    return f'Type({str(self.name)!r})'
+
+  def __format__(self, spec):
+    return format(str(self.name), spec)
+
+  def __reduce__(self):
+    # Con pickle un primitivo vuelve a ser el mismo objeto (INT, FLOAT...)
+    return PRIMITIVE_NAMES.get(self) or (Type, (self.name,))
+
+INT = Type('int')
+FLOAT = Type('float')
+BOOL = Type('bool')
+STRING = Type('string')
+VOID = Type('void')
+NULL = Type('null')
+PRIMITIVE_NAMES = {INT: 'INT', FLOAT: 'FLOAT', BOOL: 'BOOL', STRING: 'STRING', VOID: 'VOID', NULL: 'NULL'}
+
+
+class TypeTable:
+  '''
+  Tipos de una compilación: los primitivos son los mismos para todas y
+  cada clase tiene el suyo, creado la primera vez que se nombra.
+  '''
+  def __init__(self):
+    self.types = {t.name: t for t in (INT, FLOAT, BOOL, STRING, VOID, NULL)}
+
+  def __getitem__(self, name):
+    # name: el tipo como aparece en el AST (str o Symbol); None no es un tipo
+    t = self.types.get(name)
+    if t is None and name is not None:
+      t = self.types[name] = Type(name)
+    return t
+
+
+class ScopedTable:
+  '''
+  Ámbitos anidados indexados por id de símbolo. Para cada símbolo se
+  guarda la pila de sus declaraciones visibles (profundidad, valor), de
+  modo que buscar un nombre es indexar una lista en vez de recorrer una
+  cadena de diccionarios.
+  '''
+  def __init__(self, symbols=None):
+    self.symbols = symbols if symbols is not None else SymbolTable()
+    self.bindings = []   # id -> [(profundidad, valor), ...]
+    self.scopes = [[]]   # ids declarados en cada ámbito abierto
+
+  def _find(self, name):
+    # Pila de declaraciones de name, o None si nunca se ha declarado
+    if name.__class__ is Type:
+      name = name.name     # un tipo de clase se busca por el nombre de la clase
+    if name.__class__ is Symbol and name.table is self.symbols:
+      sid = name.id
+    elif isinstance(name, (str, Symbol)):
+      sid = self.symbols.find(name)
+      if sid is None:
+        return None
+    else:
+      return None
+    try:
+      return self.bindings[sid]
+    except IndexError:
+      return None
+
+  def push(self):
+    self.scopes.append([])
+
+  def pop(self):
+    bindings = self.bindings
+    for sid in self.scopes.pop():
+      bindings[sid].pop()
+
+  def __setitem__(self, name, value):
+    if name.__class__ is Symbol and name.table is self.symbols:
+      sid = name.id
+    else:
+      sid = self.symbols.id(name)
+    bindings = self.bindings
+    if sid >= len(bindings):
+      bindings.extend([] for _ in range(len(self.symbols) + 1 - len(bindings)))
+    stack = bindings[sid]
+    depth = len(self.scopes) - 1
+    if stack and stack[-1][0] == depth:
+      stack[-1] = (depth, value)
+    else:
+      stack.append((depth, value))
+      self.scopes[-1].append(sid)
+
+  def in_scope(self, name):
+    '''
+    Está declarado en el ámbito actual (el antiguo maps[0] del ChainMap).
+    '''
+    if name.__class__ is Symbol and name.table is self.symbols:
+      try:
+        stack = self.bindings[name.id]
+      except IndexError:
+        return False
+    else:
+      stack = self._find(name)
+    return bool(stack) and stack[-1][0] == len(self.scopes) - 1
+
+  def lookup(self, name):
+    # Camino rápido: un Symbol de esta compilación indexa directamente
+    if name.__class__ is Symbol and name.table is self.symbols:
+      try:
+        stack = self.bindings[name.id]
+      except IndexError:
+        return None
+    else:
+      stack = self._find(name)
+    return stack[-1][1] if stack else None
+
+  def lookup_all(self, name):
+    '''
+    Todas las declaraciones visibles de name, de la más interna a la más externa.
+    '''
+    stack = self._find(name)
+    return [value for _, value in reversed(stack)] if stack else []
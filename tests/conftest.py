@@ -0,0 +1,10 @@
+# conftest.py
+'''
+Las pruebas importan los módulos del compilador desde la raíz del
+repositorio, también los programas generados de programs.py.
+'''
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
@@ -0,0 +1,43 @@
+# test_arena.py
+'''
+AST plano (Context(flat=True)): los recorridos genéricos y la pasada
+arena ven las mismas declaraciones que el árbol de objetos.
+'''
+import glob
+import os
+
+import pytest
+
+from mcontext import Context
+from myAST import nodes
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FILES = sorted(glob.glob(os.path.join(ROOT, 'scripts', '*.mc')))
+
+def parse(path, **options):
+    with open(path) as f:
+        source = f.read()
+    ctxt = Context(parser='rd', **options)
+    ctxt.parse(source)
+    return ctxt
+
+@pytest.mark.parametrize('path', FILES, ids=os.path.basename)
+def test_nodes(path):
+    tree, flat = parse(path), parse(path, flat=True)
+    if tree.ast is None:
+        pytest.skip('error de sintaxis')
+    expected = [node.__class__ for node in nodes(tree.ast)]
+    assert len(expected) > 1
+    assert [node.__class__ for node in nodes(flat.ast)] == expected
+
+@pytest.mark.parametrize('path', FILES, ids=os.path.basename)
+def test_arena_pass(path):
+    tree, flat = parse(path), parse(path, flat=True)
+    if tree.ast is None:
+        pytest.skip('error de sintaxis')
+    arena = flat.passes.get('arena')
+    assert arena is flat.arena
+    lowered = tree.passes.get('arena')
+    assert len(arena) == len(lowered) == sum(1 for _ in nodes(tree.ast))
+    assert arena.to_ast() == lowered.to_ast() == tree.ast
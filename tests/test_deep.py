@@ -0,0 +1,70 @@
+# test_deep.py
+'''
+Programas anidados a 100k niveles: el parser rd, el SemanticAnalyzer y
+MakeDot no tienen límite de profundidad (pilas explícitas en lugar de
+una llamada de Python por nivel).
+'''
+import dataclasses
+import io
+
+import pytest
+
+from mcontext import Context
+from mdot import MakeDot
+from myAST import FuncDecl, IfStmt, Node, nodes
+import programs
+
+DEPTH = 100_000
+
+CASES = {
+    'expresión': programs.long_expression,
+    'paréntesis': programs.nested_parentheses,
+    'else if': programs.else_if_ladder,
+}
+
+def dot_nodes(text):
+    return sum(1 for line in text.splitlines() if '[label=' in line and '->' not in line)
+
+def dot_labels(program):
+    # Nodos auxiliares que dibuja MakeDot (Params/Body, Cond/Then/Else...)
+    extra = 0
+    for node in nodes(program):
+        if isinstance(node, FuncDecl):
+            extra += 1 + bool(node.params)
+        elif isinstance(node, IfStmt):
+            extra += 2 + bool(node.else_stmt)
+    return extra
+
+def shape(ctxt):
+    # Clase, campos simples, posición y línea de cada nodo
+    out = []
+    for node in nodes(ctxt.ast):
+        values = tuple(str(value) for value in (getattr(node, f.name) for f in dataclasses.fields(node))
+                       if not isinstance(value, (Node, list)))
+        out.append((node.__class__, values, ctxt.spans.get(node), ctxt.parser.line_position(node)))
+    return out
+
+@pytest.mark.parametrize('name', sorted(CASES))
+def test_deep_program(name):
+    ctxt = Context(lexer='dfa', parser='rd')
+    ctxt.parse(CASES[name](DEPTH))
+    assert ctxt.syntax_errors == 0 and ctxt.ast is not None
+    count = sum(1 for _ in nodes(ctxt.ast))
+    assert count > DEPTH
+
+    assert ctxt.check().errors == []
+    out = io.StringIO()
+    maker = MakeDot(out)
+    maker.visit(ctxt.ast)
+    assert dot_nodes(out.getvalue()) == count + dot_labels(ctxt.ast)
+
+@pytest.mark.parametrize('name', sorted(CASES))
+def test_deep_parser_parity(name):
+    # Más allá del límite de recursión de Python, pero lo bastante poco
+    # profundo para que SLY no tarde
+    source = CASES[name](5000)
+    rd = Context(parser='rd')
+    rd.parse(source)
+    sly = Context(parser='sly')
+    sly.parse(source)
+    assert shape(rd) == shape(sly)
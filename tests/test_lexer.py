@@ -0,0 +1,63 @@
+# test_lexer.py
+'''
+Paridad del lexer DFA (dfalexer.py) con el de SLY: el mismo flujo de
+tokens (type, value, lineno, index) y los mismos errores léxicos.
+'''
+import contextlib
+import glob
+import io
+import os
+import random
+
+import pytest
+
+from dfalexer import DFALexer
+from lexer import Lexer
+import programs
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FILES = sorted(glob.glob(os.path.join(ROOT, 'scripts', '*.mc')) + glob.glob(os.path.join(ROOT, 'errors', '*.mc')))
+
+GENERATED = {
+    'identifier_heavy': programs.identifier_heavy(functions=10),
+    'many_functions': programs.many_functions(functions=50),
+    'class_heavy': programs.class_heavy(classes=10, methods=5, calls=3),
+    'literal_table': programs.literal_table(rows=500),
+    'printf_heavy': programs.printf_heavy(statements=200, errors=20),
+}
+
+# Casos límite de cada regla: comentarios sin cerrar, '//' sin salto de
+# línea final, escapes en cadenas, 'true'/'false' seguidos de letras,
+# números con punto y caracteres no ASCII
+EDGES = ['/* a\nb */x', '/* sin cerrar\n x = 1;\n', 'y // c\n z // sin salto', '"a\\"b\\\nc" "d\ne"',
+         'trueX falsey true1 false_', '1. 1.5 .5 12..3', 'é٣ x٣ 3٣ "ñ"', '#$ @ `', '']
+
+def token_stream(lexer, source):
+    # Los errores léxicos se imprimen; se capturan para compararlos también
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        tokens = [(t.type, t.value, t.lineno, t.index) for t in lexer.tokenize(source)]
+    return tokens, out.getvalue()
+
+def assert_same_tokens(source):
+    assert token_stream(DFALexer(), source) == token_stream(Lexer(), source)
+
+@pytest.mark.parametrize('path', FILES, ids=lambda path: os.path.relpath(path, ROOT))
+def test_files(path):
+    with open(path) as f:
+        assert_same_tokens(f.read())
+
+@pytest.mark.parametrize('name', sorted(GENERATED))
+def test_generated(name):
+    assert_same_tokens(GENERATED[name])
+
+@pytest.mark.parametrize('source', EDGES)
+def test_edges(source):
+    assert_same_tokens(source)
+
+def test_random_text():
+    rnd = random.Random(0)
+    alphabet = list('/*"\\\n .=!<>&|+-x1et_') + ['true', 'false', 'if', 'int', 'é', '٣', '#']
+    for _ in range(500):
+        assert_same_tokens(''.join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 80))))
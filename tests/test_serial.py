@@ -0,0 +1,29 @@
+# test_serial.py
+'''
+Formato binario de mserial: un programa leído con lazy=True se recorre y
+se vuelve a escribir y se lee igual que el Program original.
+'''
+import glob
+import os
+
+import pytest
+
+from mcontext import Context
+from myAST import nodes
+import mserial
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FILES = sorted(glob.glob(os.path.join(ROOT, 'scripts', '*.mc')))
+
+@pytest.mark.parametrize('path', FILES, ids=os.path.basename)
+def test_lazy_round_trip(path):
+    ctxt = Context(parser='rd')
+    with open(path) as f:
+        ctxt.parse(f.read())
+    if ctxt.ast is None:
+        pytest.skip('error de sintaxis')
+    data = mserial.dumps(ctxt.ast)
+    lazy = mserial.loads(data, lazy=True)
+    assert [node.__class__ for node in nodes(lazy)] == [node.__class__ for node in nodes(ctxt.ast)]
+    assert mserial.loads(mserial.dumps(lazy)) == ctxt.ast
@@ -0,0 +1,66 @@
+# test_threads.py
+'''
+Prueba de carga con hilos (como benchmarks/bench_threads.py): cada
+programa de scripts/, errors/ y los generados se analiza, revisa y
+dibuja en un ThreadPoolExecutor con los tres motores, y cada resultado
+debe ser el de la ejecución en serie.
+'''
+from concurrent.futures import ThreadPoolExecutor
+import glob
+import os
+import sys
+
+import pytest
+
+from mcontext import Context
+from mdot import MakeDot
+import programs
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENGINES = (
+    dict(lexer='sly', parser='sly'),
+    dict(lexer='dfa', parser='rd'),
+    dict(lexer='dfa', parser='rd', flat=True),
+)
+
+def sources():
+    for path in sorted(glob.glob(os.path.join(ROOT, 'scripts', '*.mc')) + glob.glob(os.path.join(ROOT, 'errors', '*.mc'))):
+        with open(path) as f:
+            yield os.path.basename(path), f.read()
+    for k in range(1, 21):
+        yield f'many_functions({k})', programs.many_functions(functions=k * 2, statements=k)
+        yield f'identifier_heavy({k})', programs.identifier_heavy(functions=k, locals_=k + 2, depth=k % 4)
+        yield f'long_expression({k})', programs.long_expression(k * 50)
+        yield f'else_if_ladder({k})', programs.else_if_ladder(k * 10)
+
+def tasks():
+    return [(name, source, engine) for name, source in sources() for engine in ENGINES]
+
+def run(task):
+    # Análisis, errores del checker y DOT de un programa con un motor
+    name, source, engine = task
+    ctxt = Context(**engine)
+    ctxt.parse(source)
+    if ctxt.ast is None:
+        return name, ctxt.syntax_errors, None, None
+    errors = ctxt.check().errors
+    maker = MakeDot()
+    maker.visit(ctxt.ast)
+    return name, ctxt.syntax_errors, errors, maker.dot.source
+
+@pytest.fixture
+def frequent_switches():
+    # Cambios de hilo frecuentes para mezclar más las tareas
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    yield
+    sys.setswitchinterval(interval)
+
+def test_threads_match_serial(frequent_switches):
+    work = tasks()
+    expected = [run(task) for task in work]
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(run, work))
+    for task, got, want in zip(work, results, expected):
+        assert got == want, f'{task[0]} {task[2]}'
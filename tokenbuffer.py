@@ -0,0 +1,104 @@
+# tokenbuffer.py
+'''
+Buffer compacto de tokens (struct-of-arrays).
+
+En lugar de un objeto Token de SLY por token, guarda columnas paralelas
+en arrays: el tipo de token como entero pequeño, los desplazamientos de
+inicio y fin en el código fuente y el número de línea. Los valores de los
+literales no se guardan: se decodifican bajo demanda a partir del trozo
+de código fuente correspondiente.
+
+El ahorro es de memoria para las pasadas posteriores al análisis (que
+conservan los tokens), no de tiempo: el parser sigue recibiendo un Token
+de SLY por token, creado al vuelo por __iter__.
+'''
+from array import array
+
+from sly.lex import Token
+from lexer import Lexer
+
+# Tipos de token: cada uno se identifica por su posición en esta lista
+KINDS = sorted(Lexer.tokens) + list(Lexer.literals)
+KIND = {name: kind for kind, name in enumerate(KINDS)}
+IDENT = KIND['IDENT']
+
+# Conversión del texto del token a su valor, igual que en lexer.Lexer
+DECODERS = {
+    KIND['INTLIT']: int,
+    KIND['FLOATLIT']: float,
+    KIND['BOOLIT']: lambda text: text == 'true',
+    KIND['STRINGLIT']: lambda text: text[1:-1],
+}
+
+
+class TokenBuffer:
+    def __init__(self, source, symbols=None):
+        self.source = source
+        self.symbols = symbols
+        self.kinds = array('B')
+        self.starts = array('I')
+        self.ends = array('I')
+        self.lines = array('I')
+
+    @classmethod
+    def from_tokens(cls, source, tokens, symbols=None):
+        buffer = cls(source, symbols)
+        kind = KIND
+        kinds_append = buffer.kinds.append
+        starts_append = buffer.starts.append
+        ends_append = buffer.ends.append
+        lines_append = buffer.lines.append
+        for tok in tokens:
+            kinds_append(kind[tok.type])
+            starts_append(tok.index)
+            ends_append(tok.end)
+            lines_append(tok.lineno)
+        return buffer
+
+    @classmethod
+    def from_columns(cls, source, columns, symbols=None):
+        buffer = cls(source, symbols)
+        buffer.kinds, buffer.starts, buffer.ends, buffer.lines = columns
+        return buffer
+
+    def columns(self):
+        return self.kinds, self.starts, self.ends, self.lines
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def type(self, i):
+        return KINDS[self.kinds[i]]
+
+    def text(self, i):
+        return self.source[self.starts[i]:self.ends[i]]
+
+    def value(self, i):
+        kind = self.kinds[i]
+        text = self.text(i)
+        decode = DECODERS.get(kind)
+        if decode:
+            return decode(text)
+        if kind == IDENT and self.symbols is not None:
+            return self.symbols.intern(text)
+        return text
+
+    def lineno(self, i):
+        return self.lines[i]
+
+    def __getitem__(self, i):
+        tok = Token()
+        tok.type = KINDS[self.kinds[i]]
+        tok.value = self.value(i)
+        tok.lineno = self.lines[i]
+        tok.index = self.starts[i]
+        tok.end = self.ends[i]
+        return tok
+
+    def __iter__(self):
+        # Los Token se crean de uno en uno a medida que el parser los pide
+        for i in range(len(self.kinds)):
+            yield self[i]
+
+    def nbytes(self):
+        return sum(col.itemsize * len(col) for col in self.columns())